@@ -0,0 +1,43 @@
+# Bulk registration (one add_players call) against per-player add_player + add_team calls.
+# Run from repository root: python benchmarks/bulk_registration.py
+import random
+import time
+
+from fixtures import ADMIN
+
+from tournapy.manager import TournamentManager
+
+TEAM_SIZE = 3
+
+
+def roster(players: int, seed: int = 0) -> list[tuple]:
+    rng = random.Random(seed)
+    return [(f'player {i}', rng.randint(0, 1900), f'team {i // TEAM_SIZE}') for i in range(players)]
+
+
+def per_call(rows: list[tuple]) -> float:
+    manager = TournamentManager()
+    manager.create_tournament('t', TEAM_SIZE, ADMIN, '')
+    start = time.perf_counter()
+    for name, elo, team in rows:
+        manager.add_player('t', name, elo, ADMIN)
+        manager.add_team('t', team, name, ADMIN)
+    return time.perf_counter() - start
+
+
+def bulk(rows: list[tuple]) -> float:
+    manager = TournamentManager()
+    manager.create_tournament('t', TEAM_SIZE, ADMIN, '')
+    start = time.perf_counter()
+    success, feedback = manager.add_players('t', rows, ADMIN)
+    elapsed = time.perf_counter() - start
+    assert success, feedback
+    return elapsed
+
+
+if __name__ == '__main__':
+    for players in (500, 5_000, 50_000):
+        rows = roster(players)
+        slow = min(per_call(rows) for _ in range(3))
+        fast = min(bulk(rows) for _ in range(3))
+        print(f'{players:>6} players: per call {slow * 1000:8.1f} ms, bulk {fast * 1000:7.1f} ms, x{slow / fast:.1f}')
@@ -0,0 +1,62 @@
+# Seeded synthetic data shared by the benchmarks.
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from tournapy.core.model import Team  # noqa: E402
+from tournapy.core.ruleset import RulesetEnum  # noqa: E402
+from tournapy.manager import TournamentManager  # noqa: E402
+from tournapy.tournament import Tournament  # noqa: E402
+
+ADMIN = 'admin'
+
+
+def build_tournament(name: str, players: int, team_size: int = 1, seed: int = 0) -> Tournament:
+    rng = random.Random(seed)
+    t = Tournament()
+    t.setup(ADMIN, name, team_size)
+    for i in range(players):
+        t.add_player(f'player {i}', rng.randint(0, 1900))
+    for i in range(players // team_size):
+        for j in range(team_size):
+            t.add_to_team(f'team {i}', f'player {i * team_size + j}')
+    return t
+
+
+def build_pool(rules_name: str, teams: int, bo: int = 3) -> object:
+    stage = RulesetEnum(rules_name).get_ruleset(rules_name, teams, bo)
+    for i in range(teams):
+        team = Team(f'team {i}')
+        team.elo = (i * 7919) % 1900
+        stage.add_team(team)
+    return stage
+
+
+def play(stage, matches: int, seed: int = 0):
+    # reports results of up to `matches` playable matches
+    rng = random.Random(seed)
+    played = 0
+    while stage.running and played < matches:
+        match = next((stage.get_match(i) for i in stage.match_queue
+                      if not stage.get_match(i).blue_team.startswith(('winner(', 'loser('))
+                      and not stage.get_match(i).red_team.startswith(('winner(', 'loser('))), None)
+        if match is None:
+            break
+        while not match.ended:
+            blue = rng.randint(0, 5)
+            stage.report_match_result(match, blue, blue + 1 if blue == 0 or rng.random() < 0.5 else blue - 1)
+        played += 1
+
+
+def build_manager(tournaments: int, players: int, seed: int = 0) -> TournamentManager:
+    manager = TournamentManager()
+    for k in range(tournaments):
+        name = f'tournament {k}'
+        t = build_tournament(name, players, 1, seed + k)
+        manager.tourneys_dict[name] = t
+        manager.add_phase(name, 'swiss', RulesetEnum.SWISS_SYSTEM.value, players, 3, ADMIN)
+        manager.start_next_phase(name, ADMIN)
+        play(t.get_current_phase(), players, seed + k)
+    return manager
@@ -0,0 +1,35 @@
+# Import time of the engine, also checked without timing by tests/test_import.py (no pandas, numpy nor
+# asyncio loaded).
+# Run from repository root: python benchmarks/import_time.py [max milliseconds]
+# Exits with status 1 on regression.
+import os
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+PROBE = f'''
+import sys, time
+sys.path.insert(0, {SRC!r})
+start = time.perf_counter()
+import tournapy
+from tournapy.core.model import Match, Player, Team
+from tournapy.core.ruleset import RulesetEnum
+from tournapy.manager import TournamentManager
+elapsed = time.perf_counter() - start
+print(elapsed, 'pandas' in sys.modules, 'numpy' in sys.modules)
+'''
+
+if __name__ == '__main__':
+    limit = float(sys.argv[1]) if len(sys.argv) > 1 else 150.0
+    # best of a few fresh interpreters, the first one may also write the bytecode cache
+    runs = [subprocess.run([sys.executable, '-c', PROBE], capture_output=True, text=True, check=True).stdout.split()
+            for _ in range(5)]
+    elapsed = min(float(run[0]) for run in runs) * 1000
+    pandas_loaded = any(run[1] == 'True' for run in runs)
+    numpy_loaded = any(run[2] == 'True' for run in runs)
+    print(f'import tournapy: {elapsed:.1f} ms (limit {limit:.0f} ms), pandas loaded: {pandas_loaded}, '
+          f'numpy loaded: {numpy_loaded}')
+    if pandas_loaded or numpy_loaded or elapsed > limit:
+        print('REGRESSION')
+        sys.exit(1)
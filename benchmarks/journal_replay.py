@@ -0,0 +1,58 @@
+# Journal write latency (batched fsync) and replay throughput on 100k+ operations.
+# Run from repository root: python benchmarks/journal_replay.py [operations]
+import os
+import random
+import sys
+import tempfile
+import time
+
+from fixtures import ADMIN
+
+from tournapy import journal
+from tournapy.manager import TournamentManager
+
+PLAYERS = 128
+
+
+def run(manager: TournamentManager, operations: int, seed: int = 0):
+    # registrations, teams, a swiss stage and results, tournament after tournament
+    rng = random.Random(seed)
+    k = 0
+    while manager.journal.sequence < operations:
+        name = f'tournament {k}'
+        manager.create_tournament(name, 1, ADMIN, '')
+        for i in range(PLAYERS):
+            manager.add_player(name, f'player {i}', rng.randint(0, 1900), ADMIN)
+            manager.add_team(name, f'team {i}', f'player {i}', ADMIN)
+        manager.add_phase(name, 'swiss', 'Swiss-System', PLAYERS, 3, ADMIN)
+        manager.start_next_phase(name, ADMIN)
+        stage = manager.get_tournament(name).get_stage('swiss')
+        while stage.running:
+            match_id = next(iter(stage.match_queue))
+            blue = rng.randint(0, 5)
+            manager.report_match_result(name, 'swiss', match_id, blue,
+                                        blue + 1 if blue == 0 or rng.random() < 0.5 else blue - 1, ADMIN)
+        k += 1
+
+
+if __name__ == '__main__':
+    operations = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'tournaments.journal')
+        manager = TournamentManager()
+        manager.open_journal(path)
+        start = time.perf_counter()
+        run(manager, operations)
+        write_time = time.perf_counter() - start
+        written = manager.journal.sequence
+        manager.close_journal()
+
+        replayed = TournamentManager()
+        start = time.perf_counter()
+        journal.replay(replayed, path)
+        replay_time = time.perf_counter() - start
+        assert replayed.get_tournaments_list() == manager.get_tournaments_list()
+
+        print(f'{written} operations, journal size {os.path.getsize(path) / 2 ** 20:.2f} MiB')
+        print(f'live run with journal : {write_time:.2f} s ({written / write_time:,.0f} ops/s)')
+        print(f'replay                : {replay_time:.2f} s ({written / replay_time:,.0f} ops/s)')
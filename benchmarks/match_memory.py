@@ -0,0 +1,69 @@
+# Memory footprint of 100k finished BO5 matches, compared with the former dict/list based Match.
+# Run from repository root: python benchmarks/match_memory.py
+import math
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from tournapy.core.model import Match  # noqa: E402
+
+MATCHES = 100_000
+BO = 5
+
+
+class LegacyMatch:
+    # Match layout before __slots__ (instance dict + two python lists of per game scores)
+
+    def __init__(self, id: str, bo: int, blue_team: str, red_team: str):
+        self.id = id
+        self.bo = bo
+        self.blue_team = blue_team
+        self.red_team = red_team
+        self.blue_score: list[int] = []
+        self.red_score: list[int] = []
+        self.bo_blue_score: int = 0
+        self.bo_red_score: int = 0
+        self.ended = False
+
+    def add_game_result(self, blue_score: int, red_score: int):
+        self.blue_score.append(blue_score)
+        self.red_score.append(red_score)
+
+    def compute_bo(self) -> bool:
+        self.bo_blue_score = 0
+        self.bo_red_score = 0
+        for i in range(len(self.blue_score)):
+            self.bo_blue_score += 1 if (self.blue_score[i] > self.red_score[i]) else 0
+            self.bo_red_score += 1 if (self.red_score[i] > self.blue_score[i]) else 0
+        if self.bo_blue_score == math.ceil(self.bo / 2) or self.bo_red_score == math.ceil(self.bo / 2):
+            self.ended = True
+        return self.ended
+
+
+def build(cls) -> int:
+    teams = [f'team {i}' for i in range(1024)]
+    ids = [f'{i // 512}-{i % 512}' for i in range(MATCHES)]
+    tracemalloc.start()
+    matches = []
+    for i in range(MATCHES):
+        m = cls(ids[i], BO, teams[i % 1024], teams[(i + 1) % 1024])
+        for game in range(BO):
+            if m.ended:
+                break
+            m.add_game_result(3 + game % 2, 1 + game)
+            m.compute_bo()
+        matches.append(m)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size
+
+
+if __name__ == '__main__':
+    legacy = build(LegacyMatch)
+    slotted = build(Match)
+    print(f'{MATCHES} BO{BO} matches')
+    print(f'legacy  : {legacy / 2 ** 20:8.2f} MiB ({legacy / MATCHES:.0f} B/match)')
+    print(f'slotted : {slotted / 2 ** 20:8.2f} MiB ({slotted / MATCHES:.0f} B/match)')
+    print(f'saving  : {100 * (1 - slotted / legacy):.0f}%')
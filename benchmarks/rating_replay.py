@@ -0,0 +1,38 @@
+# Season replay of the rating engine: every match of many tournaments rated in one pass, then an
+# incremental update after one more tournament.
+# Run from repository root: python benchmarks/rating_replay.py [tournaments] [players]
+import sys
+import time
+
+from fixtures import build_manager, build_tournament, play
+
+from tournapy.core.ruleset import RulesetEnum
+from tournapy.rating import RatingEngine
+
+if __name__ == '__main__':
+    tournaments = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    players = int(sys.argv[2]) if len(sys.argv) > 2 else 128
+    manager = build_manager(tournaments, players)
+    season = list(manager.tourneys_dict.values())
+    matches = sum(len(stage.match_history) for t in season for stage in t.stages_dict.values())
+    for glicko in (False, True):
+        engine = RatingEngine(glicko=glicko)
+        start = time.perf_counter()
+        rated = engine.replay(season)
+        elapsed = time.perf_counter() - start
+        print(f'{"glicko" if glicko else "elo":<6} replay: {rated} of {matches} matches rated in '
+              f'{elapsed * 1000:.0f} ms ({rated / elapsed:,.0f} matches/s)')
+
+    # incremental: a new tournament ends, only its matches are rated
+    t = build_tournament('late tournament', players, 1, seed=tournaments)
+    stage = RulesetEnum.SWISS_SYSTEM.get_ruleset('swiss', players, 3)
+    t.add_phase(0, stage)
+    for team in sorted(t.teams_dict.values(), key=lambda team: team.elo, reverse=True):
+        stage.add_team(team)
+    stage.init_bracket()
+    stage.start()
+    play(stage, players * 5)
+    season.append(t)
+    start = time.perf_counter()
+    rated = engine.update(season)
+    print(f'incremental update: {rated} new matches rated in {(time.perf_counter() - start) * 1000:.1f} ms')
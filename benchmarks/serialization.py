@@ -0,0 +1,46 @@
+# Overlay polling: full JSON state of a large swiss tournament, then a delta after every reported game.
+# Run from repository root: python benchmarks/serialization.py [players]
+import io
+import random
+import sys
+import time
+
+from fixtures import build_tournament, play
+
+from tournapy import serialization
+from tournapy.core.ruleset import RulesetEnum
+
+if __name__ == '__main__':
+    players = int(sys.argv[1]) if len(sys.argv) > 1 else 4096
+    t = build_tournament('overlay', players)
+    stage = RulesetEnum.SWISS_SYSTEM.get_ruleset('swiss', players, 3)
+    t.add_phase(0, stage)
+    for team in sorted(t.teams_dict.values(), key=lambda team: team.elo, reverse=True):
+        stage.add_team(team)
+    stage.init_bracket()
+    stage.start()
+    play(stage, players)  # first two rounds
+    print(f'{players} players, {len(stage.match_history)} matches played, encoder {serialization.get_encoder()}')
+
+    start = time.perf_counter()
+    full = serialization.dumps(t)
+    print(f'full state: {len(full):>10,} bytes in {(time.perf_counter() - start) * 1000:8.2f} ms')
+    start = time.perf_counter()
+    serialization.write(t, io.BytesIO())
+    print(f'full stream:                  in {(time.perf_counter() - start) * 1000:8.2f} ms')
+
+    rng = random.Random(0)
+    since = serialization.cursor(t)
+    sizes = []
+    elapsed = 0
+    polls = 200
+    for _ in range(polls):
+        match = stage.get_match(next(iter(stage.match_queue)))
+        stage.report_match_result(match, rng.randint(0, 2), rng.randint(3, 5))
+        start = time.perf_counter()
+        payload = serialization.dumps(t, since)
+        elapsed += time.perf_counter() - start
+        sizes.append(len(payload))
+        since = serialization.cursor(t)
+    print(f'delta per game: {sum(sizes) / polls:>6,.0f} bytes in {elapsed / polls * 1000:8.3f} ms (mean of {polls}),'
+          f' largest {max(sizes):,} bytes')
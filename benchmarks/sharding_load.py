@@ -0,0 +1,77 @@
+# Multi-guild load test: every guild (tournament) registers its players, plays a swiss stage and renders
+# its tables, all guilds at once from client threads. Compares one in-process TournamentManager with a
+# ShardedTournamentManager; throughput can only scale up to the number of cores.
+# Run from repository root: python benchmarks/sharding_load.py [guilds] [players] [shards]
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fixtures import ADMIN
+
+from tournapy.manager import TournamentManager
+from tournapy.sharding import ShardedTournamentManager
+
+ROUNDS = 3
+
+
+class LocalManager(TournamentManager):
+    # views of the sharded manager, for the same workload in process
+
+    def df_teams(self, tournament_name: str):
+        return self.get_tournament(tournament_name).df_teams()
+
+    def get_standings(self, tournament_name: str, stage_name: str):
+        return self.get_tournament(tournament_name).get_stage(stage_name).get_standings()
+
+
+def guild(manager, name: str, players: int, seed: int) -> int:
+    # returns the number of commands sent
+    rng = random.Random(seed)
+    manager.create_tournament(name, 1, ADMIN, '')
+    manager.add_players(name, [(f'player {i}', rng.randint(0, 1900), f'team {i}') for i in range(players)], ADMIN)
+    manager.add_phase(name, 'swiss', 'Swiss-System', players, 3, ADMIN)
+    manager.start_next_phase(name, ADMIN)
+    commands = 4
+    for swiss_round in range(1, ROUNDS + 1):
+        for k in range(players // 2):
+            blue = rng.randint(1, 5)
+            winner_is_blue = rng.random() < 0.5
+            for _ in range(2):  # bo3 won 2-0
+                manager.report_match_result(name, 'swiss', f'{swiss_round}-{k}',
+                                            blue if winner_is_blue else blue - 1,
+                                            blue - 1 if winner_is_blue else blue, ADMIN)
+                commands += 1
+        manager.df_teams(name)
+        manager.get_standings(name, 'swiss')
+        commands += 2
+    return commands
+
+
+def load(manager, guilds: int, players: int, prefix: str = 'guild') -> float:
+    # commands per second
+    start = time.perf_counter()
+    with ThreadPoolExecutor(guilds) as clients:
+        commands = sum(clients.map(lambda k: guild(manager, f'{prefix} {k}', players, k), range(guilds)))
+    return commands / (time.perf_counter() - start)
+
+
+def warm_up(manager, shards: int):
+    # lazy imports (numpy, pandas) of every process are not measured
+    load(manager, 4 * shards, 4, 'warm up')
+
+
+if __name__ == '__main__':
+    guilds = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    players = int(sys.argv[2]) if len(sys.argv) > 2 else 256
+    shards = int(sys.argv[3]) if len(sys.argv) > 3 else os.cpu_count()
+    print(f'{guilds} guilds of {players} players, {os.cpu_count()} cores')
+    local = LocalManager()
+    warm_up(local, 1)
+    print(f'single process: {load(local, guilds, players):10,.0f} commands/s')
+    with ShardedTournamentManager(shards) as sharded:
+        warm_up(sharded, shards)
+        print(f'{shards} shards: {load(sharded, guilds, players):10,.0f} commands/s')
+        calls = sum(stats['calls'] for stats in sharded.metrics().values())
+        print(f'shards handled {calls} manager calls')
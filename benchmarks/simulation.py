@@ -0,0 +1,35 @@
+# Monte Carlo simulator throughput: one million simulations of a 64 teams single elimination bracket.
+# Run from repository root: python benchmarks/simulation.py [simulations] [processes]
+import sys
+import time
+
+from fixtures import build_pool, play
+
+from tournapy import simulation
+from tournapy.core.ruleset import RulesetEnum
+
+TEAMS = 64
+
+if __name__ == '__main__':
+    simulations = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    processes = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    stage = build_pool(RulesetEnum.SIMPLE_ELIMINATION.value, TEAMS, 3)
+    simulation.simulate(stage, 1000)  # warm up (numpy import)
+    start = time.perf_counter()
+    result = simulation.simulate(stage, simulations, seed=0, processes=processes)
+    elapsed = time.perf_counter() - start
+    print(f'{simulations} simulations of {TEAMS} teams single elimination: {elapsed:.2f} s '
+          f'({simulations / elapsed:,.0f} simulations/s)')
+    favourite = max(range(TEAMS), key=lambda i: result.win[i])
+    print(f'favourite: {result.teams[favourite]} (elo {stage.pool[favourite].elo}), '
+          f'win probability {result.win[favourite]:.3f}')
+
+    # partly played bracket: first round over
+    stage.init_bracket()
+    stage.start()
+    play(stage, TEAMS // 2)
+    start = time.perf_counter()
+    result = simulation.simulate(stage, simulations, seed=0, processes=processes)
+    elapsed = time.perf_counter() - start
+    contenders = sum(1 for w in result.win if w > 0)
+    print(f'after {TEAMS // 2} matches: {elapsed:.2f} s, teams with a chance to win: {contenders}')
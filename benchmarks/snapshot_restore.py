@@ -0,0 +1,30 @@
+# Snapshot / restore time of a manager holding hundreds of running tournaments.
+# Run from repository root: python benchmarks/snapshot_restore.py [tournaments] [players]
+import marshal
+import sys
+import time
+
+from fixtures import build_manager
+
+from tournapy import persistence
+
+if __name__ == '__main__':
+    tournaments = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    players = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    manager = build_manager(tournaments, players)
+    matches = sum(len(stage.bracket) for t in manager.tourneys_dict.values() for stage in t.stages_dict.values())
+
+    start = time.perf_counter()
+    data = persistence.dumps(manager.tourneys_dict)
+    dump_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    restored = persistence.loads(data)
+    load_time = time.perf_counter() - start
+
+    header = persistence._HEADER.size
+    assert marshal.loads(persistence.dumps(restored)[header:]) == marshal.loads(data[header:])
+    print(f'{tournaments} tournaments, {tournaments * players} players, {matches} matches')
+    print(f'snapshot size : {len(data) / 2 ** 20:.2f} MiB')
+    print(f'dump          : {dump_time * 1000:.1f} ms')
+    print(f'restore       : {load_time * 1000:.1f} ms')
@@ -0,0 +1,225 @@
+# Scaling benchmarks of the engine hot paths at 10^2 to 10^5 players/teams, on seeded synthetic data.
+# Reports latency per operation (best of --repeat runs) and peak traced memory of one run, and
+# compares them with the stored baseline (benchmarks/baseline.json). Exits with status 1 on regression.
+# Run from repository root:
+#   python benchmarks/suite.py [--sizes 100 1000] [--cases next_match df_teams] [--save]
+# Latencies only compare on the same machine: regenerate the baseline there with --save.
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from fixtures import build_pool, build_tournament
+
+from tournapy.core.ruleset import RulesetEnum
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+SIZES = [100, 1_000, 10_000, 100_000]
+TEAM_SIZE = 5
+
+
+def _finish(stage, match, rng: random.Random, report: bool = True):
+    while not match.ended:
+        blue = rng.randint(0, 5)
+        red = blue + 1 if blue == 0 or rng.random() < 0.5 else blue - 1
+        if report:
+            stage.report_match_result(match, blue, red)
+        else:
+            stage.add_game(match, blue, red)
+    if not report:
+        stage.close_match(match)
+
+
+def _started(rules_name: str, size: int, bo: int = 1):
+    stage = build_pool(rules_name, size, bo)
+    stage.init_bracket()
+    stage.start()
+    return stage
+
+
+def _played_round(size: int):
+    # swiss stage whose first round is over but not paired yet
+    stage = _started(RulesetEnum.SWISS_SYSTEM.value, size)
+    rng = random.Random(size)
+    for match_id in list(stage.match_queue):
+        _finish(stage, stage.get_match(match_id), rng, report=False)
+    return stage
+
+
+# case: (setup(size) -> state, run(state) -> number of operations done)
+
+def setup_generate_teams(size: int):
+    t = build_tournament('generate', 0, TEAM_SIZE)
+    rng = random.Random(size)
+    for i in range(size):
+        t.add_player(f'player {i}', rng.randint(0, 1900))
+    return t
+
+
+def run_generate_teams(t) -> int:
+    success, feedback = t.generate_teams()
+    assert success, feedback
+    return 1
+
+
+def setup_elimination_init(size: int):
+    return build_pool(RulesetEnum.SIMPLE_ELIMINATION.value, size, 1)
+
+
+def run_elimination_init(stage) -> int:
+    stage.init_bracket()
+    return 1
+
+
+def run_swiss_update(stage) -> int:
+    stage.update_bracket()
+    return 1
+
+
+def run_report(stage) -> int:
+    # one bo1 result per match of the first swiss round, the last one pairs round 2
+    rng = random.Random(0)
+    match_ids = list(stage.match_queue)
+    for match_id in match_ids:
+        _finish(stage, stage.get_match(match_id), rng)
+    return len(match_ids)
+
+
+def run_standings(stage) -> int:
+    stage.get_standings()
+    return 1
+
+
+def run_next_match(stage) -> int:
+    for team in stage.pool:
+        stage.next_match(team.name)
+    return len(stage.pool)
+
+
+def setup_tournament(size: int):
+    t = build_tournament('views', size, TEAM_SIZE)
+    t.add_phase(0, _played_round(size // TEAM_SIZE))
+    return t
+
+
+def _view(name: str):
+    def run(owner) -> int:
+        owner.touch()  # cold view, the cached one is a dict lookup
+        getattr(owner, name)()
+        return 1
+
+    return run
+
+
+CASES = {
+    'generate_teams': (setup_generate_teams, run_generate_teams),
+    'elimination_init_bracket': (setup_elimination_init, run_elimination_init),
+    'swiss_update_bracket': (_played_round, run_swiss_update),
+    'report_match_result': (lambda size: _started(RulesetEnum.SWISS_SYSTEM.value, size), run_report),
+    'get_standings': (_played_round, run_standings),
+    'next_match': (lambda size: _started(RulesetEnum.SWISS_SYSTEM.value, size), run_next_match),
+    'df_players': (setup_tournament, _view('df_players')),
+    'df_teams': (setup_tournament, _view('df_teams')),
+    'df_phases': (setup_tournament, _view('df_phases')),
+    'get_history': (_played_round, _view('get_history')),
+    'get_bracket': (_played_round, _view('get_bracket')),
+}
+
+
+def measure(case: str, size: int, repeat: int) -> dict:
+    setup, run = CASES[case]
+    latencies = []
+    for _ in range(repeat):
+        state = setup(size)
+        start = time.perf_counter()
+        operations = run(state)
+        latencies.append((time.perf_counter() - start) / operations)
+    state = setup(size)
+    tracemalloc.start()
+    run(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'latency': min(latencies), 'peak': peak}
+
+
+def compare(results: dict, baseline: dict, latency_tolerance: float, memory_tolerance: float) -> list[str]:
+    regressions = []
+    for key, result in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        if result['latency'] > reference['latency'] * (1 + latency_tolerance):
+            regressions.append(f'{key}: latency {_seconds(reference["latency"])} -> {_seconds(result["latency"])}')
+        if result['peak'] > reference['peak'] * (1 + memory_tolerance):
+            regressions.append(f'{key}: peak memory {_bytes(reference["peak"])} -> {_bytes(result["peak"])}')
+    return regressions
+
+
+def _seconds(value: float) -> str:
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if value >= scale:
+            return f'{value / scale:.2f} {unit}'
+    return f'{value / 1e-9:.0f} ns'
+
+
+def _bytes(value: int) -> str:
+    for unit, scale in (('MiB', 2 ** 20), ('KiB', 2 ** 10)):
+        if value >= scale:
+            return f'{value / scale:.1f} {unit}'
+    return f'{value} B'
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='tournapy scaling benchmarks')
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), default=list(CASES))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--save', action='store_true', help='store results as the new baseline')
+    parser.add_argument('--latency-tolerance', type=float, default=0.5)
+    parser.add_argument('--memory-tolerance', type=float, default=0.1)
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)['results']
+
+    results = {}
+    # generate_teams reads team names from resources/team_names.txt in working directory
+    with tempfile.TemporaryDirectory() as directory:
+        os.makedirs(os.path.join(directory, 'resources'))
+        with open(os.path.join(directory, 'resources', 'team_names.txt'), 'w') as f:
+            f.write('\n'.join(f'Team{i}' for i in range(max(args.sizes) // TEAM_SIZE + 1)))
+        cwd = os.getcwd()
+        os.chdir(directory)
+        try:
+            print(f'{"case":<26}{"size":>8}{"latency/op":>14}{"peak memory":>14}{"baseline":>14}')
+            for case in args.cases:
+                setup, run = CASES[case]
+                run(setup(min(args.sizes)))  # warm up: lazy imports (numpy, pandas) are not measured
+                for size in args.sizes:
+                    key = f'{case}/{size}'
+                    results[key] = measure(case, size, 1 if size >= 100_000 else args.repeat)
+                    reference = baseline.get(key)
+                    ratio = f'{results[key]["latency"] / reference["latency"]:.2f}x' if reference else '-'
+                    print(f'{case:<26}{size:>8}{_seconds(results[key]["latency"]):>14}'
+                          f'{_bytes(results[key]["peak"]):>14}{ratio:>14}', flush=True)
+        finally:
+            os.chdir(cwd)
+
+    if args.save:
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump({'python': sys.version.split()[0], 'results': baseline}, f, indent=1, sort_keys=True)
+        print(f'baseline saved to {args.baseline}')
+    else:
+        regressions = compare(results, baseline, args.latency_tolerance, args.memory_tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        if regressions:
+            sys.exit(1)
@@ -0,0 +1,38 @@
+# Swiss tiebreakers: every key of core.tiebreak for all teams of a large swiss stage, then a ranking on
+# points, Buchholz and Sonneborn-Berger as used to pair a round, against the default incremental ranking.
+# Run from repository root: python benchmarks/tiebreaks.py [players]
+import sys
+import time
+
+from fixtures import build_tournament, play
+
+from tournapy.core import tiebreak
+from tournapy.core.ruleset import RulesetEnum
+
+if __name__ == '__main__':
+    players = int(sys.argv[1]) if len(sys.argv) > 1 else 4096
+    t = build_tournament('tiebreaks', players)
+    stage = RulesetEnum.SWISS_SYSTEM.get_ruleset('swiss', players, 3)
+    t.add_phase(0, stage)
+    for team in sorted(t.teams_dict.values(), key=lambda team: team.elo, reverse=True):
+        stage.add_team(team)
+    stage.init_bracket()
+    stage.start()
+    play(stage, players)
+    print(f'{players} players, {len(stage.match_history)} matches played')
+    tiebreak.compute(stage.standings)  # numpy import not measured
+
+    repeat = 50
+    start = time.perf_counter()
+    for _ in range(repeat):
+        tiebreak.compute(stage.standings)
+    print(f'all tiebreaks:      {(time.perf_counter() - start) / repeat * 1000:8.3f} ms')
+    start = time.perf_counter()
+    for _ in range(repeat):
+        stage.get_ranking()
+    print(f'default ranking:    {(time.perf_counter() - start) / repeat * 1000:8.3f} ms')
+    stage.set_tiebreaks(('points', 'buchholz', 'sonneborn_berger'))
+    start = time.perf_counter()
+    for _ in range(repeat):
+        stage.get_ranking()
+    print(f'tiebreaks ranking:  {(time.perf_counter() - start) / repeat * 1000:8.3f} ms')
@@ -1,3 +1,10 @@
+import logging
+
+# Modules log to children of the 'tournapy' logger, silent until the application configures logging
+# (e.g. logging.basicConfig(level=logging.DEBUG)). Messages are formatted lazily and loops check
+# isEnabledFor once, so disabled logging only costs a level check.
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
 from tournapy import core
 from tournapy import manager
 from tournapy import tournament
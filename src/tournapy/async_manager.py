@@ -0,0 +1,222 @@
+import asyncio
+import contextlib
+import functools
+from concurrent.futures import Executor
+
+from tournapy.manager import TournamentManager
+from tournapy.tournament import Tournament
+
+
+class ReadWriteLock:
+    # asyncio lock letting readers in together and writers alone. Waiting writers block new readers.
+
+    def __init__(self):
+        self._condition = asyncio.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    @contextlib.asynccontextmanager
+    async def read(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: not self._writer and self._waiting_writers == 0)
+            self._readers += 1
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._readers -= 1
+                self._condition.notify_all()
+
+    @contextlib.asynccontextmanager
+    async def write(self):
+        async with self._condition:
+            self._waiting_writers += 1
+            try:
+                await self._condition.wait_for(lambda: not self._writer and self._readers == 0)
+            finally:
+                self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._writer = False
+                self._condition.notify_all()
+
+
+class AsyncTournamentManager:
+    # Asyncio facade of TournamentManager. Each tournament has its own read/write lock, so commands on
+    # different tournaments never wait for each other. Calls touching every tournament (create, delete,
+    # snapshot...) take the manager lock in write mode, the others take it in read mode.
+    # Slow calls (bulk registration, team generation, brackets, tables, persistence) run in `executor` (loop
+    # default if None).
+
+    def __init__(self, manager: TournamentManager = None, executor: Executor = None):
+        self.manager = manager if manager is not None else TournamentManager()
+        self.executor = executor
+        self._manager_lock = ReadWriteLock()
+        self._locks: dict[str, ReadWriteLock] = {}
+
+    def _lock(self, tournament_name: str) -> ReadWriteLock:
+        lock = self._locks.get(tournament_name)
+        if lock is None:
+            lock = self._locks[tournament_name] = ReadWriteLock()
+        return lock
+
+    async def _offload(self, func, *args, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(self.executor,
+                                                                functools.partial(func, *args, **kwargs))
+
+    async def _read(self, tournament_name: str, func, *args, offload: bool = False, **kwargs):
+        async with self._manager_lock.read(), self._lock(tournament_name).read():
+            if offload:
+                return await self._offload(func, *args, **kwargs)
+            return func(*args, **kwargs)
+
+    async def _write(self, tournament_name: str, func, *args, offload: bool = False, **kwargs):
+        async with self._manager_lock.read(), self._lock(tournament_name).write():
+            if offload:
+                return await self._offload(func, *args, **kwargs)
+            return func(*args, **kwargs)
+
+    async def _write_all(self, func, *args, offload: bool = False, **kwargs):
+        async with self._manager_lock.write():
+            if offload:
+                return await self._offload(func, *args, **kwargs)
+            return func(*args, **kwargs)
+
+    # reads
+
+    async def exists(self, tournament_name: str) -> bool:
+        return self.manager.exists(tournament_name)
+
+    async def is_admin(self, tournament_name: str, user_id: str) -> bool:
+        return await self._read(tournament_name, self.manager.is_admin, tournament_name, user_id)
+
+    async def get_tournaments_list(self) -> list[str]:
+        async with self._manager_lock.read():
+            return list(self.manager.get_tournaments_list())
+
+    async def get_tournament(self, tournament_name: str) -> Tournament:
+        return self.manager.get_tournament(tournament_name)
+
+    async def next_match(self, tournament_name: str, team_name: str):
+        def next_match():
+            t = self.manager.get_tournament(tournament_name)
+            return t.get_current_phase().next_match(team_name)
+
+        return await self._read(tournament_name, next_match)
+
+    async def next_matches(self, player_name: str) -> list:
+        # tournaments of the player are read one after the other, each under its own lock
+        async with self._manager_lock.read():
+            matches = []
+            for tournament_name in list(self.manager.player_tournaments.get(player_name, ())):
+                async with self._lock(tournament_name).read():
+                    matches += self.manager.next_matches_in(tournament_name, player_name)
+            return matches
+
+    async def get_state(self, tournament_name: str, since: list[int] = None) -> bytes:
+        return await self._read(tournament_name, self.manager.get_state, tournament_name, since)
+
+    async def df_players(self, tournament_name: str):
+        return await self._read(tournament_name, lambda: self.manager.get_tournament(tournament_name).df_players(),
+                                offload=True)
+
+    async def df_teams(self, tournament_name: str):
+        return await self._read(tournament_name, lambda: self.manager.get_tournament(tournament_name).df_teams(),
+                                offload=True)
+
+    async def df_phases(self, tournament_name: str):
+        return await self._read(tournament_name, lambda: self.manager.get_tournament(tournament_name).df_phases(),
+                                offload=True)
+
+    # writes
+
+    async def create_tournament(self, tournament_name: str, team_size: int, user_id: str, logo_url: str) -> bool:
+        return await self._write_all(self.manager.create_tournament, tournament_name, team_size, user_id, logo_url)
+
+    async def delete_tournament(self, tournament_name: str, user_id: str) -> (bool, str):
+        async with self._manager_lock.write():
+            success, feedback = self.manager.delete_tournament(tournament_name, user_id)
+            if success:
+                self._locks.pop(tournament_name, None)
+            return success, feedback
+
+    async def add_phase(self, tournament_name: str, phase_name: str, rules_name: str, pool_size: int, bo: int,
+                        user_id: str, double_round_robin: bool = False) -> (bool, str):
+        return await self._write(tournament_name, self.manager.add_phase, tournament_name, phase_name, rules_name,
+                                 pool_size, bo, user_id, double_round_robin)
+
+    async def set_tiebreaks(self, tournament_name: str, stage_name: str, tiebreaks, user_id: str) -> (bool, str):
+        return await self._write(tournament_name, self.manager.set_tiebreaks, tournament_name, stage_name,
+                                 tuple(tiebreaks), user_id)
+
+    async def start_next_phase(self, tournament_name: str, user_id: str) -> (bool, str):
+        return await self._write(tournament_name, self.manager.start_next_phase, tournament_name, user_id,
+                                 offload=True)
+
+    async def add_player(self, tournament_name: str, player_name: str, player_elo: int, user_id: str) -> (bool, str):
+        return await self._write(tournament_name, self.manager.add_player, tournament_name, player_name, player_elo,
+                                 user_id)
+
+    async def add_players(self, tournament_name: str, rows, user_id: str, atomic: bool = True) -> (bool, str):
+        return await self._write(tournament_name, self.manager.add_players, tournament_name,
+                                 tuple(tuple(row) for row in rows), user_id, atomic, offload=True)
+
+    async def import_players_csv(self, tournament_name: str, stream, user_id: str, atomic: bool = True) -> (bool, str):
+        # the stream is read in the executor too
+        return await self._write(tournament_name, self.manager.import_players_csv, tournament_name, stream, user_id,
+                                 atomic, offload=True)
+
+    async def set_players_elo(self, tournament_name: str, elos: dict[str, int], user_id: str) -> (bool, str):
+        return await self._write(tournament_name, self.manager.set_players_elo, tournament_name, dict(elos), user_id)
+
+    async def remove_player(self, tournament_name: str, player_name: str, user_id: str) -> (bool, str):
+        return await self._write(tournament_name, self.manager.remove_player, tournament_name, player_name, user_id)
+
+    async def add_team(self, tournament_name: str, team_name: str, players_name: str, user_id: str) -> (bool, str):
+        return await self._write(tournament_name, self.manager.add_team, tournament_name, team_name, players_name,
+                                 user_id)
+
+    async def form_teams(self, tournament_name: str, teams, user_id: str) -> (bool, str):
+        return await self._write(tournament_name, self.manager.form_teams, tournament_name,
+                                 tuple((team_name, tuple(players_names)) for team_name, players_names in teams),
+                                 user_id)
+
+    async def remove_team(self, tournament_name: str, team_name: str, user_id: str) -> (bool, str):
+        return await self._write(tournament_name, self.manager.remove_team, tournament_name, team_name, user_id)
+
+    async def clean_teams(self, tournament_name: str, user_id: str) -> (bool, str):
+        return await self._write(tournament_name, self.manager.clean_teams, tournament_name, user_id)
+
+    async def generate_teams(self, tournament_name: str, user_id: str, optimize: bool = False,
+                             time_budget: float = 0.1) -> (bool, str):
+        return await self._write(tournament_name, self.manager.generate_teams, tournament_name, user_id, optimize,
+                                 time_budget, offload=True)
+
+    async def report_match_result(self, tournament_name: str, stage_name: str, match_id: str, blue_score: int,
+                                  red_score: int, user_id: str) -> (bool, str):
+        return await self._write(tournament_name, self.manager.report_match_result, tournament_name, stage_name,
+                                 match_id, blue_score, red_score, user_id)
+
+    # persistence
+
+    async def snapshot(self, path: str) -> (bool, str):
+        # tournaments are only read, but every one of them must stay still while it is saved
+        return await self._write_all(self.manager.snapshot, path, offload=True)
+
+    async def restore(self, path: str) -> (bool, str):
+        return await self._write_all(self.manager.restore, path, offload=True)
+
+    async def checkpoint(self, path: str) -> (bool, str):
+        return await self._write_all(self.manager.checkpoint, path, offload=True)
+
+    async def open_journal(self, journal_path: str, checkpoint_path: str = None, **options) -> (bool, str):
+        return await self._write_all(self.manager.open_journal, journal_path, checkpoint_path, offload=True,
+                                     **options)
+
+    async def close_journal(self):
+        # pending records are synced to disk
+        return await self._write_all(self.manager.close_journal, offload=True)
@@ -0,0 +1,45 @@
+import csv
+
+
+class BulkResult:
+    # per row outcome of a bulk call: None when the row was applied, else the rejection reason
+
+    def __init__(self, rows_count: int):
+        self.errors: dict[int, str] = {}  # row index -> reason
+        self.rows_count = rows_count
+        self.applied = False
+
+    def reject(self, row: int, reason: str):
+        self.errors[row] = reason
+
+    @property
+    def ok(self) -> bool:
+        return len(self.errors) == 0
+
+    @property
+    def applied_count(self) -> int:
+        return self.rows_count - len(self.errors) if self.applied else 0
+
+    def statuses(self) -> list[str]:
+        return [self.errors.get(i) for i in range(self.rows_count)]
+
+    def __str__(self):
+        feedback = f'{self.applied_count}/{self.rows_count} rows applied'
+        if len(self.errors) != 0:
+            shown = list(self.errors.items())[:10]
+            feedback += f', {len(self.errors)} rejected: ' + '; '.join(f'row {i}: {reason}' for i, reason in shown)
+            if len(self.errors) > len(shown):
+                feedback += '; ...'
+        return feedback
+
+
+def read_players_csv(stream) -> list[tuple]:
+    # rows of player, elo[, team] ; a header line is skipped when its elo column is not a number
+    rows = []
+    for i, line in enumerate(csv.reader(stream)):
+        if len(line) == 0 or (len(line) == 1 and line[0].strip() == ''):
+            continue
+        if i == 0 and len(line) > 1 and not line[1].strip().lstrip('+-').isdigit():
+            continue
+        rows.append(tuple(cell.strip() for cell in line))
+    return rows
@@ -0,0 +1,125 @@
+import heapq
+import time
+
+from tournapy.core.model import Player
+
+
+class TeamSlot:
+
+    def __init__(self, name: str, size: int, elo_sum: int, capacity: int):
+        self.name = name
+        self.size = size  # players already in team before balancing
+        self.elo_sum = elo_sum
+        self.capacity = capacity
+        self.players: list[Player] = []  # players assigned by the balancer
+
+    @property
+    def elo(self) -> int:
+        if self.size != 0:
+            return int(self.elo_sum / self.size)
+        return 0
+
+    def __repr__(self):
+        return f'{self.name} ({self.elo_sum})'
+
+
+class BalanceResult:
+
+    def __init__(self, slots: list[TeamSlot], leftovers: list[Player], optimized: bool, swaps: int):
+        self.slots = slots
+        self.leftovers = leftovers  # players that did not fit in any open team
+        self.optimized = optimized
+        self.swaps = swaps
+
+    @property
+    def assignment(self) -> dict[str, list[Player]]:
+        return {s.name: s.players for s in self.slots}
+
+    @property
+    def spread(self) -> int:
+        # elo gap between the strongest and the weakest team
+        elos = [s.elo for s in self.slots if s.size != 0]
+        if len(elos) == 0:
+            return 0
+        return max(elos) - min(elos)
+
+
+def greedy_assign(slots: list[TeamSlot], players: list[Player]) -> list[Player]:
+    # Strongest player first, always given to the open team with the lowest elo sum.
+    # Ties are broken on slots order, like a stable sort would.
+    heap = [(s.elo_sum, i) for i, s in enumerate(slots) if s.size < s.capacity]
+    heapq.heapify(heap)
+    leftovers = []
+    for player in sorted(players, key=lambda p: p.elo, reverse=True):
+        if len(heap) == 0:
+            leftovers.append(player)
+            continue
+        elo_sum, i = heapq.heappop(heap)
+        slot = slots[i]
+        slot.players.append(player)
+        slot.size += 1
+        slot.elo_sum += player.elo
+        if slot.size < slot.capacity:
+            heapq.heappush(heap, (slot.elo_sum, i))
+    return leftovers
+
+
+def _best_swap(high: TeamSlot, low: TeamSlot):
+    # Looks for the swap of assigned players moving high and low elo sums closest to each other.
+    # Any elo delta strictly between 0 and the sums gap reduces the sum of squares of team sums.
+    gap = high.elo_sum - low.elo_sum
+    if gap <= 0:
+        return None
+    best = None
+    best_score = gap
+    for hp in high.players:
+        for lp in low.players:
+            delta = hp.elo - lp.elo
+            if 0 < delta < gap and abs(gap - 2 * delta) < best_score:
+                best_score = abs(gap - 2 * delta)
+                best = (hp, lp, delta)
+    return best
+
+
+def swap_search(slots: list[TeamSlot], time_budget: float) -> int:
+    # Local search swapping players between the strongest team and the others (then the weakest
+    # team and the others) until no improving swap exists or the time budget is spent.
+    deadline = time.perf_counter() + time_budget
+    swaps = 0
+    candidates = [s for s in slots if len(s.players) != 0]
+    while time.perf_counter() < deadline and len(candidates) > 1:
+        ordered = sorted(candidates, key=lambda s: s.elo_sum)
+        high = ordered[-1]
+        low = ordered[0]
+        swap = None
+        for other in ordered[:-1]:
+            swap = _best_swap(high, other)
+            if swap is not None:
+                low = other
+                break
+        if swap is None:
+            for other in reversed(ordered[1:]):
+                swap = _best_swap(other, low)
+                if swap is not None:
+                    high = other
+                    break
+        if swap is None:
+            break
+        hp, lp, delta = swap
+        high.players.remove(hp)
+        low.players.remove(lp)
+        high.players.append(lp)
+        low.players.append(hp)
+        high.elo_sum -= delta
+        low.elo_sum += delta
+        swaps += 1
+    return swaps
+
+
+def balance(slots: list[TeamSlot], players: list[Player], optimize: bool = False,
+            time_budget: float = 0.1) -> BalanceResult:
+    leftovers = greedy_assign(slots, players)
+    swaps = 0
+    if optimize:
+        swaps = swap_search(slots, time_budget)
+    return BalanceResult(slots, leftovers, optimize, swaps)
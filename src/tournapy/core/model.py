@@ -1,21 +1,69 @@
+import bisect
 import math
-from enum import Enum
+from array import array
+from enum import Enum, EnumMeta
 
-import pandas as pd
+from tournapy import presentation
 
 
-class Rank(Enum):
+class RankMeta(EnumMeta):
+    # Precomputes, once per Rank subclass, tiers sorted by elo threshold and label/elo lookup maps
+
+    def __new__(metacls, cls, bases, classdict, **kwds):
+        rank_class = super().__new__(metacls, cls, bases, classdict, **kwds)
+        tiers = sorted(rank_class, key=lambda e: e.value['elo'])
+        rank_class._tiers = tiers
+        rank_class._thresholds = [e.value['elo'] for e in tiers]
+        rank_class._by_label = {e.value['label']: e for e in tiers}
+        rank_class._by_elo = {}
+        for e in tiers:
+            rank_class._by_elo.setdefault(e.value['elo'], e)
+        return rank_class
+
+
+class Rank(Enum, metaclass=RankMeta):
+    # members values are {'label', 'elo', 'emoji'}, elo being the lowest elo of the tier
+
     @classmethod
     def from_label(cls, label: str):
-        for e in cls:
-            if e.value['label'] == label:
-                return e
+        return cls._by_label.get(label)
 
     @classmethod
     def from_elo(cls, elo: int):
-        for e in cls:
-            if elo == e.value['elo']:
-                return e
+        # tier starting exactly at elo, see classify for any elo
+        return cls._by_elo.get(elo)
+
+    @classmethod
+    def tiers(cls) -> list:
+        return list(cls._tiers)
+
+    @classmethod
+    def classify(cls, elo: float):
+        # tier containing elo (elo below the lowest tier gives the lowest tier)
+        if len(cls._tiers) == 0:
+            return None
+        return cls._tiers[max(bisect.bisect_right(cls._thresholds, elo) - 1, 0)]
+
+    @classmethod
+    def nearest(cls, elo: float):
+        # tier whose threshold is the closest to elo (the lower one on a tie)
+        if len(cls._tiers) == 0:
+            return None
+        i = bisect.bisect_left(cls._thresholds, elo)
+        if i == len(cls._thresholds) or (i > 0 and elo - cls._thresholds[i - 1] <= cls._thresholds[i] - elo):
+            i -= 1
+        return cls._tiers[i]
+
+    @classmethod
+    def classify_array(cls, elos) -> 'np.ndarray':
+        # classify for a whole array of elo values at once: indices in tiers()
+        import numpy as np
+        indices = np.searchsorted(np.asarray(cls._thresholds), np.asarray(elos), side='right') - 1
+        return np.maximum(indices, 0)
+
+    @classmethod
+    def classify_many(cls, elos) -> list:
+        return [cls._tiers[i] for i in cls.classify_array(elos).tolist()]
 
     @classmethod
     def as_list(cls) -> list[dict[str, int, str]]:
@@ -45,10 +93,7 @@ class Player:
         self.team = team
 
     def as_series(self):
-        return pd.Series(
-            [self.name, self.elo, self.team],
-            index=["name", "elo", "team"]
-        )
+        return presentation.series(presentation.player_row(self), presentation.PLAYER_COLUMNS)
 
     def __repr__(self):
         return f'{self.name} ({self.team})'
@@ -68,42 +113,81 @@ class Team:
         self.name = name
 
     def as_series(self):
-        return pd.Series([self.name, self.elo, self.points, self.goals_scored - self.goals_taken],
-                         index=["name", "elo", "points", "goals diff"])
+        return presentation.series(presentation.team_row(self), presentation.TEAM_COLUMNS)
 
     def __repr__(self):
         return f'{self.name} ({self.elo})'
 
 
 class Match:
+    __slots__ = ('id', 'bo', 'blue_team', 'red_team', 'games', 'games_played', 'bo_blue_score', 'bo_red_score',
+                 'ended')
 
     def __init__(self, id: str, bo: int, blue_team: str, red_team: str):
         self.id = id
         self.bo = bo
         self.blue_team = blue_team
         self.red_team = red_team
-        self.blue_score: list[int] = []
-        self.red_score: list[int] = []
+        # fixed size games scores: blue and red goals interleaved, only games_played first games are meaningful
+        self.games = array('i', bytes(8 * bo))
+        self.games_played: int = 0
         self.bo_blue_score: int = 0
         self.bo_red_score: int = 0
         self.ended = False
 
+    @property
+    def blue_score(self) -> list[int]:
+        return self.games[0:2 * self.games_played:2].tolist()
+
+    @property
+    def red_score(self) -> list[int]:
+        return self.games[1:2 * self.games_played:2].tolist()
+
     def __repr__(self):
         return f'{self.blue_team} VS {self.red_team}'
 
     def __json__(self, **options):
         return {self.blue_team: self.bo_blue_score, self.red_team: self.bo_red_score}
 
+    def _count_game(self, blue_score: int, red_score: int, delta: int):
+        if blue_score > red_score:
+            self.bo_blue_score += delta
+        elif red_score > blue_score:
+            self.bo_red_score += delta
+
+    def _check_ended(self):
+        to_win = math.ceil(self.bo / 2)
+        if self.bo_blue_score == to_win or self.bo_red_score == to_win:
+            self.ended = True
+
     def add_game_result(self, blue_score: int, red_score: int):
-        if len(self.blue_score) < self.bo and not self.ended:
-            self.blue_score.append(blue_score)
-            self.red_score.append(red_score)
+        if self.games_played < self.bo and not self.ended:
+            self.games[2 * self.games_played] = blue_score
+            self.games[2 * self.games_played + 1] = red_score
+            self.games_played += 1
+            self._count_game(blue_score, red_score, 1)
+            self._check_ended()
         else:
             raise Exception("BO is over, cannot add more games.")
 
     def set_result(self, game, blue_score: int, red_score: int):
-        self.blue_score[game - 1] = blue_score
-        self.red_score[game - 1] = red_score
+        if not 0 < game <= self.games_played:
+            raise IndexError(f'game {game} not played yet.')
+        i = 2 * (game - 1)
+        self._count_game(self.games[i], self.games[i + 1], -1)
+        self.games[i] = blue_score
+        self.games[i + 1] = red_score
+        self._count_game(blue_score, red_score, 1)
+        self._check_ended()
+
+    def walkover(self, winner: str):
+        # series won without playing, e.g. a bye
+        to_win = math.ceil(self.bo / 2)
+        if winner == self.blue_team:
+            self.bo_blue_score = to_win
+        else:
+            self.bo_red_score = to_win
+        self.ended = True
 
     def get_result(self):
         return [self.blue_team, self.blue_score,
@@ -111,15 +195,7 @@ class Match:
                 self.get_winner()]
 
     def compute_bo(self) -> bool:
-        self.bo_blue_score = 0
-        self.bo_red_score = 0
-        for i in range(len(self.blue_score)):
-            self.bo_blue_score += 1 if (self.blue_score[i] >
-                                        self.red_score[i]) else 0
-            self.bo_red_score += 1 if (self.red_score[i]
-                                       > self.blue_score[i]) else 0
-        if self.bo_blue_score == math.ceil(self.bo / 2) or self.bo_red_score == math.ceil(self.bo / 2):
-            self.ended = True
+        # series score is kept up to date by add_game_result and set_result
         return self.ended
 
     def get_winner(self) -> str:
@@ -0,0 +1,153 @@
+BYE = 'forfeit'
+
+
+def _pair_without_rematch(teams: list[str], opponents: dict[str, list[str]], max_backtracks: int):
+    # Depth first search pairing each top-most unpaired team with the closest ranked team it has not
+    # played yet. Closest candidates come first so teams are paired inside their score group, and float
+    # to the next group only when needed. Returns None if no such pairing was found within the budget.
+    n = len(teams)
+    used = [False] * n
+    pairs: list[tuple[int, int]] = []
+    backtracks = 0
+    i = 0
+    candidate = 1
+    while True:
+        while i < n and used[i]:
+            i += 1
+        if i >= n:
+            return [(teams[a], teams[b]) for a, b in pairs]
+        played = opponents.get(teams[i], ())
+        j = max(candidate, i + 1)
+        while j < n and (used[j] or teams[j] in played):
+            j += 1
+        if j < n:
+            used[i] = used[j] = True
+            pairs.append((i, j))
+            candidate = i + 1
+        else:
+            if len(pairs) == 0 or backtracks >= max_backtracks:
+                return None
+            backtracks += 1
+            i, j = pairs.pop()
+            used[i] = used[j] = False
+            candidate = j + 1
+
+
+def _max_matching(n: int, adjacency: list[list[int]], match: list[int]):
+    # Edmonds' blossom algorithm: grows match (vertex -> mate, -1 when free) into a maximum matching of the
+    # graph, by one augmenting path search per free vertex. Odd cycles (blossoms) are contracted to their base.
+    for root in range(n):
+        if match[root] != -1:
+            continue
+        parent = [-1] * n
+        base = list(range(n))
+        used = [False] * n
+        used[root] = True
+        queue = [root]
+
+        def lca(a: int, b: int) -> int:
+            seen = [False] * n
+            while True:
+                a = base[a]
+                seen[a] = True
+                if match[a] == -1:
+                    break
+                a = parent[match[a]]
+            while True:
+                b = base[b]
+                if seen[b]:
+                    return b
+                b = parent[match[b]]
+
+        def mark_path(v: int, blossom_base: int, child: int, blossom: list[bool]):
+            while base[v] != blossom_base:
+                blossom[base[v]] = blossom[base[match[v]]] = True
+                parent[v] = child
+                child = match[v]
+                v = parent[match[v]]
+
+        end = -1
+        k = 0
+        while k < len(queue) and end == -1:
+            v = queue[k]
+            k += 1
+            for to in adjacency[v]:
+                if base[v] == base[to] or match[v] == to:
+                    continue
+                if to == root or (match[to] != -1 and parent[match[to]] != -1):
+                    blossom_base = lca(v, to)
+                    blossom = [False] * n
+                    mark_path(v, blossom_base, to, blossom)
+                    mark_path(to, blossom_base, v, blossom)
+                    for i in range(n):
+                        if blossom[base[i]]:
+                            base[i] = blossom_base
+                            if not used[i]:
+                                used[i] = True
+                                queue.append(i)
+                elif parent[to] == -1:
+                    parent[to] = v
+                    if match[to] == -1:
+                        end = to
+                        break
+                    used[match[to]] = True
+                    queue.append(match[to])
+        while end != -1:  # flips the augmenting path
+            v = parent[end]
+            previous = match[v]
+            match[end] = v
+            match[v] = end
+            end = previous
+
+
+def _pair_by_matching(teams: list[str], opponents: dict[str, list[str]]) -> list[tuple[str, str]]:
+    # Pairing without rematch as a perfect matching of the graph of teams which have not played each other:
+    # found whenever one exists, unlike the bounded search. Starts from a closest ranked greedy pairing, so
+    # most pairs stay in their score group, then augments it. Returns None if every pairing has a rematch.
+    n = len(teams)
+    played = [set(opponents.get(team, ())) for team in teams]
+    adjacency = [[j for j in range(n) if j != i and teams[j] not in played[i]] for i in range(n)]
+    match = [-1] * n
+    for i in range(n):
+        if match[i] == -1:
+            j = next((j for j in adjacency[i] if j > i and match[j] == -1), -1)
+            if j != -1:
+                match[i], match[j] = j, i
+    _max_matching(n, adjacency, match)
+    if -1 in match:
+        return None
+    return [(teams[i], teams[match[i]]) for i in range(n) if i < match[i]]
+
+
+def _pair_greedy(teams: list[str], opponents: dict[str, list[str]]) -> list[tuple[str, str]]:
+    # rematches are allowed, but only when the team has already played every remaining team
+    free = list(teams)
+    pairs = []
+    while len(free) != 0:
+        blue = free.pop(0)
+        played = opponents.get(blue, ())
+        k = next((k for k, red in enumerate(free) if red not in played), 0)
+        pairs.append((blue, free.pop(k)))
+    return pairs
+
+
+def swiss_pairings(ranked_teams: list[str], opponents: dict[str, list[str]],
+                   max_backtracks: int = 10000) -> (list[tuple[str, str]], str):
+    # ranked_teams: teams to pair, best first. opponents: team -> teams already played (BYE for a bye).
+    # Returns the pairs (higher ranked team as blue) and the team getting a bye, if any.
+    teams = list(ranked_teams)
+    bye = None
+    if len(teams) % 2 == 1:
+        # lowest ranked team which did not already get a bye
+        bye_idx = len(teams) - 1
+        for k in range(len(teams) - 1, -1, -1):
+            if BYE not in opponents.get(teams[k], ()):
+                bye_idx = k
+                break
+        bye = teams.pop(bye_idx)
+    pairs = _pair_without_rematch(teams, opponents, max_backtracks)
+    if pairs is None:  # search budget exhausted: a pairing without rematch, if any, by matching
+        pairs = _pair_by_matching(teams, opponents)
+    if pairs is None:  # rematches cannot be avoided
+        pairs = _pair_greedy(teams, opponents)
+    return pairs, bye
@@ -1,15 +1,19 @@
-import itertools
+import logging
 import math
 from abc import ABC, abstractmethod
 from enum import Enum
 
-import pandas as pd
-
+from tournapy import events, presentation
+from tournapy.core import pairing, schedule, tiebreak
 from tournapy.core.model import Match, Team
+from tournapy.core.standings import Standings, StandingsTable, compute_standings
 
 WINNING_POINTS = 3
 LOSING_POINTS = 0
 DRAW_POINTS = 1
+SWISS_QUALIFIED_POINTS = 9  # swiss teams reaching this score are not paired anymore
+
+log = logging.getLogger(__name__)
 
 
 class RulesetEnum(Enum):
@@ -22,13 +26,13 @@ class RulesetEnum(Enum):
     def as_list(cls):
         return [e.value for e in cls]
 
-    def get_ruleset(self, name: str, pool_size: int, bo: int):
+    def get_ruleset(self, name: str, pool_size: int, bo: int, double_round_robin: bool = False):
         if self is RulesetEnum.SIMPLE_ELIMINATION:
             return SimpleElimination(name, self, pool_size, bo)
         if self is RulesetEnum.DOUBLE_ELIMINATION:
-            pass  # TODO: implement double elimination bracket
+            return DoubleElimination(name, self, pool_size, bo)
         if self is RulesetEnum.ROUND_ROBIN:
-            pass  # TODO: implement round robin bracket
+            return RoundRobin(name, self, pool_size, bo, double_round_robin)
         if self is RulesetEnum.SWISS_SYSTEM:
             return SwissSystem(name, self, pool_size, bo)
 
@@ -37,6 +41,9 @@ class RulesetEnum(Enum):
 
 
 class Ruleset(ABC):
+    # attributes saved as is in snapshots, on top of pool, matches, queue and history
+    _state_attributes = ('bracket_depth', 'running', 'tiebreaks')
+
     @abstractmethod
     def init_bracket(self):
         pass
@@ -45,11 +52,14 @@ class Ruleset(ABC):
     def report_match_result(self, match: Match, blue_score: int, red_score: int):
         pass
 
-    @abstractmethod
-    def next_match(self, team):
-        pass
-
     def __init__(self, name: str, rules_type: RulesetEnum, size: int, bo: int):
+        self.version = 0  # incremented on every change, tables views are cached per version
+        self._views: dict[str, tuple] = {}
+        # kind -> {key: version of its last change}, oldest first: 'match' id, 'history' index (match ended, its
+        # teams standings changed), 'team' added to the pool, 'bracket' None when bracket matches ids change.
+        # Only recorded once track_changes() was called, see tournapy.serialization
+        self.changes: dict[str, dict] = None
+        self.tournament_name: str = None  # set by Tournament.add_phase, for events
         self.name = name
         self.rules_type = rules_type
         self.pool: list[Team] = []
@@ -58,12 +68,46 @@ class Ruleset(ABC):
         self.match_history: list[Match] = []
         self.bracket_depth = 0
         self.bracket = {}
-        self.match_queue: list[str] = []
+        self.match_queue: dict[str, None] = {}  # ordered set of pending matches ids
+        self.pending: dict[str, dict[str, None]] = {}  # team (or placeholder) -> ordered pending matches ids
         self.running = False
+        self.standings = Standings(WINNING_POINTS, DRAW_POINTS, LOSING_POINTS)
+        self.tiebreaks: tuple[str, ...] = tiebreak.DEFAULT  # ranking keys, see set_tiebreaks
+        self._ranks: tuple = None  # (version, team name -> rank) for other tiebreaks than the default ones
+
+    def touch(self, kind: str = None, *keys):
+        self.version += 1
+        if self.changes is not None and kind is not None:
+            changes = self.changes[kind]
+            for key in keys:
+                changes.pop(key, None)  # moved to the end, changes stay ordered by version
+                changes[key] = self.version
+
+    def track_changes(self):
+        if self.changes is None:
+            self.changes = {'match': {}, 'history': {}, 'team': {}, 'bracket': {}}
+
+    def _reset_bracket(self):
+        self.bracket = {}
+        self.touch('bracket', None)
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    @running.setter
+    def running(self, running: bool):
+        ended = not running and getattr(self, '_running', False)
+        self._running = running
+        self.touch()
+        if ended:
+            events.emit('stage_ended', self.tournament_name, self.name)
 
     def add_team(self, team) -> bool:
         if len(self.pool) < self.pool_max_size:
             self.pool.append(team)
+            self.standings.add_team(team)
+            self.touch('team', team.name)
             return True
         else:
             return False
@@ -80,92 +124,128 @@ class Ruleset(ABC):
         return self.bracket[match_id]
 
     def get_history(self):
-        d = {}
-        for i in range(len(self.match_history)):
-            d[f'{i}'] = pd.Series(self.match_history[i].get_result(), index=[
-                "blue team", "blue score",
-                "red team", "red score",
-                "winner"])
-        return pd.DataFrame(d).T
+        return presentation.cached(self, 'history', self.version, presentation.history_frame)
 
     def start(self):
         self.running = True
+        events.emit('stage_started', self.tournament_name, self.name)
+
+    def get_bracket(self):
+        return presentation.cached(self, 'bracket', self.version, presentation.bracket_frame)
+
+    def get_standings(self) -> StandingsTable:
+        table = compute_standings([t.name for t in self.pool], self.match_history,
+                                  WINNING_POINTS, DRAW_POINTS, LOSING_POINTS)
+        for i, t in enumerate(self.pool):
+            t.points = int(table.points[i])
+            t.goals_scored = int(table.goals_for[i])
+            t.goals_taken = int(table.goals_against[i])
+        self.standings.load(table)
+        if self.tiebreaks != tiebreak.DEFAULT:  # table rows follow pool order, i.e. seeds
+            table.order = tiebreak.order(self.standings, self.tiebreaks)
+        self.touch()
+        return table
+
+    def set_tiebreaks(self, tiebreaks):
+        # ranking keys, best first, among tiebreak.KEYS: used to pair swiss rounds and to seed the next stage
+        self.tiebreaks = tiebreak.validate(tiebreaks)
+        self.touch()
+
+    def get_ranking(self) -> list[Team]:
+        return self.standings.ranked_by(self.tiebreaks)
+
+    def get_rank(self, team_name: str) -> int:
+        if self.tiebreaks == tiebreak.DEFAULT:
+            return self.standings.rank(team_name)
+        if self._ranks is None or self._ranks[0] != self.version:
+            self._ranks = (self.version, {team.name: i + 1 for i, team in enumerate(self.get_ranking())})
+        return self._ranks[1][team_name]
 
-    def get_bracket(self) -> pd.DataFrame:
-        return pd.DataFrame(self.bracket, index=["matches"]).T.sort_index(ascending=False)
+    def next_match(self, team):
+        matches_ids = self.pending.get(team)
+        if matches_ids:
+            return self.bracket[next(iter(matches_ids))]
+        return None
 
-    # @abstractmethod
-    def get_standings(self):
-        for t in self.pool:
-            t.points = 0
-            t.goals_scored = 0
-            t.goals_taken = 0
-        # print('standings>>>>')
-        for m in list(filter(lambda x: x.ended is True, self.match_history)):
-            # print(f'm.get_winner()={m.get_winner()}')
-            blue_team = self.get_team(m.blue_team)
-            red_team = self.get_team(m.red_team)
-            if red_team is None:
-                red_team = Team('forfeit')
-            blue_team.goals_scored += sum(m.blue_score)
-            blue_team.goals_taken += sum(m.red_score)
-            red_team.goals_scored += sum(m.red_score)
-            red_team.goals_taken += sum(m.blue_score)
-            if m.get_winner() == m.blue_team:
-                blue_team.points += WINNING_POINTS
-                red_team.points += LOSING_POINTS
-            elif m.get_winner() == m.red_team:
-                red_team.points += WINNING_POINTS
-                blue_team.points += LOSING_POINTS
-            else:
-                blue_team.points += DRAW_POINTS
-                red_team.points += DRAW_POINTS
-        # d = {}
-        # for i in range(len(self.pool)):
-        #     d[f'{i}'] = self.pool[i].as_series()
-        # return pd.DataFrame(d).T.sort_values(['points', 'goals diff'], ascending=[False, False], ignore_index=True)
+    def _index_team(self, team: str, match_id: str):
+        self.pending.setdefault(team, {})[match_id] = None
+
+    def _unindex_team(self, team: str, match_id: str):
+        matches_ids = self.pending.get(team)
+        if matches_ids is not None:
+            matches_ids.pop(match_id, None)
+            if len(matches_ids) == 0:
+                del self.pending[team]
+
+    def enqueue(self, match: Match):
+        if match.id not in self.bracket:
+            self.touch('bracket', None)
+        self.bracket[match.id] = match
+        self.match_queue[match.id] = None
+        self._index_team(match.blue_team, match.id)
+        self._index_team(match.red_team, match.id)
+        self.touch('match', match.id)
+        self._check_ready(match)
+
+    def set_match_team(self, match: Match, side: str, team: str):
+        # side is 'blue' or 'red'
+        if side == 'blue':
+            previous, match.blue_team = match.blue_team, team
+        else:
+            previous, match.red_team = match.red_team, team
+        queued = match.id in self.match_queue
+        if queued:
+            self._unindex_team(previous, match.id)
+            self._index_team(team, match.id)
+        self.touch('match', match.id)
+        if queued:
+            self._check_ready(match)
+
+    def close_match(self, match: Match):
+        self.match_queue.pop(match.id, None)
+        self._unindex_team(match.blue_team, match.id)
+        self._unindex_team(match.red_team, match.id)
+        self.match_history.append(match)
+        self.standings.record(match)
+        self.touch('history', len(self.match_history) - 1)
+        events.emit('match_ended', self.tournament_name, self.name, match)
+
+    def is_ready(self, match: Match) -> bool:
+        # both sides known, a team or a bye, not a placeholder (winner(...), loser(...))
+        teams = self.standings.teams
+        return (match.blue_team in teams or match.blue_team == pairing.BYE) and \
+            (match.red_team in teams or match.red_team == pairing.BYE)
+
+    def _check_ready(self, match: Match):
+        if self.is_ready(match):
+            events.emit('match_ready', self.tournament_name, self.name, match)
+
+    def add_game(self, match: Match, blue_score: int, red_score: int):
+        match.add_game_result(blue_score, red_score)
+        self.touch('match', match.id)
+        events.emit('game_reported', self.tournament_name, self.name, match)
 
     def as_series(self):
-        return pd.Series(
-            [self.name, self.pool_max_size, self.rules_type.value, self.running],
-            index=["name", "size", "type", "running"]
-        )
+        return presentation.series(presentation.ruleset_row(self), presentation.RULESET_COLUMNS)
 
 
 class SimpleElimination(Ruleset):
 
-    def next_match(self, team):
-        for m in list(map(self.get_match, self.match_queue)):
-            # m = self.get_match(m_id)
-            # print(f'team={team}')
-            if team == m.blue_team or team == m.red_team:
-                return m
-        return None
-
-    # def get_standings(self) -> pd.DataFrame:
-    #     pass
-
     def report_match_result(self, match: Match, blue_score: int, red_score: int):
         if self.running:
-            match.add_game_result(blue_score, red_score)
-            match.compute_bo()
+            self.add_game(match, blue_score, red_score)
             if match.ended:
-                print(f'match ended: {match}')
-                self.match_queue.remove(match.id)
-                self.match_history.append(match)
+                log.info('%s: match ended: %s', self.name, match)
+                self.close_match(match)
                 winner = match.get_winner()
                 next_match_team = f'winner({match.id})'
                 next_match = self.next_match(next_match_team)  # get next match for the winner
                 if next_match is not None:  # It was not the last match of the bracket
                     m: Match = self.bracket[next_match.id]
                     if next_match_team == next_match.blue_team:  # winner will play as blue team
-                        # self.bracket[next_match.id] = Match(
-                        #     next_match.id, next_match.bo, winner, next_match.red_team)
-                        m.blue_team = winner
+                        self.set_match_team(m, 'blue', winner)
                     elif next_match_team == next_match.red_team:  # winner will play as red team
-                        # self.bracket[next_match.id] = Match(
-                        #     next_match.id, next_match.bo, next_match.blue_team, winner)
-                        m.red_team = winner
+                        self.set_match_team(m, 'red', winner)
                     else:
                         raise Exception(
                             f"Cannot program next match for {winner}")
@@ -177,10 +257,11 @@ class SimpleElimination(Ruleset):
 
     def init_bracket(self) -> dict:
         no_of_teams = len(self.pool)
-        print(f'pool={self.pool}, {no_of_teams} teams')
+        log.debug('%s: pool=%s, %d teams', self.name, self.pool, no_of_teams)
 
         self.bracket_depth = int(math.ceil(math.log(no_of_teams, 2)))
-        self.bracket = {}
+        self._reset_bracket()
+        debug = log.isEnabledFor(logging.DEBUG)
         for local_round in range(self.bracket_depth):
             matches_count = int(math.pow(2, local_round))
             teams_in_round = matches_count * 2
@@ -193,115 +274,253 @@ class SimpleElimination(Ruleset):
                     blue_seed = i + 1
                     blue_team = self.pool[blue_seed - 1].name
                     red_seed = teams_in_round - i
-                    print(f'red_seed={red_seed}')
+                    if debug:
+                        log.debug('%s: red_seed=%d', self.name, red_seed)
                     try:
                         red_team = self.pool[red_seed - 1].name
                     except IndexError:  # there is no team to compete
                         red_team = 'forfeit'
-                self.match_queue.append(match_id)
-                self.bracket[match_id] = Match(
-                    match_id, self.bo, blue_team, red_team)
+                self.enqueue(Match(match_id, self.bo, blue_team, red_team))
 
+        events.emit('bracket_created', self.tournament_name, self.name)
         return self.bracket
 
 
 class DoubleElimination(Ruleset):
+    # Winners bracket matches are 'W{round}-{i}', losers bracket ones 'L{round}-{i}', then grand final
+    # 'GF-1' and its reset 'GF-2', played only if the losers bracket champion wins 'GF-1'.
+    # Where winner and loser of each match go is computed once in init_bracket (routing table), so
+    # reporting a result never searches the bracket.
+    _state_attributes = Ruleset._state_attributes + ('routing', 'awaiting')
+
+    def __init__(self, name: str, rules_type: RulesetEnum, size: int, bo: int):
+        Ruleset.__init__(self, name, rules_type, size, bo)
+        # match id -> (winner destination, loser destination), destination is (match id, side) or None
+        self.routing: dict[str, tuple] = {}
+        self.awaiting: dict[str, int] = {}  # match id -> number of teams still unknown
+
+    def _add_match(self, match_id: str, blue_team: str, red_team: str, awaiting: int):
+        m = Match(match_id, self.bo, blue_team, red_team)
+        self.bracket[match_id] = m
+        self.awaiting[match_id] = awaiting
+        self.touch('bracket', None)
+        self.touch('match', match_id)
+        return m
 
     def init_bracket(self):
-        pass
+        no_of_teams = len(self.pool)
+        log.debug('%s: pool=%s, %d teams', self.name, self.pool, no_of_teams)
+        self.bracket_depth = max(1, int(math.ceil(math.log(max(no_of_teams, 2), 2))))
+        k = self.bracket_depth
+        bracket_size = int(math.pow(2, k))
+        self._reset_bracket()
+        self.routing = {}
+        self.awaiting = {}
+        names = list(map(lambda t: t.name, self.pool)) + [pairing.BYE] * (bracket_size - no_of_teams)
+
+        # winners bracket
+        for i in range(bracket_size // 2):
+            self._add_match(f'W1-{i + 1}', names[i], names[bracket_size - 1 - i], 0)
+        for w_round in range(2, k + 1):
+            for i in range(1, bracket_size // int(math.pow(2, w_round)) + 1):
+                previous = w_round - 1
+                self._add_match(f'W{w_round}-{i}', f'winner(W{previous}-{2 * i - 1})',
+                                f'winner(W{previous}-{2 * i})', 2)
+                self.routing[f'W{previous}-{2 * i - 1}'] = [(f'W{w_round}-{i}', 'blue'), None]
+                self.routing[f'W{previous}-{2 * i}'] = [(f'W{w_round}-{i}', 'red'), None]
+
+        # losers bracket: odd rounds pair survivors together, even rounds take losers dropping from winners
+        for l_round in range(1, 2 * (k - 1) + 1):
+            matches_count = bracket_size // int(math.pow(2, (l_round + 1) // 2 + 1))
+            for i in range(1, matches_count + 1):
+                match_id = f'L{l_round}-{i}'
+                if l_round == 1:
+                    blue, red = f'W1-{2 * i - 1}', f'W1-{2 * i}'
+                    self._add_match(match_id, f'loser({blue})', f'loser({red})', 2)
+                    self.routing[blue][1] = (match_id, 'blue')
+                    self.routing[red][1] = (match_id, 'red')
+                elif l_round % 2 == 0:
+                    # dropping teams are crossed to delay rematches
+                    blue, red = f'L{l_round - 1}-{i}', f'W{l_round // 2 + 1}-{matches_count + 1 - i}'
+                    self._add_match(match_id, f'winner({blue})', f'loser({red})', 2)
+                    self.routing[blue][0] = (match_id, 'blue')
+                    self.routing.setdefault(red, [None, None])[1] = (match_id, 'red')
+                else:
+                    blue, red = f'L{l_round - 1}-{2 * i - 1}', f'L{l_round - 1}-{2 * i}'
+                    self._add_match(match_id, f'winner({blue})', f'winner({red})', 2)
+                    self.routing[blue][0] = (match_id, 'blue')
+                    self.routing[red][0] = (match_id, 'red')
+                self.routing.setdefault(match_id, [None, None])
+
+        # grand final
+        self._add_match('GF-1', f'winner(W{k}-1)', f'winner(L{2 * (k - 1)}-1)' if k > 1 else 'loser(W1-1)', 2)
+        self.routing.setdefault(f'W{k}-1', [None, None])[0] = ('GF-1', 'blue')
+        if k > 1:
+            self.routing[f'L{2 * (k - 1)}-1'][0] = ('GF-1', 'red')
+        else:
+            self.routing['W1-1'][1] = ('GF-1', 'red')
+        self._add_match('GF-2', 'winner(GF-1)', 'loser(GF-1)', 2)
+        for match_id in self.bracket.keys():
+            self.routing.setdefault(match_id, [None, None])
+        self.routing = {match_id: tuple(destinations) for match_id, destinations in self.routing.items()}
+
+        for m in self.bracket.values():
+            if m.id != 'GF-2':
+                self.enqueue(m)
+        for i in range(1, bracket_size // 2 + 1):  # byes of the first round
+            self._check_walkover(self.bracket[f'W1-{i}'])
+        events.emit('bracket_created', self.tournament_name, self.name)
+        return self.bracket
 
-    def report_match_result(self, match: Match, blue_score: int, red_score: int):
-        pass
+    def _check_walkover(self, match: Match):
+        if self.awaiting[match.id] == 0 and not match.ended and pairing.BYE in (match.blue_team, match.red_team):
+            match.walkover(match.red_team if match.blue_team == pairing.BYE else match.blue_team)
+            self.advance(match)
+
+    def _place(self, destination, team: str):
+        if destination is not None:
+            match_id, side = destination
+            m = self.bracket[match_id]
+            self.set_match_team(m, side, team)
+            self.awaiting[match_id] -= 1
+            self._check_walkover(m)
+
+    def advance(self, match: Match):
+        self.close_match(match)
+        winner = match.get_winner()
+        loser = match.red_team if winner == match.blue_team else match.blue_team
+        if match.id == 'GF-1':
+            if winner == match.blue_team:  # winners bracket champion wins the tournament
+                self.running = False
+            else:  # bracket reset
+                reset = self.bracket['GF-2']
+                reset.blue_team = match.blue_team
+                reset.red_team = match.red_team
+                self.awaiting['GF-2'] = 0
+                self.enqueue(reset)
+        elif match.id == 'GF-2':
+            self.running = False
+        else:
+            winner_destination, loser_destination = self.routing[match.id]
+            self._place(winner_destination, winner)
+            self._place(loser_destination, loser)
 
-    def next_match(self, team):
-        pass
+    def report_match_result(self, match: Match, blue_score: int, red_score: int):
+        if self.running:
+            self.add_game(match, blue_score, red_score)
+            if match.ended:
+                log.info('%s: match ended: %s', self.name, match)
+                self.advance(match)
+            return f'match {match} updated.'
+        else:
+            return f'Cannot report match {match} from {self.name} stage. Stage not started.'
 
 
 class RoundRobin(Ruleset):
+    _state_attributes = Ruleset._state_attributes + ('double_round_robin', 'round', 'max_rounds')
+
+    def __init__(self, name: str, rules_type: RulesetEnum, size: int, bo: int, double_round_robin: bool = False):
+        Ruleset.__init__(self, name, rules_type, size, bo)
+        self.double_round_robin = double_round_robin
+        self.round = 0
+        self.max_rounds = 0
 
     def init_bracket(self):
-        # TODO: use itertools.combinations
-        pass
+        no_of_teams = len(self.pool)
+        log.debug('%s: pool=%s, %d teams', self.name, self.pool, no_of_teams)
+        self.round = 0
+        self.max_rounds = schedule.rounds_count(no_of_teams, self.double_round_robin)
+        self.next_round()
+        events.emit('bracket_created', self.tournament_name, self.name)
+
+    def next_round(self):
+        # only current round matches are materialized, played ones remain in match_history
+        self._reset_bracket()
+        if self.round >= self.max_rounds:
+            return
+        self.round += 1
+        pairs = schedule.round_robin_round(list(map(lambda t: t.name, self.pool)), self.round - 1,
+                                           self.double_round_robin)
+        for i, (blue_team, red_team) in enumerate(pairs):
+            if pairing.BYE not in (blue_team, red_team):  # team facing the bye rests this round
+                self.enqueue(Match(f'{self.round}-{i}', self.bo, blue_team=blue_team, red_team=red_team))
+        events.emit('round_started', self.tournament_name, self.name, detail=self.round)
 
     def report_match_result(self, match: Match, blue_score: int, red_score: int):
-        pass
+        if self.running:
+            self.add_game(match, blue_score, red_score)
+            if match.ended:
+                log.info('%s: match ended: %s', self.name, match)
+                self.close_match(match)
+                self.update_bracket()
+            return f'match {match} updated.'
+        else:
+            return f'Cannot report match {match} from {self.name} stage. Stage not started.'
 
-    def next_match(self, team):
-        pass
+    def update_bracket(self):
+        if len(self.match_queue) == 0:
+            if self.round < self.max_rounds:
+                self.next_round()
+            else:
+                log.info('%s: all rounds finished. Stage is over', self.name)
+                self.running = False
 
 
 class SwissSystem(Ruleset):
+    _state_attributes = Ruleset._state_attributes + ('round', 'max_rounds')
 
     def __init__(self, name: str, rules_type: RulesetEnum, size: int, bo: int):
         Ruleset.__init__(self, name, rules_type, size, bo)
         self.round = 0
         self.max_rounds = 5
 
-    @staticmethod
-    def grouper(iterable, n):
-        # coming from https://docs.python.org/fr/3/library/itertools.html#itertools-recipes
-        args = [iter(iterable)] * n
-        print(f'args={args}')
-        return list(itertools.zip_longest(*args, fillvalue='forfeit'))
-
     def init_bracket(self):
         self.round = 1
         no_of_teams = len(self.pool)
-        print(f'pool={self.pool}, {no_of_teams} teams')
-
-        self.bracket = {}
-        groups: list[tuple[str]] = SwissSystem.grouper(list(map(lambda t: t.name, self.pool)), 2)
-        for group in groups:
-            print(f'group={group}')
-            match_id = f'{self.round}-{groups.index(group)}'
-            m = Match(match_id, self.bo, blue_team=group[0], red_team=group[1])
-            self.bracket[match_id] = m
-            self.match_queue.append(match_id)
+        log.debug('%s: pool=%s, %d teams', self.name, self.pool, no_of_teams)
+
+        self._reset_bracket()
+        self.pair_round(list(map(lambda t: t.name, self.pool)))
+        events.emit('bracket_created', self.tournament_name, self.name)
+
+    def pair_round(self, ranked_teams: list[str]):
+        # pairs ranked teams for current round, avoiding rematches. A bye is won without playing.
+        pairs, bye = pairing.swiss_pairings(ranked_teams, self.standings.opponents)
+        for i, (blue_team, red_team) in enumerate(pairs):
+            self.enqueue(Match(f'{self.round}-{i}', self.bo, blue_team=blue_team, red_team=red_team))
+        if bye is not None:
+            m = Match(f'{self.round}-{len(pairs)}', self.bo, blue_team=bye, red_team=pairing.BYE)
+            m.walkover(bye)
+            self.bracket[m.id] = m
+            self.touch('bracket', None)
+            self.close_match(m)
+        events.emit('round_started', self.tournament_name, self.name, detail=self.round)
 
     def report_match_result(self, match: Match, blue_score: int, red_score: int):
         if self.running:
-            match.add_game_result(blue_score, red_score)
-            match.compute_bo()
+            self.add_game(match, blue_score, red_score)
             if match.ended:
-                print(f'match ended: {match}')
-                self.match_queue.remove(match.id)
-                self.match_history.append(match)
+                log.info('%s: match ended: %s', self.name, match)
+                self.close_match(match)
                 self.update_bracket()
             return f'match {match} updated.'
         else:
             return f'Cannot report match {match} from {self.name} stage. Stage not started.'
 
-    def next_match(self, team):
-        for m in list(map(self.get_match, self.match_queue)):
-            # m = self.get_match(m_id)
-            # print(f'team={team}')
-            if team == m.blue_team or team == m.red_team:
-                return m
-        return None
-
     def update_bracket(self):
         if len(self.match_queue):
-            print(f'round {self.round} not yet finished.')
+            log.debug('%s: round %d not yet finished.', self.name, self.round)
         else:
-            print(f'round {self.round} finished.')
+            log.info('%s: round %d finished.', self.name, self.round)
             self.round += 1
             if self.round > self.max_rounds:
-                print('All rounds finished. Stage is over')
+                log.info('%s: all rounds finished. Stage is over', self.name)
                 self.running = False
 
             else:
-                print(f'Computing bracket for round {self.round}')
-                self.get_standings()
-                filtered_teams = list(filter(lambda t: t.points < 9, self.pool))
-                teams_sorted_ga = sorted(filtered_teams,
-                                         key=lambda team: (team.goals_scored - team.goals_taken),
-                                         reverse=True)
-                teams_sorted = sorted(teams_sorted_ga, key=lambda team: team.points, reverse=True)
-                print(f'teams_sorted={teams_sorted}')
-                groups: list[tuple[str]] = SwissSystem.grouper(list(map(lambda t: t.name, teams_sorted)), 2)
-                for group in groups:
-                    print(f'group={group}')
-                    match_id = f'{self.round}-{groups.index(group)}'
-                    m = Match(match_id, self.bo, blue_team=group[0], red_team=group[1])
-                    self.bracket[match_id] = m
-                    self.match_queue.append(match_id)
+                log.info('%s: computing bracket for round %d', self.name, self.round)
+                teams_sorted = list(filter(lambda t: t.points < SWISS_QUALIFIED_POINTS, self.get_ranking()))
+                log.debug('%s: teams_sorted=%s', self.name, teams_sorted)
+                self.pair_round(list(map(lambda t: t.name, teams_sorted)))
+                if len(self.match_queue) == 0:  # nothing to play this round (byes only)
+                    self.update_bracket()
@@ -0,0 +1,35 @@
+from tournapy.core.pairing import BYE
+
+
+def rounds_count(teams_count: int, double: bool = False) -> int:
+    if teams_count < 2:
+        return 0
+    rounds = teams_count - 1 if teams_count % 2 == 0 else teams_count
+    return 2 * rounds if double else rounds
+
+
+def round_robin_round(teams: list[str], round_idx: int, double: bool = False) -> list[tuple[str, str]]:
+    # Circle method: first team stays in place while the others rotate one step per round.
+    # Only the pairs of round round_idx (0 based) are computed, the full schedule is never built.
+    # Odd pools get a BYE slot: the team paired with it rests this round.
+    # Double round robin plays the same rounds again with sides swapped.
+    slots = list(teams) if len(teams) % 2 == 0 else list(teams) + [BYE]
+    n = len(slots)
+    single_rounds = n - 1
+    swap = False
+    if double and round_idx >= single_rounds:
+        round_idx -= single_rounds
+        swap = True
+
+    def slot(position: int) -> str:
+        if position == 0:
+            return slots[0]
+        return slots[1 + (position - 1 - round_idx) % single_rounds]
+
+    pairs = []
+    for k in range(n // 2):
+        blue, red = slot(k), slot(n - 1 - k)
+        if k == 0 and round_idx % 2 == 1:  # fixed team alternates sides
+            blue, red = red, blue
+        pairs.append((red, blue) if swap else (blue, red))
+    return pairs
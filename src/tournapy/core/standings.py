@@ -0,0 +1,205 @@
+import bisect
+import itertools
+from array import array
+
+from tournapy.core import tiebreak
+from tournapy.core.model import Match, Team
+
+
+class StandingsTable:
+
+    def __init__(self, names: list[str], points: 'np.ndarray', goals_for: 'np.ndarray', goals_against: 'np.ndarray',
+                 wins: 'np.ndarray', draws: 'np.ndarray', losses: 'np.ndarray'):
+        import numpy as np
+        self.names = names
+        self.points = points
+        self.goals_for = goals_for
+        self.goals_against = goals_against
+        self.goal_diff = goals_for - goals_against
+        self.wins = wins
+        self.draws = draws
+        self.losses = losses
+        # rank order: points, then goals diff, then pool order (seed)
+        self.order = np.lexsort((np.arange(len(names)), -self.goal_diff, -self.points))
+
+    def __len__(self):
+        return len(self.names)
+
+    def ranked_names(self) -> list[str]:
+        return [self.names[i] for i in self.order]
+
+    def rows(self) -> list[tuple]:
+        return [(self.names[i], int(self.points[i]), int(self.goals_for[i]), int(self.goals_against[i]),
+                 int(self.goal_diff[i])) for i in self.order]
+
+    def __repr__(self):
+        return f'StandingsTable({self.ranked_names()})'
+
+
+def compute_standings(team_names: list[str], matches: list[Match], winning_points: int, draw_points: int,
+                      losing_points: int) -> StandingsTable:
+    import numpy as np  # imported on first use, keeps the engine import light
+
+    n = len(team_names)
+    index = {name: i for i, name in enumerate(team_names)}
+    ended = [m for m in matches if m.ended]
+    m_count = len(ended)
+
+    # one row per match: team indices (-1 for teams out of the pool, e.g. 'forfeit') and series score
+    blue_idx = np.fromiter((index.get(m.blue_team, -1) for m in ended), dtype=np.intp, count=m_count)
+    red_idx = np.fromiter((index.get(m.red_team, -1) for m in ended), dtype=np.intp, count=m_count)
+    bo_blue = np.fromiter((m.bo_blue_score for m in ended), dtype=np.int64, count=m_count)
+    bo_red = np.fromiter((m.bo_red_score for m in ended), dtype=np.int64, count=m_count)
+
+    # one row per game, summed back per match
+    games = np.fromiter((len(m.blue_score) for m in ended), dtype=np.intp, count=m_count)
+    game_match = np.repeat(np.arange(m_count), games)
+    blue_goals = np.zeros(m_count, dtype=np.int64)
+    red_goals = np.zeros(m_count, dtype=np.int64)
+    np.add.at(blue_goals, game_match,
+              np.fromiter(itertools.chain.from_iterable(m.blue_score for m in ended), dtype=np.int64,
+                          count=len(game_match)))
+    np.add.at(red_goals, game_match,
+              np.fromiter(itertools.chain.from_iterable(m.red_score for m in ended), dtype=np.int64,
+                          count=len(game_match)))
+
+    blue_won = bo_blue > bo_red
+    red_won = bo_red > bo_blue
+    drawn = ~(blue_won | red_won)
+    blue_points = np.where(blue_won, winning_points, np.where(red_won, losing_points, draw_points))
+    red_points = np.where(red_won, winning_points, np.where(blue_won, losing_points, draw_points))
+
+    points = np.zeros(n, dtype=np.int64)
+    goals_for = np.zeros(n, dtype=np.int64)
+    goals_against = np.zeros(n, dtype=np.int64)
+    wins = np.zeros(n, dtype=np.int64)
+    draws = np.zeros(n, dtype=np.int64)
+    losses = np.zeros(n, dtype=np.int64)
+    for idx, pts, scored, taken, won, lost in ((blue_idx, blue_points, blue_goals, red_goals, blue_won, red_won),
+                                               (red_idx, red_points, red_goals, blue_goals, red_won, blue_won)):
+        valid = idx >= 0
+        i = idx[valid]
+        np.add.at(points, i, pts[valid])
+        np.add.at(goals_for, i, scored[valid])
+        np.add.at(goals_against, i, taken[valid])
+        np.add.at(wins, i, won[valid])
+        np.add.at(draws, i, drawn[valid])
+        np.add.at(losses, i, lost[valid])
+    return StandingsTable(list(team_names), points, goals_for, goals_against, wins, draws, losses)
+
+
+class Standings:
+    # Live standings of a stage: each finished match applies an O(1) delta to both teams and their
+    # entries in the sorted ranking are moved with bisect, instead of replaying the whole history.
+    # Stats are kept per stage (teams are shared between stages) and mirrored on Team objects.
+
+    def __init__(self, winning_points: int, draw_points: int, losing_points: int):
+        self.winning_points = winning_points
+        self.draw_points = draw_points
+        self.losing_points = losing_points
+        self.teams: dict[str, Team] = {}
+        self.seeds: dict[str, int] = {}
+        self._by_seed: list[Team] = []
+        self.points: list[int] = []  # indexed by seed
+        self.goals_scored: list[int] = []
+        self.goals_taken: list[int] = []
+        self._ranking: list[tuple[int, int, int]] = []  # sorted (-points, -goals diff, seed)
+        self.opponents: dict[str, list[str]] = {}  # team -> opponents faced, in order
+        # one entry per team and match played, for tiebreaks (see core.tiebreak): team seed, opponent seed
+        # (-1 for a bye or a team out of the pool) and result (2 win, 1 draw, 0 loss)
+        self.edge_teams = array('i')
+        self.edge_opponents = array('i')
+        self.edge_results = array('b')
+
+    def _key(self, seed: int) -> tuple[int, int, int]:
+        return -self.points[seed], self.goals_taken[seed] - self.goals_scored[seed], seed
+
+    def add_team(self, team: Team):
+        team.points = 0
+        team.goals_scored = 0
+        team.goals_taken = 0
+        seed = len(self._by_seed)
+        self.teams[team.name] = team
+        self.opponents[team.name] = []
+        self.seeds[team.name] = seed
+        self._by_seed.append(team)
+        self.points.append(0)
+        self.goals_scored.append(0)
+        self.goals_taken.append(0)
+        bisect.insort(self._ranking, self._key(seed))
+
+    def _apply(self, team: Team, points: int, scored: int, taken: int):
+        seed = self.seeds[team.name]
+        del self._ranking[bisect.bisect_left(self._ranking, self._key(seed))]
+        self.points[seed] += points
+        self.goals_scored[seed] += scored
+        self.goals_taken[seed] += taken
+        bisect.insort(self._ranking, self._key(seed))
+        team.points = self.points[seed]
+        team.goals_scored = self.goals_scored[seed]
+        team.goals_taken = self.goals_taken[seed]
+
+    def record(self, match: Match):
+        winner = match.get_winner()
+        blue_goals = sum(match.blue_score)
+        red_goals = sum(match.red_score)
+        if winner == match.blue_team:
+            blue_points, red_points = self.winning_points, self.losing_points
+        elif winner == match.red_team:
+            blue_points, red_points = self.losing_points, self.winning_points
+        else:
+            blue_points, red_points = self.draw_points, self.draw_points
+        if match.blue_team in self.teams:
+            self._apply(self.teams[match.blue_team], blue_points, blue_goals, red_goals)
+            self.opponents[match.blue_team].append(match.red_team)
+        if match.red_team in self.teams:
+            self._apply(self.teams[match.red_team], red_points, red_goals, blue_goals)
+            self.opponents[match.red_team].append(match.blue_team)
+        self._add_edges(match, winner)
+
+    def index_history(self, matches: list[Match]):
+        # tiebreaks entries of a restored stage, whose stats are given to set_stats
+        for match in matches:
+            self._add_edges(match, match.get_winner())
+
+    def _add_edges(self, match: Match, winner: str):
+        blue = self.seeds.get(match.blue_team, -1)
+        red = self.seeds.get(match.red_team, -1)
+        blue_result = 2 if winner == match.blue_team else 0 if winner == match.red_team else 1
+        if blue != -1:
+            self.edge_teams.append(blue)
+            self.edge_opponents.append(red)
+            self.edge_results.append(blue_result)
+        if red != -1:
+            self.edge_teams.append(red)
+            self.edge_opponents.append(blue)
+            self.edge_results.append(2 - blue_result)
+
+    def load(self, table: StandingsTable):
+        # replaces stats with a full replay result (same teams, same order)
+        self.set_stats(table.points.tolist(), table.goals_for.tolist(), table.goals_against.tolist(),
+                       [self.opponents[team.name] for team in self._by_seed])
+
+    def set_stats(self, points: list[int], goals_scored: list[int], goals_taken: list[int],
+                  opponents: list[list[str]]):
+        # restores stats saved from another Standings with the same teams, ranking is sorted once
+        self.points = list(points)
+        self.goals_scored = list(goals_scored)
+        self.goals_taken = list(goals_taken)
+        self.opponents = {team.name: list(team_opponents) for team, team_opponents in zip(self._by_seed, opponents)}
+        self._ranking = sorted(self._key(seed) for seed in range(len(self._by_seed)))
+
+    def rank(self, team_name: str) -> int:
+        return bisect.bisect_left(self._ranking, self._key(self.seeds[team_name])) + 1
+
+    def ranked_teams(self) -> list[Team]:
+        return [self._by_seed[key[2]] for key in self._ranking]
+
+    def ranked_by(self, tiebreaks: tuple[str, ...]) -> list[Team]:
+        # ranking on other keys than points and goals diff, computed at once (see core.tiebreak)
+        if tiebreaks == tiebreak.DEFAULT:
+            return self.ranked_teams()
+        return [self._by_seed[seed] for seed in tiebreak.order(self, tiebreaks)]
+
+    def __len__(self):
+        return len(self._by_seed)
@@ -0,0 +1,67 @@
+# Tiebreakers of a stage, computed for every team in one NumPy pass over Standings edges (one entry per
+# team and match played, opponent seed and result):
+# - buchholz: sum of opponents points
+# - median_buchholz: buchholz without the best and worst opponents (with 3 opponents or more)
+# - sonneborn_berger: opponents points weighted by the result against them (1 win, 0.5 draw)
+# - opponent_win_pct: mean of opponents match win rates, each floored at OPPONENT_WIN_FLOOR
+# plus standings stats: points, goals_diff, goals_scored, wins. Byes count in the team record only.
+# A ranking is an ordering on several of these keys, best first, then seed (pool order).
+STATISTICS = ('points', 'goals_diff', 'goals_scored', 'wins')
+TIEBREAKS = ('buchholz', 'median_buchholz', 'sonneborn_berger', 'opponent_win_pct')
+KEYS = STATISTICS + TIEBREAKS
+DEFAULT = ('points', 'goals_diff')  # the incremental ranking of Standings
+OPPONENT_WIN_FLOOR = 1 / 3
+
+
+def validate(keys) -> tuple[str, ...]:
+    keys = tuple(keys)
+    unknown = [key for key in keys if key not in KEYS]
+    if len(unknown) != 0:
+        raise ValueError(f'Unknown tiebreak {", ".join(unknown)} (expected {", ".join(KEYS)})')
+    if len(keys) == 0:
+        raise ValueError('At least one tiebreak is needed')
+    return keys
+
+
+def compute(standings, keys=KEYS) -> dict[str, 'np.ndarray']:
+    # key -> value of every team, indexed by seed
+    import numpy as np
+    n = len(standings)
+    points = np.asarray(standings.points, dtype=np.float64)
+    values = {'points': points,
+              'goals_diff': np.asarray(standings.goals_scored, dtype=np.float64) - standings.goals_taken,
+              'goals_scored': np.asarray(standings.goals_scored, dtype=np.float64)}
+    if not any(key in keys for key in TIEBREAKS + ('wins',)):
+        return values
+    teams = np.frombuffer(standings.edge_teams, dtype=np.int32)
+    opponents = np.frombuffer(standings.edge_opponents, dtype=np.int32)
+    results = np.frombuffer(standings.edge_results, dtype=np.int8) / 2
+    values['wins'] = np.bincount(teams, weights=results == 1, minlength=n)
+    win_rate = np.maximum(np.bincount(teams, weights=results, minlength=n) /
+                          np.maximum(np.bincount(teams, minlength=n), 1), OPPONENT_WIN_FLOOR)
+    # faced opponents only: byes and teams out of the pool are not opponents
+    faced = opponents >= 0
+    teams, opponents, results = teams[faced], opponents[faced], results[faced]
+    faced_count = np.bincount(teams, minlength=n)
+    opponent_points = points[opponents]
+    buchholz = np.bincount(teams, weights=opponent_points, minlength=n)
+    best = np.full(n, -np.inf)
+    worst = np.full(n, np.inf)
+    np.maximum.at(best, teams, opponent_points)
+    np.minimum.at(worst, teams, opponent_points)
+    best[faced_count == 0] = 0
+    worst[faced_count == 0] = 0
+    values['buchholz'] = buchholz
+    values['median_buchholz'] = np.where(faced_count >= 3, buchholz - best - worst, buchholz)
+    values['sonneborn_berger'] = np.bincount(teams, weights=opponent_points * results, minlength=n)
+    values['opponent_win_pct'] = np.bincount(teams, weights=win_rate[opponents], minlength=n) / \
+        np.maximum(faced_count, 1)
+    return values
+
+
+def order(standings, keys: tuple[str, ...]) -> list[int]:
+    # seeds, best first
+    import numpy as np
+    values = compute(standings, keys)
+    # lexsort: last key is the primary one
+    return np.lexsort((np.arange(len(standings)),) + tuple(-values[key] for key in reversed(keys))).tolist()
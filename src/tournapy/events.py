@@ -0,0 +1,161 @@
+# Process wide event bus: rulesets and TournamentManager emit events as they change, consumers subscribe
+# instead of polling next_match, match_queue or running.
+# - subscribe(callback): callback(event) is called synchronously, in the emitting thread
+# - stream(): asyncio async iterator, fed from any thread through its loop
+# Both may filter on event kinds and tournament. emit() returns at once when nobody subscribed.
+# Within muted(), events emitted by the current thread are dropped (journal replay, restore, simulations).
+# Stage events: 'bracket_created', 'round_started' (detail: round), 'match_ready' (both sides known),
+# 'game_reported', 'match_ended', 'stage_started', 'stage_ended'. Manager events are named after the
+# successful mutating call ('create_tournament', 'add_player', 'report_match_result'...), detail being its
+# arguments after the tournament name.
+import collections
+import contextlib
+import logging
+import threading
+
+log = logging.getLogger(__name__)
+
+
+class Event:
+    __slots__ = ('kind', 'tournament', 'stage', 'match', 'detail')
+
+    def __init__(self, kind: str, tournament: str = None, stage: str = None, match=None, detail=None):
+        self.kind = kind
+        self.tournament = tournament
+        self.stage = stage
+        self.match = match
+        self.detail = detail
+
+    def __repr__(self):
+        where = '/'.join(name for name in (self.tournament, self.stage) if name is not None)
+        return f'{self.kind}({where}{", " + self.match.id if self.match is not None else ""})'
+
+
+class Subscription:
+
+    def __init__(self, bus: 'EventBus', callback, kinds, tournament: str):
+        self.bus = bus
+        self.callback = callback
+        self.kinds = frozenset(kinds) if kinds is not None else None
+        self.tournament = tournament
+
+    def accepts(self, event: Event) -> bool:
+        return (self.kinds is None or event.kind in self.kinds) and \
+            (self.tournament is None or event.tournament == self.tournament)
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class EventStream(Subscription):
+    # bounded queue: when a slow consumer lets it fill up, oldest events are dropped (and counted)
+
+    def __init__(self, bus: 'EventBus', kinds, tournament: str, maxsize: int, loop: 'asyncio.AbstractEventLoop'):
+        Subscription.__init__(self, bus, self._receive, kinds, tournament)
+        self.loop = loop
+        self.queue = collections.deque(maxlen=maxsize)
+        self.dropped = 0
+        self.closed = False
+        self._waiter: 'asyncio.Future' = None
+        self._thread_id = threading.get_ident()
+
+    def _receive(self, event: Event):
+        if threading.get_ident() == self._thread_id:
+            self._push(event)
+        else:
+            self.loop.call_soon_threadsafe(self._push, event)
+
+    def _push(self, event: Event):
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+        self.queue.append(event)
+        self._wake()
+
+    def _wake(self):
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Event:
+        while len(self.queue) == 0:
+            if self.closed:
+                raise StopAsyncIteration
+            self._waiter = self.loop.create_future()
+            await self._waiter
+        return self.queue.popleft()
+
+    def close(self):
+        Subscription.close(self)
+        self.closed = True
+        if threading.get_ident() == self._thread_id:
+            self._wake()
+        else:
+            self.loop.call_soon_threadsafe(self._wake)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+
+class EventBus:
+
+    def __init__(self):
+        # replaced, never mutated: emit() iterates without lock while other threads subscribe
+        self.subscriptions: tuple[Subscription, ...] = ()
+        self._lock = threading.Lock()
+        self._muted = threading.local()  # depth of nested muted() of each thread
+
+    def subscribe(self, callback, kinds=None, tournament: str = None) -> Subscription:
+        return self._add(Subscription(self, callback, kinds, tournament))
+
+    def stream(self, kinds=None, tournament: str = None, maxsize: int = 1000) -> EventStream:
+        # from a coroutine: async for event in bus.stream(): ...
+        import asyncio  # imported on first use, keeps the engine import light
+        return self._add(EventStream(self, kinds, tournament, maxsize, asyncio.get_running_loop()))
+
+    def _add(self, subscription: Subscription):
+        with self._lock:
+            self.subscriptions = self.subscriptions + (subscription,)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self.subscriptions = tuple(s for s in self.subscriptions if s is not subscription)
+
+    @contextlib.contextmanager
+    def muted(self):
+        depth = getattr(self._muted, 'depth', 0)
+        self._muted.depth = depth + 1
+        try:
+            yield
+        finally:
+            self._muted.depth = depth
+
+    def emit(self, kind: str, tournament: str = None, stage: str = None, match=None, detail=None):
+        subscriptions = self.subscriptions
+        if not subscriptions or getattr(self._muted, 'depth', 0):
+            return
+        event = Event(kind, tournament, stage, match, detail)
+        for subscription in subscriptions:
+            if subscription.accepts(event):
+                try:
+                    subscription.callback(event)
+                except Exception:  # a consumer must not break the change that emitted
+                    log.exception('%s subscriber failed on %s', subscription.callback, event)
+
+
+bus = EventBus()
+emit = bus.emit
+subscribe = bus.subscribe
+stream = bus.stream
+muted = bus.muted
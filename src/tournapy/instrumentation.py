@@ -0,0 +1,103 @@
+# Metrics of the engine (logging goes to the 'tournapy' logger, see tournapy/__init__.py).
+# TournamentManager methods decorated with @timed count their calls, rejections (False result),
+# errors (exceptions) and duration in manager.metrics, exported as a dict or as Prometheus text.
+import functools
+import threading
+import time
+
+
+class OperationStats:
+    __slots__ = ('calls', 'rejected', 'errors', 'seconds_total', 'seconds_max')
+
+    def __init__(self):
+        self.calls = 0
+        self.rejected = 0
+        self.errors = 0
+        self.seconds_total = 0.0
+        self.seconds_max = 0.0
+
+    def as_dict(self) -> dict:
+        return {attribute: getattr(self, attribute) for attribute in self.__slots__}
+
+
+class Metrics:
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.operations: dict[str, OperationStats] = {}
+        self._lock = threading.Lock()  # offloaded calls (see async_manager) may record concurrently
+
+    def record(self, operation: str, seconds: float, rejected: bool = False, error: bool = False):
+        with self._lock:
+            stats = self.operations.get(operation)
+            if stats is None:
+                stats = self.operations[operation] = OperationStats()
+            stats.calls += 1
+            stats.rejected += rejected
+            stats.errors += error
+            stats.seconds_total += seconds
+            if seconds > stats.seconds_max:
+                stats.seconds_max = seconds
+
+    def reset(self):
+        with self._lock:
+            self.operations = {}
+
+    def snapshot(self) -> dict[str, dict]:
+        with self._lock:
+            return {operation: stats.as_dict() for operation, stats in self.operations.items()}
+
+    def prometheus(self, prefix: str = 'tournapy') -> str:
+        return prometheus(self.snapshot(), prefix)
+
+
+def merge(snapshots: list[dict[str, dict]]) -> dict[str, dict]:
+    # sums snapshots of several managers (e.g. shards), keeping the longest call
+    merged: dict[str, dict] = {}
+    for snapshot in snapshots:
+        for operation, stats in snapshot.items():
+            total = merged.setdefault(operation, OperationStats().as_dict())
+            for attribute, value in stats.items():
+                total[attribute] = max(total[attribute], value) if attribute == 'seconds_max' \
+                    else total[attribute] + value
+    return merged
+
+
+def prometheus(snapshot: dict[str, dict], prefix: str = 'tournapy') -> str:
+    # Prometheus text exposition format, one series per operation
+    families = (('calls_total', 'calls', 'counter', 'Manager calls.'),
+                ('rejected_total', 'rejected', 'counter', 'Manager calls answered with a failure.'),
+                ('errors_total', 'errors', 'counter', 'Manager calls which raised an exception.'),
+                ('seconds_total', 'seconds_total', 'counter', 'Time spent in manager calls.'),
+                ('seconds_max', 'seconds_max', 'gauge', 'Longest manager call.'))
+    lines = []
+    for suffix, attribute, kind, description in families:
+        name = f'{prefix}_operation_{suffix}'
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} {kind}')
+        for operation in sorted(snapshot):
+            lines.append(f'{name}{{operation="{operation}"}} {snapshot[operation][attribute]}')
+    return '\n'.join(lines) + '\n'
+
+
+def timed(method):
+    # Decorator of TournamentManager methods, recording to self.metrics under the method name.
+    # A result which is False, or a tuple starting with False, counts as rejected.
+    operation = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        metrics = self.metrics
+        if not metrics.enabled:
+            return method(self, *args, **kwargs)
+        start = time.perf_counter()
+        try:
+            result = method(self, *args, **kwargs)
+        except Exception:
+            metrics.record(operation, time.perf_counter() - start, error=True)
+            raise
+        rejected = result is False or (type(result) is tuple and len(result) != 0 and result[0] is False)
+        metrics.record(operation, time.perf_counter() - start, rejected)
+        return result
+
+    return wrapper
@@ -0,0 +1,135 @@
+import marshal
+import os
+import struct
+import threading
+import time
+import zlib
+
+# Each record: payload length, crc32 of payload, sequence number, then (operation, args) encoded with marshal.
+# A torn or corrupted tail (crash during a write) is detected by length/crc and ignored on read.
+_RECORD = struct.Struct('>IIQ')
+
+
+class JournalError(Exception):
+    pass
+
+
+class Journal:
+
+    def __init__(self, path: str, batch_size: int = 64, flush_interval: float = 0.05, autoflush: bool = True,
+                 sequence: int = None):
+        # Records are written at once but fsync-ed by batches: after batch_size records, or at most
+        # flush_interval seconds after the first unsynced record (background flusher when autoflush).
+        # sequence: last sequence already used (e.g. by a checkpoint), the journal's last one by default.
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # a torn record left by a crash is cut, otherwise records appended after it would be unreadable
+        last_sequence, valid_length = 0, 0
+        for valid_length, last_sequence, _ in _scan(_read_bytes(path)):
+            pass
+        if os.path.exists(path) and os.path.getsize(path) > valid_length:
+            os.truncate(path, valid_length)
+        self.sequence = last_sequence if sequence is None else max(sequence, last_sequence)
+        self._file = open(path, 'ab')
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        self._first_unsynced = 0.0
+        self._closed = threading.Event()
+        self._flusher = None
+        if autoflush:
+            self._flusher = threading.Thread(target=self._flush_loop, name='tournapy-journal', daemon=True)
+            self._flusher.start()
+
+    def append(self, operation: str, args: tuple) -> int:
+        payload = marshal.dumps((operation, args))
+        with self._lock:
+            if self._file is None:
+                raise JournalError(f'Journal {self.path} is closed.')
+            self.sequence += 1
+            self._file.write(_RECORD.pack(len(payload), zlib.crc32(payload), self.sequence) + payload)
+            if self._unsynced == 0:
+                self._first_unsynced = time.monotonic()
+            self._unsynced += 1
+            if self._unsynced >= self.batch_size:
+                self._sync()
+            return self.sequence
+
+    def _sync(self):
+        if self._unsynced:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+
+    def sync(self):
+        with self._lock:
+            if self._file is not None:
+                self._sync()
+
+    def _flush_loop(self):
+        while not self._closed.wait(self.flush_interval):
+            with self._lock:
+                if self._file is not None and self._unsynced and \
+                        time.monotonic() - self._first_unsynced >= self.flush_interval:
+                    self._sync()
+
+    def truncate(self):
+        # drops every record, to be called once they are all saved in a checkpoint
+        with self._lock:
+            self._sync()
+            self._file.truncate(0)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        with self._lock:
+            if self._file is not None:
+                self._sync()
+                self._file.close()
+                self._file = None
+
+
+def _read_bytes(path: str) -> bytes:
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return b''
+
+
+def _scan(data: bytes):
+    # yields (end offset, sequence, payload) of every complete record
+    offset = 0
+    while offset + _RECORD.size <= len(data):
+        length, crc, sequence = _RECORD.unpack_from(data, offset)
+        start = offset + _RECORD.size
+        payload = data[start:start + length]
+        if len(payload) < length or zlib.crc32(payload) != crc:
+            return
+        offset = start + length
+        yield offset, sequence, payload
+
+
+def read(path: str):
+    # yields (sequence, operation, args) of every complete record
+    for _, sequence, payload in _scan(_read_bytes(path)):
+        operation, args = marshal.loads(payload)
+        yield sequence, operation, args
+
+
+def replay(manager, path: str, after: int = 0) -> int:
+    # applies journaled operations newer than `after` to manager, returns the last applied sequence
+    journal = manager.journal
+    manager.journal = None
+    last = after
+    try:
+        for sequence, operation, args in read(path):
+            if sequence > after:
+                getattr(manager, operation)(*args)
+                last = sequence
+    finally:
+        manager.journal = journal
+    return last
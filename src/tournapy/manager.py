@@ -1,11 +1,46 @@
+import logging
+import os
+
+from tournapy import events, instrumentation, journal, persistence, serialization
+from tournapy.bulk import read_players_csv
+from tournapy.core.model import Match
 from tournapy.core.ruleset import RulesetEnum
+from tournapy.instrumentation import timed
 from tournapy.tournament import Tournament
 
+log = logging.getLogger(__name__)
+
 
 class TournamentManager:
 
     def __init__(self):
         self.tourneys_dict: dict[str, Tournament] = {}
+        self.journal: journal.Journal = None
+        self.metrics = instrumentation.Metrics()
+        # player name -> ordered set of the tournaments they are registered to, see next_matches
+        self.player_tournaments: dict[str, dict[str, None]] = {}
+
+    def _record(self, operation: str, *args):
+        # journals a successful mutating call, replayed as getattr(manager, operation)(*args), and emits it
+        if self.journal is not None:
+            self.journal.append(operation, args)
+        events.emit(operation, args[0], detail=args[1:])
+
+    def _index_player(self, tournament_name: str, player_name: str):
+        self.player_tournaments.setdefault(player_name, {})[tournament_name] = None
+
+    def _unindex_player(self, tournament_name: str, player_name: str):
+        tournaments = self.player_tournaments.get(player_name)
+        if tournaments is not None:
+            tournaments.pop(tournament_name, None)
+            if len(tournaments) == 0:
+                del self.player_tournaments[player_name]
+
+    def _reindex_players(self):
+        self.player_tournaments = {}
+        for tournament_name, t in self.tourneys_dict.items():
+            for player_name in t.players_dict:
+                self._index_player(tournament_name, player_name)
 
     def is_admin(self, tournament_name: str, user_id: str) -> bool:
         if self.exists(tournament_name):
@@ -14,41 +49,74 @@ class TournamentManager:
     def exists(self, tournament_name: str):
         return tournament_name in self.tourneys_dict.keys()
 
+    @timed
     def create_tournament(self, tournament_name: str, team_size: int, user_id: str, logo_url: str) -> bool:
         if not self.exists(tournament_name):
             tourney = Tournament()
             tourney.setup(user_id, tournament_name, team_size)
             tourney.logo_url = logo_url
             self.tourneys_dict[tournament_name] = tourney
+            self._record('create_tournament', tournament_name, team_size, user_id, logo_url)
             return True
         else:
             return False
 
+    @timed
     def delete_tournament(self, tournament_name: str, user_id: str) -> (bool, str):
         if self.exists(tournament_name):
             if self.is_admin(tournament_name, user_id):
+                for player_name in self.tourneys_dict[tournament_name].players_dict:
+                    self._unindex_player(tournament_name, player_name)
                 del self.tourneys_dict[tournament_name]
+                self._record('delete_tournament', tournament_name, user_id)
                 return True, f'Tournament {tournament_name} deleted.'
             else:
                 return False, f'Cannot delete tournament {tournament_name}. Missing admin rights.'
         else:
             return False, f'No tournament {tournament_name} existing.'
 
+    @timed
     def add_phase(self, tournament_name: str, phase_name: str, rules_name: str, pool_size: int, bo: int,
-                  user_id: str) -> (bool, str):
+                  user_id: str, double_round_robin: bool = False) -> (bool, str):
         if self.exists(tournament_name):
             if self.is_admin(tournament_name, user_id):
-                ruleset = RulesetEnum(rules_name).get_ruleset(
-                    phase_name, pool_size, bo)
+                rules_type = RulesetEnum(rules_name)
+                if double_round_robin and rules_type is not RulesetEnum.ROUND_ROBIN:
+                    return False, f'{phase_name} phase cannot be added to {tournament_name}. ' \
+                                  f'Only a {RulesetEnum.ROUND_ROBIN} phase can be double.'
+                ruleset = rules_type.get_ruleset(phase_name, pool_size, bo, double_round_robin)
                 t: Tournament = self.tourneys_dict[tournament_name]
                 t.add_phase(len(t.stages_dict), ruleset)
-                print(f'team.stages_dict={t.stages_dict}')
+                log.debug('%s: stages_dict=%s', tournament_name, t.stages_dict)
+                self._record('add_phase', tournament_name, phase_name, rules_name, pool_size, bo, user_id,
+                             double_round_robin)
                 return True, f'{phase_name} phase added to {tournament_name} tournament.'
             else:
                 return False, f'{phase_name} phase cannot be added to {tournament_name}. Missing admin rights.'
         else:
             return False, f'{tournament_name} does not exist.'
 
+    @timed
+    def set_tiebreaks(self, tournament_name: str, stage_name: str, tiebreaks, user_id: str) -> (bool, str):
+        # ranking keys of a stage, see core.tiebreak
+        if self.exists(tournament_name):
+            if self.is_admin(tournament_name, user_id):
+                stage = self.tourneys_dict[tournament_name].get_stage(stage_name)
+                if stage is None:
+                    return False, f'No {stage_name} stage in {tournament_name}.'
+                tiebreaks = tuple(tiebreaks)
+                try:
+                    stage.set_tiebreaks(tiebreaks)
+                except ValueError as e:
+                    return False, str(e)
+                self._record('set_tiebreaks', tournament_name, stage_name, tiebreaks, user_id)
+                return True, f'{stage_name} teams ranked by {", ".join(tiebreaks)}.'
+            else:
+                return False, f'Cannot set {stage_name} tiebreaks. Missing admin rights.'
+        else:
+            return False, f'{tournament_name} does not exist.'
+
+    @timed
     def start_next_phase(self, tournament_name: str, user_id: str) -> (bool, str):
         if self.exists(tournament_name):
             if self.is_admin(tournament_name, user_id):
@@ -56,16 +124,12 @@ class TournamentManager:
                 # Retrieve list of teams eligible for next phase:
                 # 1st case: no phase performed yet, every team should be added
                 if t.current_phase_idx == 0:
-                    teams_names = t.df_teams()['name']
+                    teams_names = list(map(lambda team: team.name,
+                                           sorted(t.teams_dict.values(), key=lambda team: team.elo, reverse=True)))
                 # 2nd case: get list of teams sorted by their rankings.
                 else:
                     previous_phase = t.get_phase(t.current_phase_idx - 1)
-                    # TODO implement & use tournament standings
-                    teams_sorted_ga = sorted(t.teams_dict.values(),
-                                             key=lambda team: (team.goals_scored - team.goals_taken),
-                                             reverse=True)
-                    teams_sorted = sorted(teams_sorted_ga, key=lambda team: team.points, reverse=True)
-                    teams_names = list(map(lambda team: team.name, teams_sorted))
+                    teams_names = list(map(lambda team: team.name, previous_phase.get_ranking()))
                 next_phase = t.get_current_phase()
                 # adding previously retrieved list of teams. Will be added following team rank from previous phase.
                 # will not accept team if next phase pool is complete.
@@ -75,6 +139,7 @@ class TournamentManager:
                 if not next_phase.running:
                     next_phase.init_bracket()
                     next_phase.start()
+                    self._record('start_next_phase', tournament_name, user_id)
                     # TODO find a way to increment stage automatically at end of previous stage
                     # t.current_phase_idx += 1
                     return True, f'{next_phase.name} phase started.'
@@ -85,6 +150,7 @@ class TournamentManager:
         else:
             return False, f'{tournament_name} does not exist.'
 
+    @timed
     def add_player(self, tournament_name: str, player_name: str, player_elo: int, user_id: str) -> (bool, str):
         # user_id = user.id of admin or user.name of player
         if self.exists(tournament_name):
@@ -92,6 +158,8 @@ class TournamentManager:
             if self.is_admin(tournament_name, user_id) or player_name == user_id:
                 t: Tournament = self.tourneys_dict[tournament_name]
                 if t.add_player(player_name, player_elo):
+                    self._index_player(tournament_name, player_name)
+                    self._record('add_player', tournament_name, player_name, player_elo, user_id)
                     return True, f'{player_name} player registered to {tournament_name}'
                 else:
                     return False, f'{player_name} already registered to {tournament_name}'
@@ -101,6 +169,51 @@ class TournamentManager:
             return (
                 False, f'{player_name} player cannot be registered to {tournament_name}. Tournament does not exists')
 
+    @timed
+    def add_players(self, tournament_name: str, rows, user_id: str, atomic: bool = True) -> (bool, str):
+        # bulk registration of (player, elo[, team]) rows, see Tournament.add_players. Succeeds when every row
+        # was applied or, not atomic, when some were (the feedback lists rejected rows)
+        return self._add_players(tournament_name, rows, user_id, atomic)
+
+    def _add_players(self, tournament_name: str, rows, user_id: str, atomic: bool) -> (bool, str):
+        if self.exists(tournament_name):
+            if self.is_admin(tournament_name, user_id):
+                t: Tournament = self.tourneys_dict[tournament_name]
+                rows = tuple(tuple(row) for row in rows)
+                result = t.add_players(rows, atomic)
+                if result.applied:
+                    for i, row in enumerate(rows):
+                        if i not in result.errors:
+                            self._index_player(tournament_name, row[0])
+                    self._record('add_players', tournament_name, rows, user_id, atomic)
+                return result.ok or result.applied_count != 0, f'{tournament_name}: {result}'
+            else:
+                return False, f'Players cannot be registered to {tournament_name}. Missing admin rights'
+        else:
+            return False, f'Players cannot be registered to {tournament_name}. Tournament does not exists'
+
+    @timed
+    def set_players_elo(self, tournament_name: str, elos: dict[str, int], user_id: str) -> (bool, str):
+        # bulk elo update (e.g. from tournapy.rating), only changed elos of registered players are journaled
+        if self.exists(tournament_name):
+            if self.is_admin(tournament_name, user_id):
+                t: Tournament = self.tourneys_dict[tournament_name]
+                elos = {name: int(elo) for name, elo in elos.items()
+                        if name in t.players_dict and t.players_dict[name].elo != int(elo)}
+                if len(elos) != 0:
+                    t.set_players_elo(elos)
+                    self._record('set_players_elo', tournament_name, elos, user_id)
+                return True, f'{len(elos)} players elo updated in {tournament_name}'
+            else:
+                return False, f'Cannot update players elo of {tournament_name}. Missing admin rights'
+        else:
+            return False, f'Tournament {tournament_name} does not exists'
+
+    @timed
+    def import_players_csv(self, tournament_name: str, stream, user_id: str, atomic: bool = True) -> (bool, str):
+        return self._add_players(tournament_name, read_players_csv(stream), user_id, atomic)
+
+    @timed
     def remove_player(self, tournament_name: str, player_name: str, user_id: str) -> (bool, str):
         # user_id = user.id of admin or user.name of player
         if self.exists(tournament_name):
@@ -108,6 +221,8 @@ class TournamentManager:
             if self.is_admin(tournament_name, user_id) or player_name == user_id:
                 t: Tournament = self.tourneys_dict[tournament_name]
                 t.remove_player(player_name)
+                self._unindex_player(tournament_name, player_name)
+                self._record('remove_player', tournament_name, player_name, user_id)
                 return True, f'{player_name} player unregistered from {tournament_name}'
             else:
                 return (
@@ -117,52 +232,192 @@ class TournamentManager:
                 False,
                 f'{player_name} player cannot be unregistered from {tournament_name}. Tournament does not exists')
 
+    @timed
     def add_team(self, tournament_name: str, team_name: str, players_name: str, user_id: str) -> (bool, str):
         if self.exists(tournament_name):
             if self.is_admin(tournament_name, user_id) or user_id in players_name:
                 t: Tournament = self.tourneys_dict[tournament_name]
                 success, feedback = t.add_to_team(team_name, players_name)
+                if success:
+                    self._record('add_team', tournament_name, team_name, players_name, user_id)
                 return success, feedback
             else:
                 return False, f'Cannot form a team. Missing admin rights'
         else:
             return False, f'Tournament {tournament_name} does not exists'
 
+    @timed
     def remove_team(self, tournament_name: str, team_name: str, user_id: str) -> (bool, str):
         if self.exists(tournament_name):
             if self.is_admin(tournament_name, user_id):
                 t: Tournament = self.tourneys_dict[tournament_name]
                 success, feedback = t.remove_team(team_name)
+                if success:
+                    self._record('remove_team', tournament_name, team_name, user_id)
                 return success, feedback
             else:
                 return False, f'Cannot remove a team. Missing admin rights'
         else:
             return False, f'Tournament {tournament_name} does not exists'
 
+    @timed
     def clean_teams(self, tournament_name: str, user_id: str) -> (bool, str):
         if self.exists(tournament_name):
             if self.is_admin(tournament_name, user_id):
                 t: Tournament = self.tourneys_dict[tournament_name]
                 success, feedback = t.clear_teams()
+                if success:
+                    self._record('clean_teams', tournament_name, user_id)
                 return success, feedback
             else:
                 return False, f'Cannot clear teams. Missing admin rights'
         else:
             return False, f'Tournament {tournament_name} does not exists'
 
-    def generate_teams(self, tournament_name: str, user_id: str) -> (bool, str):
+    @timed
+    def form_teams(self, tournament_name: str, teams, user_id: str) -> (bool, str):
+        # (team name, players names) pairs, see Tournament.form_teams
+        if self.exists(tournament_name):
+            if self.is_admin(tournament_name, user_id):
+                t: Tournament = self.tourneys_dict[tournament_name]
+                teams = tuple((team_name, tuple(players_names)) for team_name, players_names in teams)
+                success, feedback = t.form_teams(teams)
+                if success:
+                    self._record('form_teams', tournament_name, teams, user_id)
+                return success, feedback
+            else:
+                return False, f'Cannot form teams. Missing admin rights'
+        else:
+            return False, f'Tournament {tournament_name} does not exists'
+
+    @timed
+    def generate_teams(self, tournament_name: str, user_id: str, optimize: bool = False,
+                       time_budget: float = 0.1) -> (bool, str):
         if self.exists(tournament_name):
             if self.is_admin(tournament_name, user_id):
                 t: Tournament = self.tourneys_dict[tournament_name]
-                success, feedback = t.generate_teams()
+                previous_teams = set(t.teams_dict)
+                free_players = set(name for name, p in t.players_dict.items() if p.team is None)
+                success, feedback = t.generate_teams(optimize, time_budget)
+                if success:
+                    # teams names are drawn randomly: the resulting teams, new ones (even empty) and players
+                    # dispatched in each, are journaled (and emitted) instead of the call
+                    teams = tuple((team_name, tuple(p.name for p in t.get_team_players(team_name)
+                                                    if p.name in free_players))
+                                  for team_name in t.teams_dict)
+                    teams = tuple((team_name, players_names) for team_name, players_names in teams
+                                  if team_name not in previous_teams or len(players_names) != 0)
+                    self._record('form_teams', tournament_name, teams, user_id)
+                    events.emit('generate_teams', tournament_name, detail=(user_id, optimize, time_budget))
                 return success, feedback
             else:
                 return False, f'Cannot generate teams. Missing admin rights'
         else:
             return False, f'Tournament {tournament_name} does not exists'
 
+    @timed
+    def report_match_result(self, tournament_name: str, stage_name: str, match_id: str, blue_score: int,
+                            red_score: int, user_id: str) -> (bool, str):
+        # admins or players of the match can report a game result
+        if self.exists(tournament_name):
+            t: Tournament = self.tourneys_dict[tournament_name]
+            stage = t.get_stage(stage_name)
+            if stage is None or match_id not in stage.match_queue:
+                return False, f'No pending match {match_id} in {stage_name} stage of {tournament_name}.'
+            match = stage.get_match(match_id)
+            player = t.players_dict.get(user_id)
+            if self.is_admin(tournament_name, user_id) or (
+                    player is not None and player.team in (match.blue_team, match.red_team)):
+                if not stage.running:
+                    return False, stage.report_match_result(match, blue_score, red_score)
+                if not stage.is_ready(match):
+                    return False, f'Cannot report match {match}. Its teams are not known yet.'
+                feedback = stage.report_match_result(match, blue_score, red_score)
+                self._record('report_match_result', tournament_name, stage_name, match_id, blue_score, red_score,
+                             user_id)
+                return True, feedback
+            else:
+                return False, f'Cannot report match {match_id}. Missing admin rights.'
+        else:
+            return False, f'Tournament {tournament_name} does not exists'
+
+    def next_matches_in(self, tournament_name: str, player_name: str) -> list[tuple[str, str, Match]]:
+        # (tournament, stage, match) pending for the player's team in the running stages of a tournament
+        t: Tournament = self.tourneys_dict[tournament_name]
+        player = t.players_dict.get(player_name)
+        if player is None or player.team is None:
+            return []
+        matches = []
+        for stage in t.stages_dict.values():
+            if stage.running:
+                match = stage.next_match(player.team)
+                if match is not None:
+                    matches.append((tournament_name, stage.name, match))
+        return matches
+
+    def next_matches(self, player_name: str) -> list[tuple[str, str, Match]]:
+        # where does the player play next: only the tournaments they are registered to are visited, then
+        # team and stages pending matches are indexed lookups (Tournament.players_dict, Ruleset.pending)
+        matches = []
+        for tournament_name in self.player_tournaments.get(player_name, ()):
+            matches += self.next_matches_in(tournament_name, player_name)
+        return matches
+
+    def get_state(self, tournament_name: str, since: list[int] = None) -> bytes:
+        # JSON of the tournament, only changes when since is the cursor of a previous state, see serialization
+        return serialization.dumps(self.tourneys_dict[tournament_name], since)
+
     def get_tournaments_list(self) -> []:
         return self.tourneys_dict.keys()
 
     def get_tournament(self, tournament_name: str) -> Tournament:
         return self.tourneys_dict[tournament_name]
+
+    @timed
+    def snapshot(self, path: str) -> (bool, str):
+        try:
+            persistence.save(self.tourneys_dict, path, self.journal.sequence if self.journal is not None else 0)
+            return True, f'{len(self.tourneys_dict)} tournaments saved to {path}'
+        except OSError as e:
+            return False, f'Cannot save tournaments to {path}: {e}'
+
+    @timed
+    def restore(self, path: str) -> (bool, str):
+        try:
+            self.tourneys_dict = persistence.load(path)
+            self._reindex_players()
+            return True, f'{len(self.tourneys_dict)} tournaments restored from {path}'
+        except (OSError, persistence.SnapshotError) as e:
+            return False, f'Cannot restore tournaments from {path}: {e}'
+
+    @timed
+    def open_journal(self, journal_path: str, checkpoint_path: str = None, **options) -> (bool, str):
+        # Rebuilds state from the checkpoint (if any) and the journal, then journals every further change.
+        # options are given to journal.Journal (batch_size, flush_interval, autoflush).
+        try:
+            sequence = 0
+            with events.muted():  # recovered changes already happened, subscribers are not told again
+                if checkpoint_path is not None and os.path.exists(checkpoint_path):
+                    sequence, self.tourneys_dict = persistence.load_checkpoint(checkpoint_path)
+                    self._reindex_players()
+                self.journal = None
+                sequence = journal.replay(self, journal_path, sequence)
+            self.journal = journal.Journal(journal_path, sequence=sequence, **options)
+            return True, f'{len(self.tourneys_dict)} tournaments recovered, journaling to {journal_path}'
+        except (OSError, persistence.SnapshotError) as e:
+            return False, f'Cannot open journal {journal_path}: {e}'
+
+    @timed
+    def checkpoint(self, path: str) -> (bool, str):
+        # compaction: saves every journaled operation in a snapshot, then empties the journal
+        if self.journal is None:
+            return False, 'No journal opened.'
+        success, feedback = self.snapshot(path)
+        if success:
+            self.journal.truncate()
+        return success, feedback
+
+    def close_journal(self):
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
@@ -0,0 +1,186 @@
+import gc
+import marshal
+import os
+import struct
+from array import array
+
+from tournapy import events
+from tournapy.core.model import Match, Player, Team
+from tournapy.core.ruleset import Ruleset, RulesetEnum
+from tournapy.tournament import Tournament
+
+# Snapshot layout: MAGIC, format version (unsigned short, big endian), then (journal sequence, tournaments)
+# as nested tuples of builtins encoded with marshal. Games scores are stored as raw bytes of the Match arrays.
+# Version 1 had no journal sequence, version 2 no pool teams removed from the tournament (detached).
+MAGIC = b'TPYS'
+VERSION = 3
+_HEADER = struct.Struct('>4sH')
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def _dump_match(m: Match) -> tuple:
+    return (m.id, m.bo, m.blue_team, m.red_team, m.games.tobytes(), m.games_played, m.bo_blue_score,
+            m.bo_red_score, m.ended)
+
+
+def _load_match(state: tuple) -> Match:
+    m = Match.__new__(Match)  # skips the games array allocation of __init__
+    m.id, m.bo, m.blue_team, m.red_team, games, m.games_played, m.bo_blue_score, m.bo_red_score, m.ended = state
+    m.games = array('i', games)
+    return m
+
+
+def _dump_team(team: Team) -> tuple:
+    return team.name, team.size, team.elo, team.points, team.goals_scored, team.goals_taken
+
+
+def _load_team(state: tuple) -> Team:
+    name, size, elo, points, goals_scored, goals_taken = state
+    team = Team(name)
+    team.size = size
+    team.elo = elo
+    team.points = points
+    team.goals_scored = goals_scored
+    team.goals_taken = goals_taken
+    return team
+
+
+def _dump_stage(stage: Ruleset, teams_dict: dict[str, Team]) -> tuple:
+    # matches are stored once, bracket/queue/history refer to them by index
+    matches: list[Match] = []
+    index: dict[int, int] = {}
+    for m in list(stage.bracket.values()) + stage.match_history:
+        if id(m) not in index:
+            index[id(m)] = len(matches)
+            matches.append(m)
+    return (stage.rules_type.value, stage.name, stage.pool_max_size, stage.bo,
+            tuple(t.name for t in stage.pool),
+            tuple(_dump_match(m) for m in matches),
+            tuple(index[id(m)] for m in stage.bracket.values()),
+            tuple(stage.match_queue.keys()),
+            tuple(index[id(m)] for m in stage.match_history),
+            (tuple(stage.standings.points), tuple(stage.standings.goals_scored), tuple(stage.standings.goals_taken),
+             tuple(tuple(stage.standings.opponents[t.name]) for t in stage.pool)),
+            tuple(getattr(stage, attribute) for attribute in stage._state_attributes),
+            # pool teams not in the tournament anymore (removed, or cleared teams)
+            tuple(_dump_team(team) for team in stage.pool if teams_dict.get(team.name) is not team))
+
+
+def _load_stage(state: tuple, teams_dict: dict[str, Team], tournament_name: str) -> Ruleset:
+    rules_type, name, size, bo, pool, matches_state, bracket, queue, history, standings, attributes = state[:11]
+    detached = {team_state[0]: _load_team(team_state) for team_state in (state[11] if len(state) > 11 else ())}
+    stage = RulesetEnum(rules_type).get_ruleset(name, size, bo)
+    stage.tournament_name = tournament_name
+    for team_name in pool:
+        stage.add_team(detached[team_name] if team_name in detached else teams_dict[team_name])
+    matches = [_load_match(m) for m in matches_state]
+    stage.bracket = {matches[i].id: matches[i] for i in bracket}
+    for match_id in queue:
+        stage.enqueue(stage.bracket[match_id])
+    stage.match_history = [matches[i] for i in history]
+    stage.standings.set_stats(*standings)
+    stage.standings.index_history(stage.match_history)
+    for attribute, value in zip(stage._state_attributes, attributes):
+        setattr(stage, attribute, value)
+    for team_state in state[11] if len(state) > 11 else ():  # add_team reset their stats
+        team = detached[team_state[0]]
+        _, _, _, team.points, team.goals_scored, team.goals_taken = team_state
+    return stage
+
+
+def _dump_tournament(t: Tournament) -> tuple:
+    return (t.name, t.team_size, t.registration_opened, tuple(t.admins), t.current_phase_idx, t.logo_url,
+            tuple((p.name, p.elo, p.team) for p in t.players_dict.values()),
+            tuple(_dump_team(team) for team in t.teams_dict.values()),
+            tuple((order, _dump_stage(stage, t.teams_dict)) for order, stage in t.stages_dict.items()))
+
+
+def _load_tournament(state: tuple) -> Tournament:
+    name, team_size, registration_opened, admins, current_phase_idx, logo_url, players, teams, stages = state
+    t = Tournament()
+    t.name = name
+    t.team_size = team_size
+    t.registration_opened = registration_opened
+    t.admins = list(admins)
+    t.current_phase_idx = current_phase_idx
+    t.logo_url = logo_url
+    for team_state in teams:
+        team = _load_team(team_state)
+        t.teams_dict[team.name] = team
+    for player_name, elo, team_name in players:
+        p = Player(player_name, elo)
+        t.players_dict[player_name] = p
+        if team_name is not None:
+            p.set_team(team_name)
+            t._link_player(p)
+    for order, stage_state in stages:
+        t.add_phase(order, _load_stage(stage_state, t.teams_dict, t.name))
+    # stages replay overwrote teams stats, restore the saved ones
+    for team_name, _, _, points, goals_scored, goals_taken in teams:
+        team = t.teams_dict[team_name]
+        team.points = points
+        team.goals_scored = goals_scored
+        team.goals_taken = goals_taken
+    return t
+
+
+def dumps(tourneys_dict: dict[str, Tournament], sequence: int = 0) -> bytes:
+    # sequence: last journal operation included in the snapshot (see tournapy.journal)
+    state = (sequence, tuple(_dump_tournament(t) for t in tourneys_dict.values()))
+    return _HEADER.pack(MAGIC, VERSION) + marshal.dumps(state)
+
+
+def loads_checkpoint(data: bytes) -> (int, dict[str, Tournament]):
+    if len(data) < _HEADER.size:
+        raise SnapshotError('Snapshot is truncated.')
+    magic, version = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise SnapshotError('Not a tournapy snapshot.')
+    if version not in (1, 2, VERSION):
+        raise SnapshotError(f'Unsupported snapshot version {version} (expected {VERSION}).')
+    try:
+        state = marshal.loads(data[_HEADER.size:])
+    except (EOFError, ValueError, TypeError) as e:
+        raise SnapshotError(f'Corrupted snapshot: {e}')
+    # no cycle collection while allocating a whole object graph, it would scan it again and again
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        sequence, tournaments = (0, state) if version == 1 else state
+        tourneys_dict = {}
+        with events.muted():  # restored queues are not new ready matches
+            for tournament_state in tournaments:
+                t = _load_tournament(tournament_state)
+                tourneys_dict[t.name] = t
+        return sequence, tourneys_dict
+    except (KeyError, IndexError, ValueError, TypeError, AttributeError) as e:
+        raise SnapshotError(f'Inconsistent snapshot: {e!r}')
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def loads(data: bytes) -> dict[str, Tournament]:
+    return loads_checkpoint(data)[1]
+
+
+def save(tourneys_dict: dict[str, Tournament], path: str, sequence: int = 0):
+    # written aside then renamed, a crash never leaves a half written snapshot
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(dumps(tourneys_dict, sequence))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path: str) -> (int, dict[str, Tournament]):
+    with open(path, 'rb') as f:
+        return loads_checkpoint(f.read())
+
+
+def load(path: str) -> dict[str, Tournament]:
+    return load_checkpoint(path)[1]
@@ -0,0 +1,149 @@
+# Tabular views of tournaments and stages. pandas is only imported when a view is rendered, and is
+# optional: without it (or with set_backend('table')) views are returned as pure python Table objects.
+
+PLAYER_COLUMNS = ["name", "elo", "team"]
+TEAM_COLUMNS = ["name", "elo", "points", "goals diff"]
+RULESET_COLUMNS = ["name", "size", "type", "running"]
+HISTORY_COLUMNS = ["blue team", "blue score", "red team", "red score", "winner"]
+BRACKET_COLUMNS = ["matches"]
+
+_backend = None  # 'pandas' or 'table', resolved on first use
+
+
+def set_backend(backend: str = None):
+    # None: pandas when installed, else the pure python Table
+    global _backend
+    if backend not in (None, 'pandas', 'table'):
+        raise ValueError(f'Unknown presentation backend {backend}')
+    _backend = backend
+
+
+def get_backend() -> str:
+    global _backend
+    if _backend is None:
+        try:
+            import pandas  # noqa: F401
+            _backend = 'pandas'
+        except ImportError:
+            _backend = 'table'
+    return _backend
+
+
+class Table:
+    # minimal DataFrame stand-in: named columns, optional index, column access and text rendering
+
+    def __init__(self, data: dict[str, list], index: list = None):
+        self.data = data
+        self.columns = list(data.keys())
+        length = len(next(iter(data.values()))) if len(data) != 0 else 0
+        self.index = list(index) if index is not None else list(range(length))
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, column: str) -> list:
+        return self.data[column]
+
+    def __iter__(self):
+        return iter(self.columns)
+
+    @property
+    def empty(self) -> bool:
+        return len(self.index) == 0
+
+    @property
+    def rows(self) -> list[tuple]:
+        return list(zip(*self.data.values()))
+
+    def itertuples(self):
+        return iter(self.rows)
+
+    def to_dict(self) -> dict[str, list]:
+        return {column: list(values) for column, values in self.data.items()}
+
+    def to_string(self) -> str:
+        cells = [[''] + self.columns] + [[str(i)] + [str(v) for v in row] for i, row in zip(self.index, self.rows)]
+        widths = [max(len(line[k]) for line in cells) for k in range(len(cells[0]))]
+        return '\n'.join('  '.join(cell.rjust(width) for cell, width in zip(line, widths)) for line in cells)
+
+    def __str__(self):
+        return self.to_string()
+
+    def __repr__(self):
+        return self.to_string()
+
+
+def series(values: list, index: list[str]):
+    if get_backend() == 'pandas':
+        import pandas as pd
+        return pd.Series(values, index=index)
+    return dict(zip(index, values))
+
+
+def frame(data: dict[str, list], index: list = None):
+    # data: column name -> values, built in one pass over the objects
+    if get_backend() == 'pandas':
+        import pandas as pd
+        return pd.DataFrame(data, index=index)
+    return Table(data, index)
+
+
+def cached(owner, name: str, version, build):
+    # Views are cached on their owner (Tournament or Ruleset) until its version changes, so repeated
+    # reads of an unchanged tournament return the same object: callers must not modify it in place.
+    backend = get_backend()
+    entry = owner._views.get(name)
+    if entry is not None and entry[0] == version and entry[1] == backend:
+        return entry[2]
+    view = build(owner)
+    owner._views[name] = (version, backend, view)
+    return view
+
+
+def player_row(p) -> list:
+    return [p.name, p.elo, p.team]
+
+
+def team_row(t) -> list:
+    return [t.name, t.elo, t.points, t.goals_scored - t.goals_taken]
+
+
+def ruleset_row(r) -> list:
+    return [r.name, r.pool_max_size, r.rules_type.value, r.running]
+
+
+def players_frame(tournament):
+    players = sorted(tournament.players_dict.values(), key=lambda p: p.elo, reverse=True)
+    return frame({"name": [p.name for p in players],
+                  "elo": [p.elo for p in players],
+                  "team": [p.team for p in players]})
+
+
+def teams_frame(tournament):
+    # TODO: sort by seeding
+    teams = sorted(tournament.teams_dict.values(), key=lambda t: t.elo, reverse=True)
+    return frame({"name": [t.name for t in teams],
+                  "elo": [t.elo for t in teams],
+                  "points": [t.points for t in teams],
+                  "goals diff": [t.goals_scored - t.goals_taken for t in teams]})
+
+
+def phases_frame(tournament):
+    stages = [tournament.stages_dict[i] for i in range(len(tournament.stages_dict))]
+    return frame({"name": [r.name for r in stages],
+                  "size": [r.pool_max_size for r in stages],
+                  "type": [r.rules_type.value for r in stages],
+                  "running": [r.running for r in stages]},
+                 [f'{i}' for i in range(len(stages))])
+
+
+def history_frame(ruleset):
+    results = [m.get_result() for m in ruleset.match_history]
+    data = dict(zip(HISTORY_COLUMNS, map(list, zip(*results)))) if len(results) != 0 else \
+        {column: [] for column in HISTORY_COLUMNS}
+    return frame(data, [f'{i}' for i in range(len(results))])
+
+
+def bracket_frame(ruleset):
+    matches_ids = sorted(ruleset.bracket.keys(), reverse=True)
+    return frame({"matches": [ruleset.bracket[match_id] for match_id in matches_ids]}, matches_ids)
@@ -0,0 +1,153 @@
+# Rating engine updating players elo from finished matches.
+# A team plays with the average rating of its players; every player of the team gets the team rating
+# change (Elo), or a change weighted by its own rating deviation (Glicko-style, glicko=True).
+# Matches are taken in chronological order (tournaments in the given order, then stages, then
+# match_history) and cut in batches where no player appears twice: a batch is rated at once with NumPy
+# and gives the same ratings as one match after the other.
+# The engine remembers how many matches of each stage it already rated, so update() can be called
+# again as new matches end. Ratings are kept by player name, across tournaments.
+# Tournaments of a TournamentManager are written through it (manager and admin user_id given to update,
+# replay or write), so new elos are journaled like any other change.
+import math
+
+from tournapy.core.pairing import BYE
+from tournapy.tournament import Tournament
+
+GLICKO_Q = math.log(10) / 400
+
+
+class RatingEngine:
+
+    def __init__(self, k_factor: float = 32, glicko: bool = False, initial_deviation: float = 350,
+                 minimum_deviation: float = 30):
+        self.k_factor = k_factor
+        self.glicko = glicko
+        self.initial_deviation = initial_deviation
+        self.minimum_deviation = minimum_deviation
+        self.players: dict[str, int] = {}  # player name -> index in ratings
+        self.initial: list[float] = []  # registration elo, see reset()
+        self.ratings = None  # numpy arrays, created on first update
+        self.deviations = None
+        self.cursors: dict[tuple[str, int], int] = {}  # (tournament, stage order) -> matches already rated
+
+    def reset(self):
+        # forgets every rated match, players are back to their registration elo
+        import numpy as np
+        self.ratings = np.asarray(self.initial, dtype=np.float64)
+        self.deviations = np.full(len(self.initial), float(self.initial_deviation))
+        self.cursors = {}
+
+    def rating(self, player_name: str) -> float:
+        return float(self.ratings[self.players[player_name]])
+
+    def deviation(self, player_name: str) -> float:
+        return float(self.deviations[self.players[player_name]])
+
+    def _register(self, tournaments: list[Tournament]):
+        import numpy as np
+        new = []
+        for t in tournaments:
+            for p in t.players_dict.values():
+                if p.name not in self.players:
+                    self.players[p.name] = len(self.initial) + len(new)
+                    new.append(p.elo)
+        self.initial += new
+        if self.ratings is None:
+            self.reset()
+        elif len(new) != 0:
+            self.ratings = np.concatenate((self.ratings, np.asarray(new, dtype=np.float64)))
+            self.deviations = np.concatenate((self.deviations, np.full(len(new), float(self.initial_deviation))))
+
+    def _pending(self, tournaments: list[Tournament]) -> list[tuple[list[int], list[int], float]]:
+        # (blue players, red players, blue score) of matches not rated yet, in chronological order
+        pending = []
+        for t in tournaments:
+            for order in sorted(t.stages_dict):
+                history = t.stages_dict[order].match_history
+                start = self.cursors.get((t.name, order), 0)
+                for m in history[start:]:
+                    if BYE in (m.blue_team, m.red_team) or not m.ended:
+                        continue
+                    blue = [self.players[name] for name in t.team_members.get(m.blue_team, {})]
+                    red = [self.players[name] for name in t.team_members.get(m.red_team, {})]
+                    if len(blue) == 0 or len(red) == 0:
+                        continue
+                    winner = m.get_winner()
+                    pending.append((blue, red, 1.0 if winner == m.blue_team else 0.0 if winner == m.red_team else 0.5))
+                self.cursors[(t.name, order)] = len(history)
+        return pending
+
+    def _rate(self, batch: list[tuple[list[int], list[int], float]]):
+        import numpy as np
+        # one row per player of the batch: player, match, side (0 blue, 1 red)
+        players = []
+        slots = []
+        for k, (blue, red, _) in enumerate(batch):
+            players += blue + red
+            slots += [2 * k] * len(blue) + [2 * k + 1] * len(red)
+        players = np.asarray(players, dtype=np.intp)
+        slots = np.asarray(slots, dtype=np.intp)
+        sides = slots % 2
+        matches = slots // 2
+        sizes = np.bincount(slots, minlength=2 * len(batch))
+        team_rating = (np.bincount(slots, weights=self.ratings[players], minlength=2 * len(batch)) / sizes)
+        team_rating = team_rating.reshape(-1, 2)
+        scores = np.asarray([score for _, _, score in batch])
+        # score and ratings seen from each player's side
+        own = team_rating[matches, sides]
+        opponent = team_rating[matches, 1 - sides]
+        score = np.where(sides == 0, scores[matches], 1 - scores[matches])
+        if not self.glicko:
+            expected = 1 / (1 + 10 ** ((opponent - own) / 400))
+            self.ratings[players] += self.k_factor * (score - expected)
+            return
+        # team deviation: quadratic mean of its players deviations
+        variance = np.bincount(slots, weights=self.deviations[players] ** 2, minlength=2 * len(batch)) / sizes
+        opponent_deviation = np.sqrt(variance.reshape(-1, 2)[matches, 1 - sides])
+        g = 1 / np.sqrt(1 + 3 * GLICKO_Q ** 2 * opponent_deviation ** 2 / math.pi ** 2)
+        expected = 1 / (1 + 10 ** (-g * (own - opponent) / 400))
+        d2_inverse = GLICKO_Q ** 2 * g ** 2 * expected * (1 - expected)
+        precision = 1 / self.deviations[players] ** 2 + d2_inverse
+        self.ratings[players] += GLICKO_Q / precision * g * (score - expected)
+        self.deviations[players] = np.maximum(np.sqrt(1 / precision), self.minimum_deviation)
+
+    def update(self, tournaments, write: bool = True, manager=None, user_id: str = None) -> int:
+        # rates matches ended since last update, returns how many were rated.
+        # write: players (and teams) elo of these tournaments are set to the new ratings
+        tournaments = list(tournaments)
+        self._register(tournaments)
+        pending = self._pending(tournaments)
+        batch = []
+        seen = set()
+        for match in pending:
+            blue, red, _ = match
+            if not seen.isdisjoint(blue) or not seen.isdisjoint(red):
+                self._rate(batch)
+                batch = []
+                seen = set()
+            batch.append(match)
+            seen.update(blue)
+            seen.update(red)
+        if len(batch) != 0:
+            self._rate(batch)
+        if write:
+            self.write(tournaments, manager, user_id)
+        return len(pending)
+
+    def replay(self, tournaments, write: bool = True, manager=None, user_id: str = None) -> int:
+        # whole season: every match rated again from registration elo
+        tournaments = list(tournaments)
+        self._register(tournaments)
+        self.reset()
+        return self.update(tournaments, write, manager, user_id)
+
+    def write(self, tournaments, manager=None, user_id: str = None):
+        # manager: TournamentManager owning the tournaments, user_id one of their admins
+        for t in tournaments:
+            elos = {name: int(round(self.ratings[self.players[name]])) for name in t.players_dict}
+            if manager is None:
+                t.set_players_elo(elos)
+                continue
+            success, feedback = manager.set_players_elo(t.name, elos, user_id)
+            if not success:
+                raise ValueError(feedback)
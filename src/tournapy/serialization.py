@@ -0,0 +1,197 @@
+# JSON state of a tournament, its stages brackets, match history and standings, for clients polling it
+# (e.g. a web overlay). state() is the whole tournament, delta(cursor) only what changed since the
+# client got cursor: rows of the players, teams, matches and standings recorded in Tournament.changes and
+# Ruleset.changes after the versions of the cursor, so payload and encoding time follow the change.
+# The cursor ([epoch, tournament version, stages versions...]) is sent with every payload and given back
+# as is by the client. An unknown cursor (other process, restored tournament, new stage) gives a full
+# state, flagged 'full'. Changes are only recorded from the first cursor given out for a tournament.
+# Rows are lists, their fields are given in full states (see *_FIELDS).
+# Payloads are encoded with orjson when installed, else with the json module (see set_encoder).
+import os
+import weakref
+
+from tournapy.core.model import Match
+from tournapy.core.ruleset import Ruleset
+from tournapy.tournament import Tournament
+
+PLAYER_FIELDS = ('name', 'elo', 'team')
+TEAM_FIELDS = ('name', 'size', 'elo')
+MATCH_FIELDS = ('id', 'bo', 'blue_team', 'red_team', 'blue_score', 'red_score', 'blue_games', 'red_games', 'ended',
+                'pending')
+STANDINGS_FIELDS = ('team', 'seed', 'points', 'goals_scored', 'goals_taken')
+
+_encoder = None  # 'orjson' or 'json', resolved on first use
+# tournament -> random epoch: versions of another Tournament object (e.g. restored) must not be trusted
+_epochs = weakref.WeakKeyDictionary()
+
+
+def set_encoder(encoder: str = None):
+    # None: orjson when installed, else json
+    global _encoder
+    if encoder not in (None, 'orjson', 'json'):
+        raise ValueError(f'Unknown encoder {encoder}')
+    _encoder = encoder
+
+
+def get_encoder() -> str:
+    global _encoder
+    if _encoder is None:
+        try:
+            import orjson  # noqa: F401
+            _encoder = 'orjson'
+        except ImportError:
+            _encoder = 'json'
+    return _encoder
+
+
+def encode(payload) -> bytes:
+    if get_encoder() == 'orjson':
+        import orjson
+        return orjson.dumps(payload)
+    import json
+    return json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode()
+
+
+def epoch(t: Tournament) -> int:
+    value = _epochs.get(t)
+    if value is None:
+        value = _epochs[t] = int.from_bytes(os.urandom(4), 'big')
+    return value
+
+
+def cursor(t: Tournament) -> list[int]:
+    t.track_changes()
+    for stage in t.stages_dict.values():
+        stage.track_changes()
+    return [epoch(t), t.version] + [stage.version for stage in t.stages_dict.values()]
+
+
+def _changed(changes: dict, since: int) -> list:
+    # keys changed after version since, oldest first. changes are ordered by version
+    changed = []
+    for key in reversed(changes):
+        if changes[key] <= since:
+            break
+        changed.append(key)
+    changed.reverse()
+    return changed
+
+
+def player_row(p) -> list:
+    return [p.name, p.elo, p.team]
+
+
+def team_row(team) -> list:
+    return [team.name, team.size, team.elo]
+
+
+def match_row(stage: Ruleset, m: Match) -> list:
+    return [m.id, m.bo, m.blue_team, m.red_team, m.bo_blue_score, m.bo_red_score, m.blue_score, m.red_score, m.ended,
+            m.id in stage.match_queue]
+
+
+def standings_row(stage: Ruleset, team_name: str) -> list:
+    standings = stage.standings
+    seed = standings.seeds[team_name]
+    return [team_name, seed, standings.points[seed], standings.goals_scored[seed], standings.goals_taken[seed]]
+
+
+def _stage_header(stage: Ruleset) -> dict:
+    return {'name': stage.name, 'type': stage.rules_type.value, 'size': stage.pool_max_size, 'bo': stage.bo,
+            'running': stage.running, 'round': getattr(stage, 'round', None), 'depth': stage.bracket_depth}
+
+
+def stage_state(stage: Ruleset) -> dict:
+    state = _stage_header(stage)
+    matches = dict(stage.bracket)
+    for m in stage.match_history:  # earlier rounds of round robin are not in the bracket anymore
+        matches.setdefault(m.id, m)
+    state['matches'] = [match_row(stage, m) for m in matches.values()]
+    state['bracket'] = list(stage.bracket)
+    state['history'] = [m.id for m in stage.match_history]
+    state['standings'] = [standings_row(stage, team.name) for team in stage.pool]
+    return state
+
+
+def stage_delta(stage: Ruleset, since: int) -> dict:
+    delta = _stage_header(stage)
+    changes = stage.changes
+    if _changed(changes['bracket'], since):
+        delta['bracket'] = list(stage.bracket)
+    matches = {match_id: stage.bracket[match_id] for match_id in _changed(changes['match'], since)
+               if match_id in stage.bracket}
+    teams = dict.fromkeys(_changed(changes['team'], since))
+    history = [stage.match_history[i] for i in _changed(changes['history'], since)]
+    for m in history:  # ended matches: the match and both teams standings
+        matches[m.id] = m
+        teams[m.blue_team] = None
+        teams[m.red_team] = None
+    delta['matches'] = [match_row(stage, m) for m in matches.values()]
+    delta['history'] = [m.id for m in history]
+    delta['standings'] = [standings_row(stage, team_name) for team_name in teams if team_name in stage.standings.seeds]
+    return delta
+
+
+def _head(t: Tournament) -> dict:
+    return {'full': True, 'cursor': cursor(t), 'name': t.name, 'team_size': t.team_size, 'logo': t.logo_url,
+            'fields': {'players': PLAYER_FIELDS, 'teams': TEAM_FIELDS, 'matches': MATCH_FIELDS,
+                       'standings': STANDINGS_FIELDS},
+            'players': [player_row(p) for p in t.players_dict.values()],
+            'teams': [team_row(team) for team in t.teams_dict.values()]}
+
+
+def state(t: Tournament) -> dict:
+    payload = _head(t)
+    payload['stages'] = [stage_state(stage) for stage in t.stages_dict.values()]
+    return payload
+
+
+def delta(t: Tournament, since: list[int] = None) -> dict:
+    # changes since the cursor of a previous payload, or the full state when since cannot be used
+    stages = list(t.stages_dict.values())
+    if since is None or len(since) != len(stages) + 2 or since[0] != epoch(t) or since[1] > t.version or \
+            any(version > stage.version for version, stage in zip(since[2:], stages)):
+        return state(t)
+    players = []
+    removed_players = []
+    for name in _changed(t.changes['player'], since[1]):
+        if name in t.players_dict:
+            players.append(player_row(t.players_dict[name]))
+        else:
+            removed_players.append(name)
+    teams = []
+    removed_teams = []
+    for name in _changed(t.changes['team'], since[1]):
+        if name in t.teams_dict:
+            teams.append(team_row(t.teams_dict[name]))
+        else:
+            removed_teams.append(name)
+    # stages in order, None when unchanged
+    payload = {'full': False, 'cursor': cursor(t), 'players': players, 'removed_players': removed_players,
+               'teams': teams, 'removed_teams': removed_teams,
+               'stages': [stage_delta(stage, version) if stage.version != version else None
+                          for version, stage in zip(since[2:], stages)]}
+    if _changed(t.changes['tournament'], since[1]):
+        payload.update({'name': t.name, 'team_size': t.team_size, 'logo': t.logo_url})
+    return payload
+
+
+def dumps(t: Tournament, since: list[int] = None) -> bytes:
+    return encode(delta(t, since))
+
+
+def write(t: Tournament, stream, since: list[int] = None):
+    # full state streamed stage by stage to a binary stream, deltas in one write
+    if since is not None:
+        payload = delta(t, since)
+        if not payload['full']:
+            stream.write(encode(payload))
+            return
+    head = _head(t)
+    head['stages'] = []
+    stream.write(encode(head)[:-2])  # without the closing ']}' of the empty stages list
+    for i, stage in enumerate(t.stages_dict.values()):
+        if i != 0:
+            stream.write(b',')
+        stream.write(encode(stage_state(stage)))
+    stream.write(b']}')
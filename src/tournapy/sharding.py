@@ -0,0 +1,284 @@
+# TournamentManager spread over worker processes. Tournaments are partitioned by crc32 of their name:
+# each shard process owns a plain TournamentManager holding its share of tournaments, so a slow
+# command (team generation, standings, tables rendering) only delays the tournaments of its shard.
+# Methods keep TournamentManager signatures and return values. Requests are (id, operation index,
+# args) tuples on a pipe per shard; a reader thread per shard resolves the caller futures, so several
+# threads (or asyncio through submit()) may have requests in flight on every shard.
+# Objects returned by get_tournament or the views are copies made in the shard process.
+# Persistence calls (snapshot, restore, journal) apply to every shard, on '<path>.<shard>' files:
+# restoring needs the same number of shards.
+import itertools
+import multiprocessing
+import os
+import threading
+import zlib
+from concurrent.futures import Future
+
+from tournapy import instrumentation
+from tournapy.bulk import read_players_csv
+from tournapy.manager import TournamentManager
+from tournapy.tournament import Tournament
+
+
+def _tournament_view(manager: TournamentManager, tournament_name: str, view: str):
+    return getattr(manager.get_tournament(tournament_name), view)()
+
+
+def _stage_view(manager: TournamentManager, tournament_name: str, stage_name: str, view: str, *args):
+    return getattr(manager.get_tournament(tournament_name).get_stage(stage_name), view)(*args)
+
+
+def _metrics(manager: TournamentManager) -> dict:
+    return manager.metrics.snapshot()
+
+
+def _tournaments_list(manager: TournamentManager) -> list[str]:
+    return list(manager.get_tournaments_list())
+
+
+# operations are sent by index: manager method names, or shard side functions
+OPERATIONS = ('is_admin', 'exists', 'create_tournament', 'delete_tournament', 'add_phase', 'set_tiebreaks',
+              'start_next_phase', 'add_player', 'add_players', 'set_players_elo', 'remove_player', 'add_team',
+              'form_teams', 'remove_team', 'clean_teams', 'generate_teams', 'report_match_result', 'get_tournament',
+              'next_matches', 'get_state', 'snapshot', 'restore', 'open_journal', 'checkpoint', 'close_journal',
+              _tournament_view, _stage_view, _metrics, _tournaments_list)
+_OPERATION_INDEX = {operation: i for i, operation in enumerate(OPERATIONS)}
+
+
+def _serve(connection):
+    # shard process loop: one request at a time, until None (or the pipe is closed)
+    manager = TournamentManager()
+    while True:
+        try:
+            request = connection.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+        request_id, operation_index, args, kwargs = request
+        operation = OPERATIONS[operation_index]
+        try:
+            if type(operation) is str:
+                result = getattr(manager, operation)(*args, **kwargs)
+            else:
+                result = operation(manager, *args, **kwargs)
+            response = (request_id, True, result)
+        except Exception as e:
+            response = (request_id, False, e)
+        try:
+            connection.send(response)
+        except Exception as e:  # result cannot be pickled
+            connection.send((request_id, False, RuntimeError(f'{OPERATIONS[operation_index]}: {e!r}')))
+    manager.close_journal()
+    connection.close()
+
+
+class _Shard:
+
+    def __init__(self, context, index: int):
+        self.index = index
+        self.connection, child = context.Pipe()
+        self.process = context.Process(target=_serve, args=(child,), name=f'tournapy-shard-{index}', daemon=True)
+        self.process.start()
+        child.close()
+        self.pending: dict[int, Future] = {}
+        self._ids = itertools.count()
+        self._send_lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read, name=f'tournapy-shard-{index}-reader', daemon=True)
+        self._reader.start()
+
+    def submit(self, operation, args: tuple, kwargs: dict) -> Future:
+        future = Future()
+        with self._send_lock:
+            request_id = next(self._ids)
+            self.pending[request_id] = future
+            self.connection.send((request_id, _OPERATION_INDEX[operation], args, kwargs))
+        return future
+
+    def _read(self):
+        while True:
+            try:
+                request_id, ok, result = self.connection.recv()
+            except (EOFError, OSError):
+                break
+            future = self.pending.pop(request_id)
+            if ok:
+                future.set_result(result)
+            else:
+                future.set_exception(result)
+        for future in self.pending.values():
+            future.set_exception(RuntimeError(f'shard {self.index} stopped'))
+        self.pending = {}
+
+    def close(self):
+        with self._send_lock:
+            try:
+                self.connection.send(None)
+            except OSError:
+                pass
+        self.process.join()
+        self._reader.join()
+        self.connection.close()
+
+
+class ShardedTournamentManager:
+
+    def __init__(self, shards: int = None, start_method: str = 'spawn'):
+        # spawn: shard processes do not inherit the caller threads (e.g. reader threads, event loop)
+        context = multiprocessing.get_context(start_method)
+        self.shards = [_Shard(context, i) for i in range(shards or os.cpu_count() or 1)]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        for shard in self.shards:
+            shard.close()
+
+    def shard_of(self, tournament_name: str) -> int:
+        return zlib.crc32(tournament_name.encode()) % len(self.shards)
+
+    def submit(self, tournament_name: str, operation, *args, **kwargs) -> Future:
+        # asynchronous form of every routed call, e.g. asyncio.wrap_future(manager.submit(name, 'add_player', ...))
+        return self.shards[self.shard_of(tournament_name)].submit(operation, args, kwargs)
+
+    def _call(self, tournament_name: str, operation, *args, **kwargs):
+        return self.submit(tournament_name, operation, *args, **kwargs).result()
+
+    def _broadcast(self, operation, *args) -> list:
+        futures = [shard.submit(operation, args, {}) for shard in self.shards]
+        return [future.result() for future in futures]
+
+    def _broadcast_paths(self, operation, *paths, **kwargs) -> (bool, str):
+        # persistence calls: shard k works on '<path>.<k>'
+        futures = [shard.submit(operation, tuple(None if path is None else f'{path}.{shard.index}' for path in paths),
+                                kwargs) for shard in self.shards]
+        results = [future.result() for future in futures]
+        return all(success for success, _ in results), '\n'.join(feedback for _, feedback in results)
+
+    def is_admin(self, tournament_name: str, user_id: str) -> bool:
+        return self._call(tournament_name, 'is_admin', tournament_name, user_id)
+
+    def exists(self, tournament_name: str):
+        return self._call(tournament_name, 'exists', tournament_name)
+
+    def create_tournament(self, tournament_name: str, team_size: int, user_id: str, logo_url: str) -> bool:
+        return self._call(tournament_name, 'create_tournament', tournament_name, team_size, user_id, logo_url)
+
+    def delete_tournament(self, tournament_name: str, user_id: str) -> (bool, str):
+        return self._call(tournament_name, 'delete_tournament', tournament_name, user_id)
+
+    def add_phase(self, tournament_name: str, phase_name: str, rules_name: str, pool_size: int, bo: int,
+                  user_id: str, double_round_robin: bool = False) -> (bool, str):
+        return self._call(tournament_name, 'add_phase', tournament_name, phase_name, rules_name, pool_size, bo,
+                          user_id, double_round_robin)
+
+    def set_tiebreaks(self, tournament_name: str, stage_name: str, tiebreaks, user_id: str) -> (bool, str):
+        return self._call(tournament_name, 'set_tiebreaks', tournament_name, stage_name, tuple(tiebreaks), user_id)
+
+    def start_next_phase(self, tournament_name: str, user_id: str) -> (bool, str):
+        return self._call(tournament_name, 'start_next_phase', tournament_name, user_id)
+
+    def add_player(self, tournament_name: str, player_name: str, player_elo: int, user_id: str) -> (bool, str):
+        return self._call(tournament_name, 'add_player', tournament_name, player_name, player_elo, user_id)
+
+    def add_players(self, tournament_name: str, rows, user_id: str, atomic: bool = True) -> (bool, str):
+        return self._call(tournament_name, 'add_players', tournament_name, tuple(tuple(row) for row in rows),
+                          user_id, atomic)
+
+    def set_players_elo(self, tournament_name: str, elos: dict[str, int], user_id: str) -> (bool, str):
+        return self._call(tournament_name, 'set_players_elo', tournament_name, dict(elos), user_id)
+
+    def import_players_csv(self, tournament_name: str, stream, user_id: str, atomic: bool = True) -> (bool, str):
+        # the stream is read here, only rows are sent to the shard
+        return self.add_players(tournament_name, read_players_csv(stream), user_id, atomic)
+
+    def remove_player(self, tournament_name: str, player_name: str, user_id: str) -> (bool, str):
+        return self._call(tournament_name, 'remove_player', tournament_name, player_name, user_id)
+
+    def add_team(self, tournament_name: str, team_name: str, players_name: str, user_id: str) -> (bool, str):
+        return self._call(tournament_name, 'add_team', tournament_name, team_name, players_name, user_id)
+
+    def form_teams(self, tournament_name: str, teams, user_id: str) -> (bool, str):
+        return self._call(tournament_name, 'form_teams', tournament_name,
+                          tuple((team_name, tuple(players_names)) for team_name, players_names in teams), user_id)
+
+    def remove_team(self, tournament_name: str, team_name: str, user_id: str) -> (bool, str):
+        return self._call(tournament_name, 'remove_team', tournament_name, team_name, user_id)
+
+    def clean_teams(self, tournament_name: str, user_id: str) -> (bool, str):
+        return self._call(tournament_name, 'clean_teams', tournament_name, user_id)
+
+    def generate_teams(self, tournament_name: str, user_id: str, optimize: bool = False,
+                       time_budget: float = 0.1) -> (bool, str):
+        return self._call(tournament_name, 'generate_teams', tournament_name, user_id, optimize, time_budget)
+
+    def report_match_result(self, tournament_name: str, stage_name: str, match_id: str, blue_score: int,
+                            red_score: int, user_id: str) -> (bool, str):
+        return self._call(tournament_name, 'report_match_result', tournament_name, stage_name, match_id, blue_score,
+                          red_score, user_id)
+
+    def get_tournaments_list(self) -> list[str]:
+        return list(itertools.chain.from_iterable(self._broadcast(_tournaments_list)))
+
+    def get_tournament(self, tournament_name: str) -> Tournament:
+        # a copy: changes must go through the manager methods
+        return self._call(tournament_name, 'get_tournament', tournament_name)
+
+    # views, rendered in the shard process
+
+    def df_players(self, tournament_name: str):
+        return self._call(tournament_name, _tournament_view, tournament_name, 'df_players')
+
+    def df_teams(self, tournament_name: str):
+        return self._call(tournament_name, _tournament_view, tournament_name, 'df_teams')
+
+    def df_phases(self, tournament_name: str):
+        return self._call(tournament_name, _tournament_view, tournament_name, 'df_phases')
+
+    def get_standings(self, tournament_name: str, stage_name: str):
+        return self._call(tournament_name, _stage_view, tournament_name, stage_name, 'get_standings')
+
+    def get_history(self, tournament_name: str, stage_name: str):
+        return self._call(tournament_name, _stage_view, tournament_name, stage_name, 'get_history')
+
+    def get_bracket(self, tournament_name: str, stage_name: str):
+        return self._call(tournament_name, _stage_view, tournament_name, stage_name, 'get_bracket')
+
+    def get_state(self, tournament_name: str, since: list[int] = None) -> bytes:
+        return self._call(tournament_name, 'get_state', tournament_name, since)
+
+    def next_match(self, tournament_name: str, stage_name: str, team_name: str):
+        return self._call(tournament_name, _stage_view, tournament_name, stage_name, 'next_match', team_name)
+
+    def next_matches(self, player_name: str) -> list:
+        # a player may be registered to tournaments of every shard
+        return list(itertools.chain.from_iterable(self._broadcast('next_matches', player_name)))
+
+    # persistence, per shard files
+
+    def snapshot(self, path: str) -> (bool, str):
+        return self._broadcast_paths('snapshot', path)
+
+    def restore(self, path: str) -> (bool, str):
+        return self._broadcast_paths('restore', path)
+
+    def open_journal(self, journal_path: str, checkpoint_path: str = None, **options) -> (bool, str):
+        return self._broadcast_paths('open_journal', journal_path, checkpoint_path, **options)
+
+    def checkpoint(self, path: str) -> (bool, str):
+        return self._broadcast_paths('checkpoint', path)
+
+    def close_journal(self):
+        self._broadcast('close_journal')
+
+    # metrics of every shard
+
+    def metrics(self) -> dict[str, dict]:
+        return instrumentation.merge(self._broadcast(_metrics))
+
+    def prometheus(self, prefix: str = 'tournapy') -> str:
+        return instrumentation.prometheus(self.metrics(), prefix)
@@ -0,0 +1,334 @@
+# Monte Carlo outcome simulator of a stage, from teams elo and the stage bo length.
+# The stage is turned into a plan (plain picklable data): matches still to play, with their current
+# series score, and where their teams come from. Every step of the plan is then played for a whole
+# batch of simulations at once with NumPy: teams of a match are arrays (one entry per simulation) and
+# the series win probability of every (blue, red) couple is looked up in a precomputed table.
+# Big runs are split in chunks, each one with its own seed (SeedSequence.spawn), optionally spread over
+# a process pool: results only depend on seed and chunk_size, not on processes.
+#
+# Elimination stages give, per team, the probability of reaching each round and of winning the stage.
+# Round robin and swiss stages give the probability of each final rank (points, goals diff, then current
+# rank); goals are not simulated, each game won or lost moves goals diff by one.
+# Swiss rounds after the current one are approximated: teams are paired by score without rematch
+# avoidance, the lowest ranked active team of an odd group gets the bye.
+import copy
+import itertools
+import math
+
+from tournapy import events, presentation
+from tournapy.core import schedule
+from tournapy.core.pairing import BYE
+from tournapy.core.ruleset import (LOSING_POINTS, RulesetEnum, Ruleset, SWISS_QUALIFIED_POINTS,
+                                   WINNING_POINTS)
+
+ELIMINATION = 'elimination'
+POINTS = 'points'
+
+
+def game_win_probability(blue_elo, red_elo):
+    # elo expected score of blue, works on scalars and arrays
+    return 1 / (1 + 10 ** ((red_elo - blue_elo) / 400))
+
+
+def series_win_probability(p, blue_needed: int, red_needed: int):
+    # probability that blue wins blue_needed games before red wins red_needed ones, p being the
+    # probability that blue wins a game (drawn games are not modelled)
+    if blue_needed <= 0:
+        return p * 0 + 1
+    if red_needed <= 0:
+        return p * 0
+    q = 1 - p
+    total = p * 0
+    for j in range(red_needed):
+        total = total + math.comb(blue_needed - 1 + j, j) * p ** blue_needed * q ** j
+    return total
+
+
+class SimulationResult:
+
+    def __init__(self, teams: list[str], rounds: list[str], reach: 'np.ndarray', win: 'np.ndarray',
+                 simulations: int):
+        self.teams = teams
+        self.rounds = rounds  # elimination rounds, or final ranks for round robin and swiss stages
+        self.reach = reach  # teams x rounds probabilities
+        self.win = win
+        self.simulations = simulations
+
+    def as_dict(self) -> dict[str, dict[str, float]]:
+        result = {}
+        for i, team in enumerate(self.teams):
+            result[team] = {label: float(self.reach[i, k]) for k, label in enumerate(self.rounds)}
+            result[team]['win'] = float(self.win[i])
+        return result
+
+    def frame(self):
+        data = {'team': list(self.teams)}
+        for k, label in enumerate(self.rounds):
+            data[label] = self.reach[:, k].tolist()
+        data['win'] = self.win.tolist()
+        return presentation.frame(data)
+
+    def __repr__(self):
+        return f'SimulationResult({self.simulations} simulations, {len(self.teams)} teams)'
+
+
+def _source(team: str, steps_index: dict[str, int], teams_index: dict[str, int]) -> tuple[int, int]:
+    # (0, team index), (1, step whose winner plays) or (2, step whose loser plays)
+    if team.startswith('winner(') and team.endswith(')'):
+        return 1, steps_index[team[7:-1]]
+    if team.startswith('loser(') and team.endswith(')'):
+        return 2, steps_index[team[6:-1]]
+    return 0, teams_index.get(team, len(teams_index))  # unknown teams and byes never win
+
+
+def _elimination_plan(stage: Ruleset, teams_index: dict[str, int]) -> dict:
+    matches = stage.bracket
+    depends = {}
+    for match_id, m in matches.items():
+        depends[match_id] = [team[team.index('(') + 1:-1] for team in (m.blue_team, m.red_team)
+                             if team.startswith(('winner(', 'loser(')) and team.endswith(')')]
+    # GF-2 (double elimination bracket reset) is only played if GF-1 red team wins
+    conditions = {'GF-2': 'GF-1'} if 'GF-2' in matches else {}
+
+    # matches are played after the ones their teams come from
+    order: list[str] = []
+    visited = set()
+
+    def visit(match_id: str):
+        if match_id in visited:
+            return
+        visited.add(match_id)
+        for source in depends[match_id] + ([conditions[match_id]] if match_id in conditions else []):
+            visit(source)
+        order.append(match_id)
+
+    for match_id in matches:
+        visit(match_id)
+    index = {match_id: k for k, match_id in enumerate(order)}
+
+    # rounds: match id prefix ('W1', 'L2', 'GF'...), simple elimination ones ('2', '1', '0') count from first round
+    groups: dict[str, int] = {}  # round label -> sort key
+    steps = []
+    for position, match_id in enumerate(matches):
+        prefix = match_id.rsplit('-', 1)[0]
+        if prefix.isdigit():
+            groups.setdefault(f'round {stage.bracket_depth - int(prefix)}', stage.bracket_depth - int(prefix))
+        elif match_id not in conditions:  # a reset opposes the same teams again
+            groups.setdefault(prefix, position)
+    rounds = sorted(groups, key=lambda g: groups[g])
+    for match_id in order:
+        m = matches[match_id]
+        group = None
+        if match_id not in conditions:
+            prefix = match_id.rsplit('-', 1)[0]
+            group = rounds.index(f'round {stage.bracket_depth - int(prefix)}' if prefix.isdigit() else prefix)
+        to_win = math.ceil(m.bo / 2)
+        fixed = None
+        if m.ended:
+            fixed = 1 if m.get_winner() == m.blue_team else 0
+        steps.append((group, _source(m.blue_team, index, teams_index), _source(m.red_team, index, teams_index),
+                      to_win - m.bo_blue_score, to_win - m.bo_red_score, fixed,
+                      index[conditions[match_id]] if match_id in conditions else None))
+    final = index['GF-2' if 'GF-2' in matches else '0-1']
+    return {'kind': ELIMINATION, 'rounds': rounds, 'steps': steps, 'final': final}
+
+
+def _fixture(m, teams_index: dict[str, int]) -> tuple:
+    to_win = math.ceil(m.bo / 2)
+    n = len(teams_index)
+    return (teams_index.get(m.blue_team, n), teams_index.get(m.red_team, n),
+            to_win - m.bo_blue_score, to_win - m.bo_red_score)
+
+
+def _points_plan(stage: Ruleset, teams_index: dict[str, int]) -> dict:
+    names = list(teams_index)
+    to_win = math.ceil(stage.bo / 2)
+    fixtures = [_fixture(stage.get_match(match_id), teams_index) for match_id in stage.match_queue]
+    swiss_rounds = 0
+    if stage.rules_type == RulesetEnum.ROUND_ROBIN:
+        total = schedule.rounds_count(len(names), stage.double_round_robin)
+        for round_idx in range(stage.round, total):
+            fixtures += [(teams_index[blue], teams_index[red], to_win, to_win)
+                         for blue, red in schedule.round_robin_round(names, round_idx, stage.double_round_robin)
+                         if BYE not in (blue, red)]
+    else:
+        swiss_rounds = stage.max_rounds - stage.round
+    return {'kind': POINTS, 'rounds': [f'rank {k + 1}' for k in range(len(names))],
+            'points': [stage.standings.points[stage.standings.seeds[name]] for name in names],
+            'goals_diff': [stage.standings.goals_scored[stage.standings.seeds[name]] -
+                           stage.standings.goals_taken[stage.standings.seeds[name]] for name in names],
+            'rank': [stage.get_rank(name) - 1 for name in names],
+            'fixtures': fixtures, 'swiss_rounds': swiss_rounds, 'to_win': to_win}
+
+
+def build_plan(stage: Ruleset) -> dict:
+    if len(stage.bracket) == 0 and len(stage.match_history) == 0 and len(stage.pool) != 0:
+        # stage not started yet: simulate the bracket it would start with
+        stage = copy.deepcopy(stage)
+        with events.muted():  # the copy is not the live stage
+            stage.init_bracket()
+    teams = [t.name for t in stage.pool]
+    teams_index = {name: i for i, name in enumerate(teams)}
+    if stage.rules_type in (RulesetEnum.SIMPLE_ELIMINATION, RulesetEnum.DOUBLE_ELIMINATION):
+        plan = _elimination_plan(stage, teams_index)
+    else:
+        plan = _points_plan(stage, teams_index)
+    plan['teams'] = teams
+    plan['elo'] = [t.elo for t in stage.pool]
+    return plan
+
+
+class _SeriesTable:
+    # series win probability of every (blue, red) couple, for each (blue needed, red needed) games.
+    # Index n stands for byes: a bye always loses, two byes give a bye.
+
+    def __init__(self, elo: list[int]):
+        import numpy as np
+        n = len(elo)
+        ratings = np.asarray(list(elo) + [0], dtype=np.float64)
+        self.games = game_win_probability(ratings[:, None], ratings[None, :])
+        self.n = n
+        self.tables = {}
+
+    def get(self, blue_needed: int, red_needed: int):
+        key = (blue_needed, red_needed)
+        table = self.tables.get(key)
+        if table is None:
+            table = series_win_probability(self.games, blue_needed, red_needed)
+            table[:, self.n] = 1
+            table[self.n, :] = 0
+            table[self.n, self.n] = 1
+            table = self.tables[key] = table
+        return table
+
+
+def _run_elimination(plan: dict, simulations: int, rng) -> tuple:
+    import numpy as np
+    n = len(plan['teams'])
+    table = _SeriesTable(plan['elo'])
+    reach = np.zeros((n + 1, len(plan['rounds'])), dtype=np.int64)
+    winners = []
+    losers = []
+    blue_won = []
+
+    def resolve(source):
+        kind, value = source
+        if kind == 0:
+            return np.full(simulations, value, dtype=np.intp)
+        return winners[value] if kind == 1 else losers[value]
+
+    for group, blue_source, red_source, blue_needed, red_needed, fixed, condition in plan['steps']:
+        blue = resolve(blue_source)
+        red = resolve(red_source)
+        if fixed is not None:
+            won = np.full(simulations, fixed == 1)
+        else:
+            won = rng.random(simulations) < table.get(blue_needed, red_needed)[blue, red]
+        winners.append(np.where(won, blue, red))
+        losers.append(np.where(won, red, blue))
+        blue_won.append(won)
+        if group is not None:
+            reach[:, group] += np.bincount(blue, minlength=n + 1) + np.bincount(red, minlength=n + 1)
+    final = plan['final']
+    champions = winners[final]
+    condition = plan['steps'][final][6]
+    if condition is not None:  # reset not played: GF-1 winner is the champion
+        champions = np.where(blue_won[condition], winners[condition], champions)
+    return reach[:n], np.bincount(champions, minlength=n + 1)[:n]
+
+
+def _ranking_key(points, goals_diff, tie_break):
+    # points, then goals diff, then current rank, as one sortable integer
+    import numpy as np
+    return (points.astype(np.int64) * 2 ** 20 + goals_diff + 2 ** 19) * (len(tie_break) + 1) + tie_break
+
+
+def _play_series(p, blue_needed: int, red_needed: int, rng) -> tuple:
+    # game by game, p: blue game win probability. Returns blue won series, blue games won, red games won.
+    import numpy as np
+    blue_games = np.zeros(p.shape, dtype=np.int32)
+    red_games = np.zeros(p.shape, dtype=np.int32)
+    for _ in range(max(blue_needed + red_needed - 1, 0)):
+        playing = (blue_games < blue_needed) & (red_games < red_needed)
+        blue_won_game = rng.random(p.shape) < p
+        blue_games += playing & blue_won_game
+        red_games += playing & ~blue_won_game
+    return blue_games >= blue_needed, blue_games, red_games
+
+
+def _run_points(plan: dict, simulations: int, rng) -> tuple:
+    import numpy as np
+    n = len(plan['teams'])
+    table = _SeriesTable(plan['elo'])
+    # one extra column for byes. Goals are not simulated: goals diff moves by one per game won or lost.
+    points = np.zeros((simulations, n + 1), dtype=np.int32)
+    points[:, :n] = plan['points']
+    goals_diff = np.zeros((simulations, n + 1), dtype=np.int32)
+    goals_diff[:, :n] = plan['goals_diff']
+    for blue, red, blue_needed, red_needed in plan['fixtures']:
+        p = np.full(simulations, table.games[blue, red])
+        won, blue_games, red_games = _play_series(p, blue_needed, red_needed, rng)
+        points[:, blue] += np.where(won, WINNING_POINTS, LOSING_POINTS).astype(np.int32)
+        points[:, red] += np.where(won, LOSING_POINTS, WINNING_POINTS).astype(np.int32)
+        goals_diff[:, blue] += blue_games - red_games
+        goals_diff[:, red] -= blue_games - red_games
+    points[:, n] = 0
+    goals_diff[:, n] = 0
+    tie_break = n - np.asarray(plan['rank'] + [n], dtype=np.int64)
+    rows = np.arange(simulations)[:, None]
+    for _ in range(plan['swiss_rounds']):
+        active = points < SWISS_QUALIFIED_POINTS
+        active[:, n] = False
+        key = np.where(active, _ranking_key(points, goals_diff, tie_break), -1)
+        order = np.argsort(-key, axis=1, kind='stable')
+        if order.shape[1] % 2 == 1:
+            order = order[:, :-1]  # drops a bye (or an inactive team when n is even)
+        blue = order[:, 0::2]
+        red = order[:, 1::2]
+        blue_active = np.take_along_axis(active, blue, axis=1)
+        red_active = np.take_along_axis(active, red, axis=1)
+        won, blue_games, red_games = _play_series(table.games[blue, red], plan['to_win'], plan['to_win'], rng)
+        won |= ~red_active  # bye: won without playing
+        played = blue_active & red_active
+        games_diff = np.where(played, blue_games - red_games, 0).astype(np.int32)
+        points[rows, blue] += np.where(blue_active, np.where(won, WINNING_POINTS, LOSING_POINTS), 0).astype(np.int32)
+        points[rows, red] += np.where(played, np.where(won, LOSING_POINTS, WINNING_POINTS), 0).astype(np.int32)
+        goals_diff[rows, blue] += games_diff
+        goals_diff[rows, red] -= games_diff
+    order = np.argsort(-_ranking_key(points[:, :n], goals_diff[:, :n], tie_break[:n]), axis=1, kind='stable')
+    reach = np.zeros((n, n), dtype=np.int64)
+    for rank in range(n):
+        reach[:, rank] = np.bincount(order[:, rank], minlength=n)
+    return reach, reach[:, 0].copy()
+
+
+def _run(plan: dict, simulations: int, seed) -> tuple:
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    if plan['kind'] == ELIMINATION:
+        return _run_elimination(plan, simulations, rng)
+    return _run_points(plan, simulations, rng)
+
+
+def simulate(stage: Ruleset, simulations: int = 10_000, seed: int = None, processes: int = None,
+             chunk_size: int = 100_000) -> SimulationResult:
+    import numpy as np
+    plan = build_plan(stage)
+    chunks = [chunk_size] * (simulations // chunk_size)
+    if simulations % chunk_size != 0:
+        chunks.append(simulations % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    if processes is not None and processes > 1 and len(chunks) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(processes) as executor:
+            results = list(executor.map(_run, itertools.repeat(plan), chunks, seeds))
+    else:
+        results = [_run(plan, size, chunk_seed) for size, chunk_seed in zip(chunks, seeds)]
+    n = len(plan['teams'])
+    reach = np.zeros((n, len(plan['rounds'])), dtype=np.int64)
+    win = np.zeros(n, dtype=np.int64)
+    for chunk_reach, chunk_win in results:
+        reach += chunk_reach
+        win += chunk_win
+    return SimulationResult(plan['teams'], plan['rounds'], reach / max(simulations, 1), win / max(simulations, 1),
+                            simulations)
@@ -1,21 +1,35 @@
+import logging
 import math
 import random
 
-import pandas as pd
-
+from tournapy import presentation
+from tournapy.bulk import BulkResult
+from tournapy.core import balancing
+from tournapy.core.balancing import BalanceResult, TeamSlot
 from tournapy.core.model import Player, Team
 from tournapy.core.ruleset import Ruleset
 
+log = logging.getLogger(__name__)
+
 
 class Tournament:
 
     def __init__(self):
+        self.version = 0  # incremented on every change, tables views are cached per version
+        self._views: dict[str, tuple] = {}
+        # kind -> {key: version of its last change}, oldest first: 'player' or 'team' name, 'tournament' None
+        # for settings. Only recorded once track_changes() was called, see tournapy.serialization
+        self.changes: dict[str, dict] = None
         self.name = None
         self.team_size = None
         self.registration_opened = False
         self.admins: list[str] = []
         self.players_dict: dict[str, Player] = {}
         self.teams_dict: dict[str, Team] = {}
+        # team name -> {player name: player}, kept in sync with Player.team
+        self.team_members: dict[str, dict[str, Player]] = {}
+        # team name -> sum of members elo
+        self.team_elo_sum: dict[str, int] = {}
         self.stages_dict: dict[int, Ruleset] = {}
         self.current_phase_idx: int = 0
         self.logo_url: str = ""
@@ -24,20 +38,90 @@ class Tournament:
         self.name = name
         self.admins.append(organizer)
         self.team_size = team_size
+        self.touch('tournament', None)
+
+    def touch(self, kind: str = None, *keys):
+        self.version += 1
+        if self.changes is not None and kind is not None:
+            changes = self.changes[kind]
+            for key in keys:
+                changes.pop(key, None)  # moved to the end, changes stay ordered by version
+                changes[key] = self.version
+
+    def track_changes(self):
+        if self.changes is None:
+            self.changes = {'player': {}, 'team': {}, 'tournament': {}}
+
+    def views_version(self) -> tuple:
+        # teams stats and phases also change with stages
+        return self.version, tuple(stage.version for stage in self.stages_dict.values())
 
     def add_player(self, name, elo) -> bool:
         p = Player(name, elo)
         if name not in self.players_dict.keys():
             self.players_dict[name] = p
+            self.touch('player', name)
             return True
         return False
 
+    def add_players(self, rows, atomic: bool = True) -> BulkResult:
+        # rows: (player, elo[, team]). Everything is validated first; with atomic nothing is applied
+        # if a row is rejected, otherwise valid rows are applied. Team elo is computed once per team.
+        rows = list(rows)
+        result = BulkResult(len(rows))
+        players: list[Player] = []
+        new_names = set()
+        team_counts: dict[str, int] = {}
+        for i, row in enumerate(rows):
+            if len(row) < 2 or len(row) > 3:
+                result.reject(i, 'expected player, elo[, team]')
+                continue
+            name = row[0]
+            team_name = row[2] if len(row) == 3 and row[2] not in (None, '') else None
+            try:
+                elo = int(row[1])
+            except (TypeError, ValueError):
+                result.reject(i, f'invalid elo {row[1]!r}')
+                continue
+            if not name:
+                result.reject(i, 'empty player name')
+            elif name in self.players_dict or name in new_names:
+                result.reject(i, f'{name} already registered')
+            elif team_name is not None and \
+                    (self.teams_dict[team_name].size if team_name in self.teams_dict else 0) + \
+                    team_counts.get(team_name, 0) >= self.team_size:
+                result.reject(i, f'team {team_name} is already complete')
+            else:
+                new_names.add(name)
+                if team_name is not None:
+                    team_counts[team_name] = team_counts.get(team_name, 0) + 1
+                p = Player(name, elo)
+                p.team = team_name
+                players.append(p)
+        if atomic and not result.ok:
+            return result
+        for p in players:
+            self.players_dict[p.name] = p
+            if p.team is not None:
+                if p.team not in self.teams_dict:
+                    self.teams_dict[p.team] = Team(p.team)
+                self._link_player(p)
+        for team_name, count in team_counts.items():
+            t = self.teams_dict[team_name]
+            t.size += count
+            t.elo = self.get_team_elo(team_name)
+        result.applied = True
+        self.touch('player', *(p.name for p in players))
+        self.touch('team', *team_counts)
+        return result
+
     def remove_player(self, name):
         if name in self.players_dict.keys():
             team_name = self.players_dict[name].team
             if team_name is not None:
                 self.remove_from_team(team_name, name)
             del self.players_dict[name]
+            self.touch('player', name)
 
     def add_to_team(self, team_name, player_name) -> (bool, str):
         try:
@@ -45,10 +129,14 @@ class Tournament:
         except KeyError:
             t = Team(team_name)
             self.teams_dict[team_name] = t
+            self.touch('team', team_name)
         if t.size < self.team_size:
             try:
                 p = self.players_dict[player_name]
+                if p.team is not None:  # player moves from their previous team
+                    self.remove_from_team(p.team, player_name)
                 p.set_team(team_name)
+                self._link_player(p)
                 t.size += 1
                 t.elo = self.get_team_elo(team_name)
                 return True, f'{player_name} is now in team {t} ({t.size})'
@@ -59,34 +147,50 @@ class Tournament:
 
     def remove_from_team(self, team_name, player_name) -> (bool, str):
         if team_name in self.teams_dict.keys() and player_name in self.players_dict.keys():
-            players_names = list(map(lambda p: p.name, self.get_team_players(team_name)))
-            if player_name in players_names:
+            if player_name in self.team_members.get(team_name, {}):
                 player = self.players_dict[player_name]
+                self._unlink_player(player)
                 player.team = None
                 team = self.teams_dict[team_name]
                 team.size += -1
                 team.elo = self.get_team_elo(team_name)
             else:
-                print(f'Player {player_name} is not in team {team_name}')
+                log.warning('Player %s is not in team %s', player_name, team_name)
         else:
-            print(f'Player {player_name} or team {team_name} does not exist in tournament {self.name}')
+            log.warning('Player %s or team %s does not exist in tournament %s', player_name, team_name, self.name)
 
     def remove_team(self, team_name) -> (bool, str):
         try:
             for player in self.get_team_players(team_name):
                 self.remove_from_team(team_name, player.name)
             del self.teams_dict[team_name]
+            self.team_members.pop(team_name, None)
+            self.team_elo_sum.pop(team_name, None)
+            self.touch('team', team_name)
             return True, f'team {team_name} successfully removed from {self.name} tournament'
         except KeyError:
             return False, f'team {team_name} does not exist.'
 
+    def _link_player(self, player: Player):
+        self.team_members.setdefault(player.team, {})[player.name] = player
+        self.team_elo_sum[player.team] = self.team_elo_sum.get(player.team, 0) + player.elo
+        self.touch('player', player.name)
+        self.touch('team', player.team)
+
+    def _unlink_player(self, player: Player):
+        members = self.team_members.get(player.team)
+        if members is not None and members.pop(player.name, None) is not None:
+            self.team_elo_sum[player.team] -= player.elo
+            self.touch('player', player.name)
+            self.touch('team', player.team)
+
     def get_team_players(self, team_name: str) -> list[Player]:
-        return list(filter(lambda p: p.team == team_name, self.players_dict.values()))
+        return list(self.team_members.get(team_name, {}).values())
 
     def get_team_elo(self, team_name: str) -> int:
-        players = self.get_team_players(team_name)
-        if len(players) != 0:
-            return int(sum(list(map(lambda p: p.elo, players))) / len(players))
+        members = self.team_members.get(team_name)
+        if members:
+            return int(self.team_elo_sum[team_name] / len(members))
         else:
             return 0
 
@@ -98,71 +202,80 @@ class Tournament:
                 return False, feedback
         return True, 'All teams removed'
 
-    def generate_teams(self) -> (bool, str):
+    def form_teams(self, teams) -> (bool, str):
+        # creates teams, kept even when empty, and moves players in them: (team name, players names) pairs
+        teams = [(team_name, list(players_names)) for team_name, players_names in teams]
+        for team_name, players_names in teams:
+            unknown = [name for name in players_names if name not in self.players_dict]
+            if len(unknown) != 0:
+                return False, f'{", ".join(unknown)} not subscribed to tournament'
+            team = self.teams_dict.get(team_name)
+            if (team.size if team is not None else 0) + len(players_names) > self.team_size:
+                return False, f'Cannot add {len(players_names)} players to {team_name}, team would be over full'
+        for team_name, players_names in teams:
+            if team_name not in self.teams_dict:
+                self.teams_dict[team_name] = Team(team_name)
+                self.touch('team', team_name)
+            for player_name in players_names:
+                self.add_to_team(team_name, player_name)
+        return True, f'{len(teams)} teams formed'
 
+    def generate_teams(self, optimize: bool = False, time_budget: float = 0.1) -> (bool, str):
         players_num = len(self.players_dict.values())
         team_num = math.floor(players_num / self.team_size)
-        ideal_team_elo = sum(list(map(lambda p: p.elo, self.players_dict.values()))) / players_num
-        print(f'ideal_team_elo={ideal_team_elo}')
         try:
             with open('resources/team_names.txt', 'r') as f:
-                names_list = [line.strip() for line in f.readlines()]
-                print(f'team_num={team_num}')
+                # names of existing teams are not drawn again, their team would be replaced
+                names_list = [line.strip() for line in f.readlines() if line.strip() not in self.teams_dict]
                 team_names = random.sample(names_list, team_num)
                 for team_name in team_names:
-                    print(f'New team={team_name}')
-                    # chatGPT
                     self.teams_dict[team_name] = Team(team_name)
-                sorted_players = sorted(
-                    list(filter(lambda p: p.team is None, self.players_dict.values())),
-                    key=lambda p: p.elo, reverse=True)
-                for player in sorted_players:
-                    print(f'player={player}')
-                    sorted_teams = list(map(lambda t: t.name,
-                                            filter(lambda t: t.size < self.team_size,
-                                                   sorted(self.teams_dict.values(),
-                                                          key=lambda t: sum(
-                                                              list(map(lambda p: p.elo,
-                                                                       self.get_team_players(t.name))))))))
-                    lowest_team = sorted_teams[0]
-                    print(f'sorted_teams={sorted_teams}')
-                    success, feedback = self.add_to_team(lowest_team, player.name)
-                    print(f'success={success}')
-                    print(f'feedback={feedback}')
-                    print(f'player={player}')
-                    print(f'team elo={self.teams_dict[lowest_team]}')
-                    # MY WAY
-                    # sorted_players = sorted(
-                    #     list(filter(lambda p: p.team is None, self.players_dict.values())),
-                    #     key=lambda p: p.elo, reverse=True)
-                    # # print(f'sorted_players={sorted_players}')
-                    # self.add_to_team(team_name, sorted_players[0].name)
-                    # if self.teams_dict[team_name].size < self.team_size:
-                    #     self.add_to_team(team_name, sorted_players[len(sorted_players) - 1].name)
-                    # if self.teams_dict[team_name].size < self.team_size:
-                    #     current_team = self.get_team_players(team_name)
-                    #     # print(f'current_team={current_team}')
-                    #     current_team_elo_tot = sum(
-                    #         list(map(lambda p: p.elo, self.get_team_players(team_name))))
-                    #     # print(f'current_team_elo_tot={current_team_elo_tot}')
-                    #     next_player_limit = (ideal_team_elo + 15) * self.team_size - current_team_elo_tot
-                    #     # print(f'next_player_limit={next_player_limit}')
-                    #     next_players = sorted(
-                    #         list(filter(lambda p: p.elo < next_player_limit and p.team is None, sorted_players)),
-                    #         key=lambda p: p.elo, reverse=True)
-                    #     if len(next_players) == 0:
-                    #         next_players = sorted_players = sorted(
-                    #             list(filter(lambda p: p.team is None, self.players_dict.values())),
-                    #             key=lambda p: p.elo, reverse=False)
-                    #     # print(f'next_players={next_players}')
-                    #     self.add_to_team(team_name, next_players[0].name)
-                    # print(f'final team={team_name}: {self.get_team_players(team_name)}')
-            return True, 'Teams successfully generated'
+                self.touch('team', *team_names)
+                result = self.balance_teams(optimize, time_budget)
+            return True, f'Teams successfully generated (elo spread: {result.spread})'
         except FileNotFoundError:
             return False, 'Name generator cannot open resource file (FileNotFound)'
 
+    def balance_teams(self, optimize: bool = False, time_budget: float = 0.1) -> BalanceResult:
+        # dispatch players without team among open teams, see core.balancing
+        slots = [TeamSlot(t.name, t.size, self.team_elo_sum.get(t.name, 0), self.team_size)
+                 for t in self.teams_dict.values()]
+        free_players = list(filter(lambda p: p.team is None, self.players_dict.values()))
+        result = balancing.balance(slots, free_players, optimize, time_budget)
+        for slot in result.slots:
+            for player in slot.players:
+                self.add_to_team(slot.name, player.name)
+        return result
+
+    def set_players_elo(self, elos: dict[str, int]):
+        # updates players elo (e.g. from tournapy.rating), keeping teams elo in sync
+        teams = set()
+        players = []
+        for name, elo in elos.items():
+            p = self.players_dict.get(name)
+            if p is None or p.elo == elo:
+                continue
+            players.append(name)
+            if p.team is not None and name in self.team_members.get(p.team, {}):
+                self.team_elo_sum[p.team] += elo - p.elo
+                teams.add(p.team)
+            p.elo = elo
+        for team_name in teams:
+            if team_name in self.teams_dict:
+                self.teams_dict[team_name].elo = self.get_team_elo(team_name)
+        self.touch('player', *players)
+        self.touch('team', *teams)
+
+    def teams_elo_spread(self) -> int:
+        elos = [t.elo for t in self.teams_dict.values() if t.size != 0]
+        if len(elos) == 0:
+            return 0
+        return max(elos) - min(elos)
+
     def add_phase(self, order: int, ruleset: Ruleset):
+        ruleset.tournament_name = self.name
         self.stages_dict[order] = ruleset
+        self.touch()
 
     def get_current_phase(self) -> Ruleset:
         return self.get_phase(self.current_phase_idx)
@@ -181,20 +294,10 @@ class Tournament:
         return user_id in self.admins
 
     def df_players(self):
-        d = {}
-        for k, v in self.players_dict.items():
-            d[f'{k}'] = v.as_series()
-        return pd.DataFrame(d).T.sort_values(['elo'], ascending=False, ignore_index=True)
+        return presentation.cached(self, 'players', self.version, presentation.players_frame)
 
     def df_teams(self):
-        d = {}
-        for k, v in self.teams_dict.items():
-            d[f'{k}'] = v.as_series()
-        # TODO: sort by seeding
-        return pd.DataFrame(d).T.sort_values(['elo'], ascending=False, ignore_index=True)
+        return presentation.cached(self, 'teams', self.views_version(), presentation.teams_frame)
 
     def df_phases(self):
-        d = {}
-        for i in range(len(self.stages_dict)):
-            d[f'{i}'] = self.stages_dict[i].as_series()
-        return pd.DataFrame(d).T
+        return presentation.cached(self, 'phases', self.views_version(), presentation.phases_frame)
@@ -0,0 +1,33 @@
+import random
+
+import pytest
+
+from tournapy.core.model import Team
+from tournapy.core.ruleset import RulesetEnum
+
+
+def build_stage(rules_name: str, teams: int, bo: int = 1, started: bool = True):
+    stage = RulesetEnum(rules_name).get_ruleset(rules_name, teams, bo)
+    for i in range(teams):
+        stage.add_team(Team(f'team {i}'))
+    if started:
+        stage.init_bracket()
+        stage.start()
+    return stage
+
+
+def play(stage, rng: random.Random, choose=None):
+    # reports games of playable matches until the stage ends. choose(match) -> True if blue wins the game,
+    # random when not given
+    while stage.running:
+        match = next((stage.get_match(match_id) for match_id in stage.match_queue
+                      if stage.is_ready(stage.get_match(match_id))), None)
+        assert match is not None, 'running stage without playable match'
+        while not match.ended:
+            blue_wins = choose(match) if choose is not None else rng.random() < 0.5
+            stage.report_match_result(match, 1 if blue_wins else 0, 0 if blue_wins else 1)
+
+
+@pytest.fixture
+def rng():
+    return random.Random(0)
@@ -0,0 +1,96 @@
+import asyncio
+import io
+
+from tournapy.async_manager import AsyncTournamentManager, ReadWriteLock
+from tournapy.manager import TournamentManager
+
+ADMIN = 'admin'
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_read_write_lock():
+    async def scenario():
+        lock = ReadWriteLock()
+        log = []
+
+        async def reader(k):
+            async with lock.read():
+                log.append(f'read {k}')
+                await asyncio.sleep(0.01)
+                log.append(f'read {k} done')
+
+        async def writer():
+            async with lock.write():
+                log.append('write')
+                await asyncio.sleep(0.01)
+                log.append('write done')
+
+        await asyncio.gather(reader(0), reader(1), writer(), reader(2))
+        return log
+
+    log = run(scenario())
+    # readers share the lock, the writer is alone, the reader arriving after it waits
+    assert log[:2] == ['read 0', 'read 1']
+    write = log.index('write')
+    assert log[write + 1] == 'write done'
+    assert log.index('read 2') > write
+
+
+def test_commands_on_many_tournaments():
+    async def scenario():
+        manager = AsyncTournamentManager()
+        names = [f'tournament {k}' for k in range(8)]
+        await asyncio.gather(*(manager.create_tournament(name, 1, ADMIN, '') for name in names))
+
+        async def fill(name):
+            success, _ = await manager.add_players(name, [(f'player {i}', 1000 + i, f'team {i}') for i in range(8)],
+                                                   ADMIN)
+            assert success
+            assert (await manager.add_phase(name, 'swiss', 'Swiss-System', 8, 1, ADMIN))[0]
+            assert (await manager.start_next_phase(name, ADMIN))[0]
+            for k in range(4):
+                assert (await manager.report_match_result(name, 'swiss', f'1-{k}', 1, 0, ADMIN))[0]
+
+        await asyncio.gather(*(fill(name) for name in names))
+        return manager
+
+    manager = run(scenario())
+    assert sorted(manager.manager.get_tournaments_list()) == [f'tournament {k}' for k in range(8)]
+    for t in manager.manager.tourneys_dict.values():
+        assert len(t.players_dict) == 8
+        assert t.get_stage('swiss').round == 2
+
+
+def test_import_players_csv():
+    async def scenario():
+        manager = AsyncTournamentManager()
+        await manager.create_tournament('t', 2, ADMIN, '')
+        csv = io.StringIO('player,elo,team\nalice,1200,red\nbob,900,red\ncarol,1000,\n')
+        return manager, await manager.import_players_csv('t', csv, ADMIN)
+
+    manager, (success, _) = run(scenario())
+    assert success
+    t = manager.manager.get_tournament('t')
+    assert sorted(t.players_dict) == ['alice', 'bob', 'carol']
+    assert sorted(p.name for p in t.get_team_players('red')) == ['alice', 'bob']
+
+
+def test_journal(tmp_path):
+    path = str(tmp_path / 'journal')
+
+    async def scenario():
+        manager = AsyncTournamentManager()
+        assert (await manager.open_journal(path, batch_size=1))[0]
+        await manager.create_tournament('t', 1, ADMIN, '')
+        await manager.add_players('t', [('alice', 1200), ('bob', 900)], ADMIN)
+        await manager.close_journal()
+        assert manager.manager.journal is None
+
+    run(scenario())
+    recovered = TournamentManager()
+    assert recovered.open_journal(path)[0]
+    recovered.close_journal()
+    assert sorted(recovered.get_tournament('t').players_dict) == ['alice', 'bob']
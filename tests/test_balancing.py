@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+from tournapy.core import balancing
+from tournapy.core.balancing import TeamSlot
+from tournapy.core.model import Player
+
+
+def reference_assign(slots: list[TeamSlot], players: list[Player]) -> dict[str, list[str]]:
+    # the former scan: strongest player first, given to the first open team with the lowest elo sum
+    sums = {s.name: s.elo_sum for s in slots}
+    sizes = {s.name: s.size for s in slots}
+    assignment = {s.name: [] for s in slots}
+    for player in sorted(players, key=lambda p: p.elo, reverse=True):
+        open_slots = sorted((s for s in slots if sizes[s.name] < s.capacity), key=lambda s: sums[s.name])
+        if len(open_slots) == 0:
+            break
+        name = open_slots[0].name
+        assignment[name].append(player.name)
+        sums[name] += player.elo
+        sizes[name] += 1
+    return assignment
+
+
+def random_case(rng: random.Random, capacity: int):
+    slots = [TeamSlot(f'team {i}', 0, 0, capacity) for i in range(rng.randint(1, 12))]
+    for slot in rng.sample(slots, len(slots) // 3):  # some teams already have players
+        slot.size = rng.randint(1, capacity)
+        slot.elo_sum = sum(rng.randint(0, 2000) for _ in range(slot.size))
+    players = [Player(f'player {i}', rng.randint(0, 2000)) for i in range(rng.randint(0, 40))]
+    return slots, players
+
+
+@pytest.mark.parametrize('capacity', [1, 2, 3, 5])
+def test_greedy_matches_reference(capacity):
+    rng = random.Random(capacity)
+    for _ in range(100):
+        slots, players = random_case(rng, capacity)
+        expected = reference_assign(slots, players)
+        result = balancing.balance(slots, players)
+        assert {name: [p.name for p in assigned] for name, assigned in result.assignment.items()} == expected
+        assigned = sum(len(s.players) for s in result.slots)
+        assert assigned + len(result.leftovers) == len(players)
+        assert all(s.size <= s.capacity for s in result.slots)
+
+
+def test_swap_search_improves_spread():
+    rng = random.Random(0)
+    for _ in range(50):
+        players = [Player(f'player {i}', rng.randint(0, 2000)) for i in range(24)]
+        greedy = balancing.balance([TeamSlot(f'team {i}', 0, 0, 3) for i in range(8)], players)
+        optimized = balancing.balance([TeamSlot(f'team {i}', 0, 0, 3) for i in range(8)], players, optimize=True,
+                                      time_budget=1)
+        assert optimized.optimized and not greedy.optimized
+        assert optimized.spread <= greedy.spread
+        # swaps keep teams sizes and players
+        assert sorted(len(s.players) for s in optimized.slots) == [3] * 8
+        assert sorted(p.name for s in optimized.slots for p in s.players) == sorted(p.name for p in players)
+        assert all(s.elo_sum == sum(p.elo for p in s.players) for s in optimized.slots)
@@ -0,0 +1,63 @@
+import io
+
+from tournapy.bulk import read_players_csv
+from tournapy.manager import TournamentManager
+
+ADMIN = 'admin'
+ROWS = [('alice', 1200, 'red'), ('bob', 900, 'red'), ('carol', 'strong', 'blue'), ('dave', 1000, 'red'),
+        ('erin', 1100)]
+
+
+def manager_with_tournament(team_size: int = 2) -> TournamentManager:
+    manager = TournamentManager()
+    manager.create_tournament('t', team_size, ADMIN, '')
+    return manager
+
+
+def test_atomic_registration_applies_nothing_on_error():
+    manager = manager_with_tournament()
+    success, feedback = manager.add_players('t', ROWS, ADMIN)
+    assert not success
+    assert '0/5 rows applied' in feedback
+    assert len(manager.get_tournament('t').players_dict) == 0
+    assert manager.player_tournaments == {}
+
+
+def test_partial_registration_succeeds():
+    manager = manager_with_tournament()
+    success, feedback = manager.add_players('t', ROWS, ADMIN, atomic=False)
+    assert success
+    assert '3/5 rows applied' in feedback and 'row 2' in feedback and 'row 3' in feedback
+    t = manager.get_tournament('t')
+    assert sorted(t.players_dict) == ['alice', 'bob', 'erin']
+    assert t.teams_dict['red'].size == 2
+    assert t.teams_dict['red'].elo == t.get_team_elo('red')
+    assert sorted(manager.player_tournaments) == ['alice', 'bob', 'erin']
+
+
+def test_partial_registration_with_no_valid_row_fails():
+    manager = manager_with_tournament()
+    manager.add_players('t', [('alice', 1200)], ADMIN)
+    assert not manager.add_players('t', [('alice', 1000), ('bob', 'x')], ADMIN, atomic=False)[0]
+
+
+def test_registration_needs_admin():
+    manager = manager_with_tournament()
+    assert not manager.add_players('t', [('alice', 1200)], 'alice')[0]
+    assert not manager.add_players('unknown', [('alice', 1200)], ADMIN)[0]
+
+
+def test_read_players_csv():
+    rows = read_players_csv(io.StringIO('name,elo,team\n alice , 1200, red\n\nbob,900\n'))
+    assert rows == [('alice', '1200', 'red'), ('bob', '900')]
+    # no header
+    assert read_players_csv(io.StringIO('alice,1200\n')) == [('alice', '1200')]
+
+
+def test_csv_import_is_timed_once():
+    manager = manager_with_tournament()
+    success, _ = manager.import_players_csv('t', io.StringIO('alice,1200,red\nbob,900,red\n'), ADMIN)
+    assert success
+    operations = manager.metrics.snapshot()
+    assert operations['import_players_csv']['calls'] == 1
+    assert 'add_players' not in operations
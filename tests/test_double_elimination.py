@@ -0,0 +1,66 @@
+import collections
+
+import pytest
+from conftest import build_stage, play
+
+from tournapy.core.pairing import BYE
+
+DOUBLE_ELIMINATION = 'Double-Elimination'
+
+
+def losses(stage) -> collections.Counter:
+    counter = collections.Counter()
+    for m in stage.match_history:
+        winner = m.get_winner()
+        loser = m.red_team if winner == m.blue_team else m.blue_team
+        if loser != BYE:
+            counter[loser] += 1
+    return counter
+
+
+@pytest.mark.parametrize('teams', list(range(2, 34)) + [47, 64, 100, 129])
+def test_one_champion_nobody_loses_twice(teams, rng):
+    stage = build_stage(DOUBLE_ELIMINATION, teams, bo=3)
+    play(stage, rng)
+    last = stage.match_history[-1]
+    assert last.id in ('GF-1', 'GF-2')
+    champion = last.get_winner()
+    lost = losses(stage)
+    assert max(lost.values()) == 2
+    assert [team.name for team in stage.pool if lost[team.name] < 2] == [champion]
+    # every match but GF-2 is played once, GF-2 only after a losers bracket champion won GF-1
+    played = [m.id for m in stage.match_history]
+    assert len(played) == len(set(played))
+    assert set(stage.bracket) - set(played) <= {'GF-2'}
+    assert len(stage.match_queue) == 0
+
+
+@pytest.mark.parametrize('teams', [2, 5, 8, 12])
+def test_grand_final_reset(teams, rng):
+    stage = build_stage(DOUBLE_ELIMINATION, teams)
+    # blue wins everything but the grand final, won by the losers bracket champion
+    play(stage, rng, choose=lambda m: m.id != 'GF-1')
+    final, reset = stage.match_history[-2:]
+    assert (final.id, reset.id) == ('GF-1', 'GF-2')
+    assert (reset.blue_team, reset.red_team) == (final.blue_team, final.red_team)
+    assert final.get_winner() == final.red_team
+    assert losses(stage)[reset.get_winner()] == 1
+    assert not stage.running
+
+
+def test_no_reset_when_winners_champion_wins(rng):
+    stage = build_stage(DOUBLE_ELIMINATION, 8)
+    play(stage, rng, choose=lambda m: True)
+    assert stage.match_history[-1].id == 'GF-1'
+    assert 'GF-2' not in [m.id for m in stage.match_history]
+    assert not stage.running
+
+
+def test_byes_are_walkovers():
+    stage = build_stage(DOUBLE_ELIMINATION, 5)
+    byes = [m for m in stage.match_history if BYE in (m.blue_team, m.red_team)]
+    assert len([m for m in byes if m.id.startswith('W1-')]) == 3
+    # byes never beat a team, and a match with both sides known never waits on a bye
+    assert all(m.ended and (m.get_winner() != BYE or m.blue_team == m.red_team) for m in byes)
+    ready = [stage.get_match(match_id) for match_id in stage.match_queue if stage.is_ready(stage.get_match(match_id))]
+    assert all(BYE not in (m.blue_team, m.red_team) for m in ready)
@@ -0,0 +1,88 @@
+import asyncio
+import threading
+
+from conftest import play
+
+from tournapy import events
+from tournapy.events import EventBus
+from tournapy.manager import TournamentManager
+
+ADMIN = 'admin'
+
+
+def test_filters_and_failing_subscriber(caplog):
+    bus = EventBus()
+    received = []
+
+    def fail(event):
+        raise RuntimeError('consumer bug')
+
+    bus.subscribe(fail)
+    with bus.subscribe(received.append, kinds=('match_ended',), tournament='t'):
+        bus.emit('match_ended', 't', 'stage')
+        bus.emit('match_ended', 'u', 'stage')
+        bus.emit('game_reported', 't', 'stage')
+    bus.emit('match_ended', 't', 'stage')
+    assert [(event.kind, event.tournament) for event in received] == [('match_ended', 't')]
+    assert len([record for record in caplog.records if 'consumer bug' in str(record.exc_info)]) == 4
+
+
+def test_muted_in_current_thread_only():
+    bus = EventBus()
+    received = []
+    bus.subscribe(lambda event: received.append(event.kind))
+    with bus.muted():
+        with bus.muted():
+            bus.emit('inner')
+        bus.emit('outer')
+        thread = threading.Thread(target=bus.emit, args=('other thread',))
+        thread.start()
+        thread.join()
+    bus.emit('after')
+    assert received == ['other thread', 'after']
+
+
+def test_manager_and_stage_events(rng):
+    manager = TournamentManager()
+    received = []
+    with events.subscribe(received.append):
+        manager.create_tournament('t', 1, ADMIN, '')
+        assert not manager.add_player('t', 'player 0', 1000, 'somebody')[0]  # rejected: no event
+        for i in range(2):
+            manager.add_player('t', f'player {i}', 1000, ADMIN)
+            manager.add_team('t', f'team {i}', f'player {i}', ADMIN)
+        manager.add_phase('t', 'stage', 'Simple-Elimination', 2, 3, ADMIN)
+        manager.start_next_phase('t', ADMIN)
+        play(manager.get_tournament('t').get_stage('stage'), rng)
+    kinds = [event.kind for event in received]
+    assert kinds[:5] == ['create_tournament', 'add_player', 'add_team', 'add_player', 'add_team']
+    assert kinds.count('match_ready') == 1 and kinds.count('match_ended') == 1 and kinds.count('stage_ended') == 1
+    # matches of the first round are ready as the bracket is built, before the stage starts
+    assert kinds.index('match_ready') < kinds.index('bracket_created') < kinds.index('stage_started') \
+        < kinds.index('start_next_phase') < kinds.index('game_reported') < kinds.index('match_ended') \
+        < kinds.index('stage_ended')
+    assert received[1].detail == ('player 0', 1000, ADMIN)
+    assert all(event.tournament == 't' for event in received)
+    assert events.bus.subscriptions == ()
+
+
+def test_stream():
+    bus = EventBus()
+
+    async def consume():
+        stream = bus.stream(tournament='t', maxsize=3)
+        thread = threading.Thread(target=lambda: [bus.emit('game_reported', name) for name in ('t', 'u', 't')])
+        thread.start()
+        thread.join()
+        first = await stream.__anext__()
+        second = await stream.__anext__()
+        for k in range(4):  # only the 3 last ones are kept
+            bus.emit(f'event {k}', 't')
+        stream.close()
+        rest = [event.kind async for event in stream]
+        return first, second, rest, stream.dropped
+
+    first, second, rest, dropped = asyncio.run(consume())
+    assert (first.tournament, second.tournament) == ('t', 't')
+    assert rest == ['event 1', 'event 2', 'event 3'] and dropped == 1
+    assert bus.subscriptions == ()
@@ -0,0 +1,28 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+
+def imported_modules(statement: str) -> set[str]:
+    # modules loaded by a fresh interpreter running statement
+    probe = f'import sys\nsys.path.insert(0, {SRC!r})\n{statement}\nprint(" ".join(sys.modules))'
+    result = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True, check=True)
+    return set(result.stdout.split())
+
+
+@pytest.mark.parametrize('statement', ['import tournapy',
+                                       'from tournapy.manager import TournamentManager',
+                                       'from tournapy.core.ruleset import RulesetEnum'])
+def test_engine_import_is_light(statement):
+    # pandas and numpy are imported on first use, asyncio only by the async facade and event streams
+    modules = imported_modules(statement)
+    assert 'tournapy' in modules
+    assert {'pandas', 'numpy', 'asyncio'}.isdisjoint(modules)
+
+
+def test_async_facade_imports_asyncio():
+    assert 'asyncio' in imported_modules('import tournapy.async_manager')
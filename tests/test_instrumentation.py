@@ -0,0 +1,58 @@
+import logging
+
+import pytest
+from conftest import play
+
+from tournapy import instrumentation
+from tournapy.manager import TournamentManager
+
+ADMIN = 'admin'
+
+
+def test_manager_metrics():
+    manager = TournamentManager()
+    assert manager.create_tournament('t', 1, ADMIN, '')
+    assert not manager.create_tournament('t', 1, ADMIN, '')
+    assert not manager.add_player('t', 'alice', 1000, 'somebody')[0]
+    with pytest.raises(Exception):
+        manager.add_players('t', None, ADMIN)
+    operations = manager.metrics.snapshot()
+    assert operations['create_tournament']['calls'] == 2 and operations['create_tournament']['rejected'] == 1
+    assert operations['add_player'] == {**operations['add_player'], 'calls': 1, 'rejected': 1, 'errors': 0}
+    assert operations['add_players']['errors'] == 1
+    stats = operations['create_tournament']
+    assert 0 < stats['seconds_max'] <= stats['seconds_total']
+    manager.metrics.reset()
+    assert manager.metrics.snapshot() == {}
+    manager.metrics.enabled = False
+    manager.create_tournament('u', 1, ADMIN, '')
+    assert manager.metrics.snapshot() == {}
+
+
+def test_merge_and_prometheus():
+    first = {'add_player': {'calls': 2, 'rejected': 1, 'errors': 0, 'seconds_total': 0.5, 'seconds_max': 0.4}}
+    second = {'add_player': {'calls': 1, 'rejected': 0, 'errors': 1, 'seconds_total': 0.25, 'seconds_max': 0.25},
+              'add_team': {'calls': 1, 'rejected': 0, 'errors': 0, 'seconds_total': 0.1, 'seconds_max': 0.1}}
+    merged = instrumentation.merge([first, second])
+    assert merged['add_player'] == {'calls': 3, 'rejected': 1, 'errors': 1, 'seconds_total': 0.75,
+                                    'seconds_max': 0.4}
+    text = instrumentation.prometheus(merged, 'engine')
+    assert '# TYPE engine_operation_calls_total counter' in text
+    assert '# TYPE engine_operation_seconds_max gauge' in text
+    assert 'engine_operation_calls_total{operation="add_player"} 3' in text
+    assert 'engine_operation_seconds_max{operation="add_team"} 0.1' in text
+
+
+def test_stage_logs_instead_of_printing(capsys, caplog, rng):
+    manager = TournamentManager()
+    manager.create_tournament('t', 1, ADMIN, '')
+    for i in range(4):
+        manager.add_player('t', f'player {i}', 1000, ADMIN)
+        manager.add_team('t', f'team {i}', f'player {i}', ADMIN)
+    manager.add_phase('t', 'stage', 'Round-Robin', 4, 1, ADMIN)
+    with caplog.at_level(logging.INFO, logger='tournapy'):
+        manager.start_next_phase('t', ADMIN)
+        play(manager.get_tournament('t').get_stage('stage'), rng)
+    assert capsys.readouterr().out == ''
+    assert any('match ended' in record.getMessage() for record in caplog.records)
+    assert all(record.name.startswith('tournapy.') for record in caplog.records)
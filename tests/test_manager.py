@@ -0,0 +1,66 @@
+import random
+
+from tournapy.manager import TournamentManager
+
+ADMIN = 'admin'
+
+
+def scan(manager: TournamentManager, player_name: str) -> list[tuple[str, str, str]]:
+    # every queued match of the player's team, in every running stage of every tournament
+    matches = []
+    for t in manager.tourneys_dict.values():
+        player = t.players_dict.get(player_name)
+        if player is None or player.team is None:
+            continue
+        for stage in t.stages_dict.values():
+            if stage.running:
+                matches += [(t.name, stage.name, match_id) for match_id in stage.match_queue
+                            if player.team in (stage.get_match(match_id).blue_team, stage.get_match(match_id).red_team)]
+    return matches
+
+
+def check(manager: TournamentManager, players: list[str]):
+    registered = {}
+    for t in manager.tourneys_dict.values():
+        for name in t.players_dict:
+            registered.setdefault(name, set()).add(t.name)
+    assert {name: set(tournaments) for name, tournaments in manager.player_tournaments.items()} == registered
+    for name in players:
+        found = [(tournament, stage, match.id) for tournament, stage, match in manager.next_matches(name)]
+        expected = scan(manager, name)
+        assert len(found) == len(set(found))
+        # one match per running stage: the first pending one of the team
+        assert set(found) <= set(expected)
+        assert {(tournament, stage) for tournament, stage, _ in found} == \
+            {(tournament, stage) for tournament, stage, _ in expected}
+
+
+def test_next_matches(tmp_path):
+    rng = random.Random(0)
+    manager = TournamentManager()
+    players = [f'player {i}' for i in range(12)]
+    for k, rules_name in enumerate(('Simple-Elimination', 'Double-Elimination', 'Round-Robin', 'Swiss-System')):
+        name = f'tournament {k}'
+        manager.create_tournament(name, 2, ADMIN, '')
+        manager.add_players(name, [(player, 1000, f'team {i // 2}') for i, player in enumerate(rng.sample(players, 8))],
+                            ADMIN)
+        manager.add_phase(name, 'stage', rules_name, 4, 3, ADMIN)
+    check(manager, players)
+    for k in range(4):
+        manager.start_next_phase(f'tournament {k}', ADMIN)
+    check(manager, players)
+    for _ in range(60):
+        tournament_name, stage_name, match = rng.choice(manager.next_matches(rng.choice(players)) or [(None,) * 3])
+        if tournament_name is not None:
+            manager.report_match_result(tournament_name, stage_name, match.id, 1, 0, ADMIN)
+        check(manager, players)
+    manager.remove_player('tournament 2', manager.get_tournament('tournament 2').get_team_players('team 0')[0].name,
+                          ADMIN)
+    manager.delete_tournament('tournament 3', ADMIN)
+    check(manager, players)
+    path = str(tmp_path / 'snapshot')
+    manager.snapshot(path)
+    restored = TournamentManager()
+    restored.restore(path)
+    check(restored, players)
+    assert restored.player_tournaments == manager.player_tournaments
@@ -0,0 +1,75 @@
+import math
+import random
+
+import pytest
+
+from tournapy.core.model import Match
+from tournapy.rocketleague.rank_enum import RocketLeagueRank
+
+
+def series_score(blue: list[int], red: list[int]) -> tuple[int, int]:
+    return sum(b > r for b, r in zip(blue, red)), sum(r > b for b, r in zip(blue, red))
+
+
+@pytest.mark.parametrize('bo', [1, 2, 3, 5, 7])
+def test_series_score(bo):
+    rng = random.Random(bo)
+    for _ in range(200):
+        match = Match('1-1', bo, 'blue', 'red')
+        blue, red = [], []
+        while not match.ended and len(blue) < bo:
+            blue.append(rng.randint(0, 5))
+            red.append(rng.randint(0, 5))
+            match.add_game_result(blue[-1], red[-1])
+            if not match.ended and rng.random() < 0.3:  # a game score is corrected
+                game = rng.randint(1, len(blue))
+                blue[game - 1], red[game - 1] = rng.randint(0, 5), rng.randint(0, 5)
+                match.set_result(game, blue[game - 1], red[game - 1])
+            assert (match.blue_score, match.red_score) == (blue, red)
+            assert (match.bo_blue_score, match.bo_red_score) == series_score(blue, red)
+        to_win = math.ceil(bo / 2)
+        assert match.ended == (to_win in series_score(blue, red))
+        if match.ended:
+            assert match.get_winner() == ('blue' if match.bo_blue_score > match.bo_red_score else 'red')
+            with pytest.raises(Exception):
+                match.add_game_result(1, 0)
+        assert match.compute_bo() == match.ended
+        assert match.get_result() == ['blue', blue, 'red', red, match.get_winner()]
+
+
+def test_match_layout():
+    match = Match('1-1', 3, 'blue', 'red')
+    assert not hasattr(match, '__dict__')
+    with pytest.raises(AttributeError):
+        match.comment = 'no new attribute'
+    with pytest.raises(IndexError):
+        match.set_result(1, 1, 0)
+    match.add_game_result(2, 1)
+    assert match.blue_score == [2] and match.red_score == [1]
+    assert match.__json__() == {'blue': 1, 'red': 0}
+    match.walkover('red')
+    assert match.ended and match.get_winner() == 'red'
+
+
+def test_rank_lookups():
+    for e in RocketLeagueRank:
+        assert RocketLeagueRank.from_label(e.value['label']) is e
+        # first member declared with this elo, like the former scan
+        assert RocketLeagueRank.from_elo(e.elo) is next(r for r in RocketLeagueRank if r.elo == e.elo)
+    assert RocketLeagueRank.from_label('Unknown') is None and RocketLeagueRank.from_elo(12345) is None
+    assert RocketLeagueRank.as_list() == [e.value for e in RocketLeagueRank]
+
+
+def test_rank_classification():
+    tiers = RocketLeagueRank.tiers()
+    assert [e.elo for e in tiers] == sorted(e.elo for e in RocketLeagueRank)
+    rng = random.Random(0)
+    elos = [rng.randint(tiers[0].elo - 100, tiers[-1].elo + 100) for _ in range(2000)] + [e.elo for e in tiers]
+    for elo in elos:
+        below = [e for e in tiers if e.elo <= elo]
+        expected = below[-1] if below else tiers[0]
+        assert RocketLeagueRank.classify(elo).elo == expected.elo
+        nearest = min(tiers, key=lambda e: (abs(e.elo - elo), e.elo))
+        assert RocketLeagueRank.nearest(elo).elo == nearest.elo
+    pytest.importorskip('numpy')
+    assert RocketLeagueRank.classify_many(elos) == [RocketLeagueRank.classify(elo) for elo in elos]
@@ -0,0 +1,172 @@
+import marshal
+import random
+
+import pytest
+
+from tournapy import events, persistence
+from tournapy.manager import TournamentManager
+from tournapy.rating import RatingEngine
+
+ADMIN = 'admin'
+RULESETS = ('Simple-Elimination', 'Double-Elimination', 'Round-Robin', 'Swiss-System')
+
+
+def report_games(manager: TournamentManager, tournament_name: str, games: int, rng: random.Random):
+    stage = manager.get_tournament(tournament_name).get_current_phase()
+    for _ in range(games):
+        ready = [match_id for match_id in stage.match_queue if stage.is_ready(stage.get_match(match_id))]
+        if not stage.running or len(ready) == 0:
+            return
+        loser = rng.randint(0, 3)  # no drawn game, a bo could end without winner
+        blue, red = (loser + 1, loser) if rng.random() < 0.5 else (loser, loser + 1)
+        success, _ = manager.report_match_result(tournament_name, stage.name, rng.choice(ready), blue, red, ADMIN)
+        assert success
+
+
+def run(manager: TournamentManager, rng: random.Random, games: int):
+    for k, rules_name in enumerate(RULESETS):
+        name = f'tournament {k}'
+        manager.create_tournament(name, 1, ADMIN, '')
+        for i in range(13):
+            manager.add_player(name, f'player {i}', rng.randint(0, 1900), ADMIN)
+            manager.add_team(name, f'team {i}', f'player {i}', ADMIN)
+        manager.remove_player(name, 'player 12', ADMIN)
+        manager.add_phase(name, 'stage', rules_name, 16, 3, ADMIN)
+        manager.set_tiebreaks(name, 'stage', ('points', 'buchholz'), ADMIN)
+        manager.start_next_phase(name, ADMIN)
+        report_games(manager, name, games, rng)
+    RatingEngine().update(manager.tourneys_dict.values(), manager=manager, user_id=ADMIN)
+
+
+def state(manager: TournamentManager) -> list[tuple]:
+    # snapshot content, compared as values: marshal bytes depend on objects identity
+    return [persistence._dump_tournament(t) for t in manager.tourneys_dict.values()]
+
+
+@pytest.mark.parametrize('games', [0, 7, 40, 1000])
+def test_snapshot_restore(tmp_path, games):
+    live = TournamentManager()
+    run(live, random.Random(games), games)
+    path = str(tmp_path / 'snapshot')
+    assert live.snapshot(path)[0]
+    restored = TournamentManager()
+    assert restored.restore(path)[0]
+    assert state(restored) == state(live)
+    # restored stages go on like the live ones
+    report_games(live, 'tournament 1', 1000, random.Random(1))
+    report_games(restored, 'tournament 1', 1000, random.Random(1))
+    assert state(restored) == state(live)
+
+
+@pytest.mark.parametrize('games', [0, 7, 40, 1000])
+def test_journal_replay(tmp_path, games):
+    path = str(tmp_path / 'journal')
+    live = TournamentManager()
+    assert live.open_journal(path)[0]
+    run(live, random.Random(games), games)
+    live.close_journal()
+    recovered = TournamentManager()
+    received = []
+    with events.subscribe(received.append):
+        assert recovered.open_journal(path)[0]
+    recovered.close_journal()
+    assert state(recovered) == state(live)
+    assert received == []
+
+
+def test_checkpoint_then_journal(tmp_path):
+    journal_path = str(tmp_path / 'journal')
+    checkpoint_path = str(tmp_path / 'checkpoint')
+    rng = random.Random(0)
+    live = TournamentManager()
+    live.open_journal(journal_path)
+    run(live, rng, 10)
+    assert live.checkpoint(checkpoint_path)[0]
+    for k in range(len(RULESETS)):
+        report_games(live, f'tournament {k}', 20, rng)
+    live.close_journal()
+    recovered = TournamentManager()
+    assert recovered.open_journal(journal_path, checkpoint_path)[0]
+    recovered.close_journal()
+    assert state(recovered) == state(live)
+    assert recovered.player_tournaments == live.player_tournaments
+
+
+def test_rejected_calls_are_not_journaled(tmp_path):
+    path = str(tmp_path / 'journal')
+    manager = TournamentManager()
+    manager.open_journal(path)
+    manager.create_tournament('t', 1, ADMIN, '')
+    for i in range(4):
+        manager.add_player('t', f'player {i}', 1000, ADMIN)
+        manager.add_team('t', f'team {i}', f'player {i}', ADMIN)
+    manager.add_phase('t', 'stage', 'Double-Elimination', 4, 1, ADMIN)
+    manager.start_next_phase('t', ADMIN)
+    sequence = manager.journal.sequence
+    # teams of W2-1 are not known yet
+    assert not manager.report_match_result('t', 'stage', 'W2-1', 1, 0, ADMIN)[0]
+    assert not manager.set_tiebreaks('t', 'stage', ('points', 'unknown'), ADMIN)[0]
+    assert not manager.set_players_elo('t', {'player 0': 1200}, 'somebody')[0]
+    assert manager.journal.sequence == sequence
+    manager.close_journal()
+
+
+@pytest.mark.parametrize('removal', ['remove_team', 'clean_teams'])
+def test_restore_stage_with_removed_teams(tmp_path, removal):
+    live = TournamentManager()
+    run(live, random.Random(0), 10)
+    if removal == 'remove_team':
+        assert live.remove_team('tournament 3', 'team 0', ADMIN)[0]
+    else:
+        assert live.clean_teams('tournament 3', ADMIN)[0]
+    path = str(tmp_path / 'snapshot')
+    assert live.snapshot(path)[0]
+    restored = TournamentManager()
+    assert restored.restore(path)[0]
+    assert state(restored) == state(live)
+    stage = restored.get_tournament('tournament 3').get_stage('stage')
+    assert 'team 0' in [team.name for team in stage.pool]
+    assert 'team 0' not in restored.get_tournament('tournament 3').teams_dict
+    report_games(live, 'tournament 3', 1000, random.Random(1))
+    report_games(restored, 'tournament 3', 1000, random.Random(1))
+    assert state(restored) == state(live)
+
+
+def test_inconsistent_snapshot(tmp_path):
+    live = TournamentManager()
+    run(live, random.Random(0), 10)
+    data = persistence.dumps(live.tourneys_dict)
+    # stage pools refer to teams missing from the snapshot
+    tournaments = [persistence._dump_tournament(t) for t in live.tourneys_dict.values()]
+    tournaments[0] = tournaments[0][:7] + ((),) + tournaments[0][8:]
+    broken = data[:persistence._HEADER.size] + marshal.dumps((0, tuple(tournaments)))
+    with pytest.raises(persistence.SnapshotError):
+        persistence.loads(broken)
+    path = str(tmp_path / 'snapshot')
+    with open(path, 'wb') as f:
+        f.write(broken)
+    assert not TournamentManager().restore(path)[0]
+
+
+def test_generated_teams_replay(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'resources').mkdir()
+    (tmp_path / 'resources' / 'team_names.txt').write_text('\n'.join(f'name {i}' for i in range(50)))
+    path = str(tmp_path / 'journal')
+    live = TournamentManager()
+    live.open_journal(path)
+    live.create_tournament('t', 1, ADMIN, '')
+    for i in range(4):
+        live.add_player('t', f'player {i}', 1000 + 100 * i, ADMIN)
+    live.add_team('t', 'A', 'player 0', ADMIN)
+    live.add_team('t', 'B', 'player 1', ADMIN)
+    # 4 teams drawn for 4 players, only 2 are free: 2 teams stay empty
+    assert live.generate_teams('t', ADMIN)[0]
+    assert len(live.get_tournament('t').teams_dict) == 6
+    live.add_phase('t', 'stage', 'Simple-Elimination', 8, 1, ADMIN)
+    live.start_next_phase('t', ADMIN)
+    live.close_journal()
+    recovered = TournamentManager()
+    recovered.open_journal(path)
+    recovered.close_journal()
+    assert state(recovered) == state(live)
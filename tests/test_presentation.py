@@ -0,0 +1,63 @@
+import pytest
+from conftest import play
+
+from tournapy import presentation
+from tournapy.manager import TournamentManager
+
+ADMIN = 'admin'
+
+
+@pytest.fixture
+def backend():
+    yield presentation.set_backend
+    presentation.set_backend(None)
+
+
+def new_manager() -> TournamentManager:
+    manager = TournamentManager()
+    manager.create_tournament('t', 1, ADMIN, '')
+    for i in range(4):
+        manager.add_player('t', f'player {i}', 1000 + i, ADMIN)
+        manager.add_team('t', f'team {i}', f'player {i}', ADMIN)
+    manager.add_phase('t', 'stage', 'Round-Robin', 4, 1, ADMIN)
+    return manager
+
+
+@pytest.mark.parametrize('name', ['table', 'pandas'])
+def test_views_cached_until_changed(backend, name, rng):
+    if name == 'pandas':
+        pytest.importorskip('pandas')
+    backend(name)
+    manager = new_manager()
+    t = manager.get_tournament('t')
+    players, teams, phases = t.df_players(), t.df_teams(), t.df_phases()
+    # unchanged tournament: same objects
+    assert t.df_players() is players and t.df_teams() is teams and t.df_phases() is phases
+    manager.add_player('t', 'player 4', 900, ADMIN)
+    assert t.df_players() is not players
+    assert list(t.df_players()['name']) == ['player 3', 'player 2', 'player 1', 'player 0', 'player 4']
+    teams = t.df_teams()
+    manager.start_next_phase('t', ADMIN)
+    stage = t.get_stage('stage')
+    history, bracket = stage.get_history(), stage.get_bracket()
+    assert t.df_phases() is not phases
+    assert stage.get_history() is history and stage.get_bracket() is bracket
+    # stage changes reach tournament views
+    play(stage, rng)
+    assert t.df_teams() is not teams
+    assert sum(t.df_teams()['points']) == sum(team.points for team in t.teams_dict.values())
+    assert len(stage.get_history()) == len(stage.match_history)
+
+
+def test_views_follow_backend(backend):
+    manager = new_manager()
+    t = manager.get_tournament('t')
+    backend('table')
+    table = t.df_players()
+    assert isinstance(table, presentation.Table)
+    assert table.rows[0] == ('player 3', 1003, 'team 3')
+    with pytest.raises(ValueError):
+        presentation.set_backend('csv')
+    pytest.importorskip('pandas')
+    backend('pandas')
+    assert not isinstance(t.df_players(), presentation.Table)
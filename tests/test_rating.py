@@ -0,0 +1,98 @@
+import math
+import random
+
+import pytest
+from conftest import play
+
+from tournapy.core.pairing import BYE
+from tournapy.manager import TournamentManager
+from tournapy.rating import GLICKO_Q, RatingEngine
+
+pytest.importorskip('numpy')
+
+ADMIN = 'admin'
+
+
+def played_manager(rng: random.Random, rules_names=('Round-Robin', 'Swiss-System')) -> TournamentManager:
+    manager = TournamentManager()
+    for k, rules_name in enumerate(rules_names):
+        name = f'tournament {k}'
+        manager.create_tournament(name, 2, ADMIN, '')
+        # players take part in every tournament
+        manager.add_players(name, [(f'player {i}', rng.randint(800, 2000), f'team {i // 2}') for i in range(14)],
+                            ADMIN)
+        manager.add_phase(name, 'stage', rules_name, 7, 3, ADMIN)
+        manager.start_next_phase(name, ADMIN)
+        play(manager.get_tournament(name).get_stage('stage'), rng)
+    return manager
+
+
+def sequential(tournaments, glicko: bool, k_factor: float = 32) -> dict[str, float]:
+    # one match after the other
+    ratings = {}
+    deviations = {}
+    for t in tournaments:
+        for p in t.players_dict.values():
+            ratings.setdefault(p.name, float(p.elo))
+            deviations.setdefault(p.name, 350.0)
+    for t in tournaments:
+        for order in sorted(t.stages_dict):
+            for m in t.stages_dict[order].match_history:
+                if BYE in (m.blue_team, m.red_team):
+                    continue
+                sides = [list(t.team_members[m.blue_team]), list(t.team_members[m.red_team])]
+                team_ratings = [sum(ratings[p] for p in side) / len(side) for side in sides]
+                team_deviations = [math.sqrt(sum(deviations[p] ** 2 for p in side) / len(side)) for side in sides]
+                blue_score = 1.0 if m.get_winner() == m.blue_team else 0.0
+                for s, side in enumerate(sides):
+                    own, opponent = team_ratings[s], team_ratings[1 - s]
+                    score = blue_score if s == 0 else 1 - blue_score
+                    for p in side:
+                        if not glicko:
+                            ratings[p] += k_factor * (score - 1 / (1 + 10 ** ((opponent - own) / 400)))
+                            continue
+                        g = 1 / math.sqrt(1 + 3 * GLICKO_Q ** 2 * team_deviations[1 - s] ** 2 / math.pi ** 2)
+                        expected = 1 / (1 + 10 ** (-g * (own - opponent) / 400))
+                        precision = 1 / deviations[p] ** 2 + GLICKO_Q ** 2 * g ** 2 * expected * (1 - expected)
+                        ratings[p] += GLICKO_Q / precision * g * (score - expected)
+                        deviations[p] = max(math.sqrt(1 / precision), 30)
+    return ratings
+
+
+@pytest.mark.parametrize('glicko', [False, True])
+def test_batches_rate_like_one_match_after_the_other(glicko, rng):
+    manager = played_manager(rng)
+    tournaments = list(manager.tourneys_dict.values())
+    expected = sequential(tournaments, glicko)
+    engine = RatingEngine(glicko=glicko)
+    matches = sum(len(stage.match_history) for t in tournaments for stage in t.stages_dict.values())
+    byes = sum(BYE in (m.blue_team, m.red_team) for t in tournaments for stage in t.stages_dict.values()
+               for m in stage.match_history)
+    assert engine.update(tournaments, write=False) == matches - byes
+    for name, rating in expected.items():
+        assert engine.rating(name) == pytest.approx(rating)
+    # nothing new to rate
+    assert engine.update(tournaments, write=False) == 0
+
+
+def test_update_then_replay(rng):
+    manager = played_manager(rng, ('Round-Robin',))
+    engine = RatingEngine()
+    engine.update(manager.tourneys_dict.values(), write=False)
+    first = {name: engine.rating(name) for name in engine.players}
+    assert engine.replay(manager.tourneys_dict.values(), write=False) != 0
+    assert {name: engine.rating(name) for name in engine.players} == pytest.approx(first)
+
+
+def test_write_through_manager(rng):
+    manager = played_manager(rng, ('Round-Robin',))
+    engine = RatingEngine()
+    with pytest.raises(ValueError):
+        engine.update(manager.tourneys_dict.values(), manager=manager, user_id='somebody')
+    engine.reset()
+    engine.update(manager.tourneys_dict.values(), manager=manager, user_id=ADMIN)
+    t = manager.get_tournament('tournament 0')
+    for p in t.players_dict.values():
+        assert p.elo == round(engine.rating(p.name))
+    for team_name, team in t.teams_dict.items():
+        assert team.elo == t.get_team_elo(team_name)
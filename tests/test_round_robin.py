@@ -0,0 +1,56 @@
+import collections
+import itertools
+
+import pytest
+from conftest import play
+
+from tournapy.core import schedule
+from tournapy.core.model import Team
+from tournapy.core.pairing import BYE
+from tournapy.core.ruleset import RoundRobin, RulesetEnum
+from tournapy.manager import TournamentManager
+
+
+@pytest.mark.parametrize('teams', range(2, 15))
+@pytest.mark.parametrize('double', [False, True])
+def test_every_pair_meets(teams, double, rng):
+    stage = RoundRobin('rr', RulesetEnum.ROUND_ROBIN, teams, 1, double_round_robin=double)
+    for i in range(teams):
+        stage.add_team(Team(f'team {i}'))
+    stage.init_bracket()
+    stage.start()
+    play(stage, rng)
+    assert stage.round == schedule.rounds_count(teams, double)
+    meetings = collections.Counter(frozenset((m.blue_team, m.red_team)) for m in stage.match_history)
+    names = [team.name for team in stage.pool]
+    assert set(meetings) == set(frozenset(pair) for pair in itertools.combinations(names, 2))
+    assert set(meetings.values()) == {2 if double else 1}
+    if double:  # each team is blue once in each pairing
+        sides = collections.Counter((m.blue_team, m.red_team) for m in stage.match_history)
+        assert set(sides.values()) == {1}
+
+
+@pytest.mark.parametrize('teams', range(2, 15))
+def test_one_match_per_team_and_round(teams):
+    names = [f'team {i}' for i in range(teams)]
+    for round_idx in range(schedule.rounds_count(teams)):
+        pairs = schedule.round_robin_round(names, round_idx)
+        playing = [team for pair in pairs if BYE not in pair for team in pair]
+        assert len(set(playing)) == len(playing)
+        # odd pools: one team rests
+        assert len(playing) == teams - teams % 2
+
+
+def test_double_round_robin_phase():
+    manager = TournamentManager()
+    manager.create_tournament('t', 1, 'admin', '')
+    for i in range(4):
+        manager.add_player('t', f'player {i}', 1000, 'admin')
+        manager.add_team('t', f'team {i}', f'player {i}', 'admin')
+    assert not manager.add_phase('t', 'swiss', 'Swiss-System', 4, 1, 'admin', double_round_robin=True)[0]
+    assert manager.add_phase('t', 'rr', 'Round-Robin', 4, 1, 'admin', double_round_robin=True)[0]
+    manager.start_next_phase('t', 'admin')
+    stage = manager.get_tournament('t').get_stage('rr')
+    assert stage.double_round_robin
+    assert stage.max_rounds == schedule.rounds_count(4, True)
+    assert RulesetEnum.ROUND_ROBIN.get_ruleset('rr', 4, 1, double_round_robin=True).double_round_robin
@@ -0,0 +1,35 @@
+import pytest
+from conftest import build_stage, play
+
+RULESETS = ('Simple-Elimination', 'Double-Elimination', 'Round-Robin', 'Swiss-System')
+
+
+def check_pending(stage):
+    # pending index equals a scan of the queue (teams set on a queued match are indexed last)
+    scan = {}
+    for match_id in stage.match_queue:
+        match = stage.get_match(match_id)
+        for team in (match.blue_team, match.red_team):
+            scan.setdefault(team, set()).add(match_id)
+    assert {team: set(matches_ids) for team, matches_ids in stage.pending.items()} == scan
+    for team in stage.pool:
+        match = stage.next_match(team.name)
+        if team.name in scan:
+            assert match.id in scan[team.name]
+        else:
+            assert match is None
+    assert all(match.id not in stage.match_queue for match in stage.match_history)
+
+
+@pytest.mark.parametrize('rules_name', RULESETS)
+@pytest.mark.parametrize('teams', [2, 5, 8, 13])
+def test_pending_matches_index(rules_name, teams, rng):
+    stage = build_stage(rules_name, teams, bo=3)
+
+    def check(match):
+        check_pending(stage)
+        return rng.random() < 0.5
+
+    play(stage, rng, check)
+    check_pending(stage)
+    assert stage.pending == {} and len(stage.match_queue) == 0
@@ -0,0 +1,119 @@
+import io
+import json
+import random
+
+import pytest
+
+from tournapy import serialization
+from tournapy.manager import TournamentManager
+
+ADMIN = 'admin'
+
+
+@pytest.fixture(params=['json', 'orjson'])
+def encoder(request):
+    if request.param == 'orjson':
+        pytest.importorskip('orjson')
+    serialization.set_encoder(request.param)
+    yield request.param
+    serialization.set_encoder(None)
+
+
+class Client:
+    # tournament state rebuilt from a full state then deltas
+
+    def __init__(self):
+        self.cursor = None
+        self.state = None
+
+    def poll(self, manager: TournamentManager, name: str) -> dict:
+        payload = json.loads(manager.get_state(name, self.cursor))
+        self.cursor = payload['cursor']
+        if payload['full']:
+            self.state = normalize(payload)
+            return payload
+        state = self.state
+        for row in payload['players']:
+            state['players'][row[0]] = row
+        for row in payload['teams']:
+            state['teams'][row[0]] = row
+        # removed since the cursor, possibly added after it too
+        for player in payload['removed_players']:
+            state['players'].pop(player, None)
+        for team in payload['removed_teams']:
+            state['teams'].pop(team, None)
+        for key in ('name', 'team_size', 'logo'):
+            state[key] = payload.get(key, state[key])
+        for stage, stage_delta in zip(state['stages'], payload['stages']):
+            if stage_delta is None:
+                continue
+            stage.update({key: value for key, value in stage_delta.items()
+                          if key not in ('matches', 'history', 'standings')})
+            stage['matches'].update((row[0], row) for row in stage_delta['matches'])
+            stage['history'] += stage_delta['history']
+            stage['standings'].update((row[0], row) for row in stage_delta['standings'])
+        return payload
+
+
+def normalize(payload: dict) -> dict:
+    state = {key: payload[key] for key in ('name', 'team_size', 'logo')}
+    state['players'] = {row[0]: row for row in payload['players']}
+    state['teams'] = {row[0]: row for row in payload['teams']}
+    state['stages'] = []
+    for stage in payload['stages']:
+        stage = dict(stage)
+        stage['matches'] = {row[0]: row for row in stage['matches']}
+        stage['standings'] = {row[0]: row for row in stage['standings']}
+        state['stages'].append(stage)
+    return state
+
+
+def random_step(manager: TournamentManager, rng: random.Random, k: int):
+    t = manager.get_tournament('t')
+    stage = t.get_current_phase() if len(t.stages_dict) != 0 else None
+    if stage is not None and stage.running and rng.random() < 0.7:
+        ready = [match_id for match_id in stage.match_queue if stage.is_ready(stage.get_match(match_id))]
+        manager.report_match_result('t', stage.name, rng.choice(ready), 1, 0, ADMIN)
+    elif rng.random() < 0.5:
+        manager.add_player('t', f'player {k}', rng.randint(0, 2000), ADMIN)
+    elif rng.random() < 0.5 and len(t.players_dict) != 0:
+        manager.set_players_elo('t', {rng.choice(list(t.players_dict)): rng.randint(0, 2000)}, ADMIN)
+    elif len(t.players_dict) != 0:
+        manager.remove_player('t', rng.choice(list(t.players_dict)), ADMIN)
+
+
+@pytest.mark.parametrize('rules_name', ['Double-Elimination', 'Round-Robin', 'Swiss-System'])
+def test_deltas_rebuild_the_state(encoder, rules_name):
+    rng = random.Random(0)
+    manager = TournamentManager()
+    manager.create_tournament('t', 1, ADMIN, '')
+    for i in range(8):
+        manager.add_player('t', f'member {i}', 1000 + i, ADMIN)
+        manager.add_team('t', f'team {i}', f'member {i}', ADMIN)
+    manager.add_phase('t', 'stage', rules_name, 8, 1, ADMIN)
+    client = Client()
+    assert client.poll(manager, 't')['full']
+    manager.start_next_phase('t', ADMIN)
+    for k in range(150):
+        for _ in range(rng.randint(0, 3)):
+            random_step(manager, rng, k)
+        payload = client.poll(manager, 't')
+        assert not payload['full']
+        assert client.state == normalize(serialization.state(manager.get_tournament('t')))
+    # nothing changed: empty delta
+    payload = client.poll(manager, 't')
+    assert payload['players'] == payload['teams'] == [] and payload['stages'] == [None]
+
+
+def test_unknown_cursor_gives_full_state(encoder):
+    manager = TournamentManager()
+    manager.create_tournament('t', 1, ADMIN, '')
+    manager.add_phase('t', 'stage', 'Round-Robin', 4, 1, ADMIN)
+    cursor = json.loads(manager.get_state('t'))['cursor']
+    assert not json.loads(manager.get_state('t', cursor))['full']
+    assert json.loads(manager.get_state('t', [cursor[0] + 1] + cursor[1:]))['full']  # other epoch
+    assert json.loads(manager.get_state('t', cursor[:-1]))['full']  # other stages
+    assert json.loads(manager.get_state('t', [cursor[0], cursor[1] + 1] + cursor[2:]))['full']  # future version
+    stream = io.BytesIO()
+    serialization.write(manager.get_tournament('t'), stream)
+    assert normalize(json.loads(stream.getvalue())) == normalize(serialization.state(manager.get_tournament('t')))
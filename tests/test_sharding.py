@@ -0,0 +1,64 @@
+import pytest
+
+from tournapy.manager import TournamentManager
+from tournapy.sharding import OPERATIONS, ShardedTournamentManager
+
+ADMIN = 'admin'
+NAMES = [f'tournament {k}' for k in range(6)]
+
+
+def fill(manager, name: str):
+    results = [manager.create_tournament(name, 1, ADMIN, ''),
+               manager.add_players(name, [(f'player {i}', 1000 + i, f'team {i}') for i in range(4)], ADMIN),
+               manager.add_player(name, 'player 0', 1000, ADMIN),
+               manager.add_phase(name, 'stage', 'Round-Robin', 4, 1, ADMIN),
+               manager.start_next_phase(name, ADMIN),
+               manager.report_match_result(name, 'stage', '1-0', 1, 0, ADMIN),
+               manager.report_match_result(name, 'stage', '1-0', 1, 0, 'somebody')]
+    return results
+
+
+@pytest.fixture(scope='module')
+def sharded():
+    with ShardedTournamentManager(2) as manager:
+        yield manager
+
+
+def test_same_answers_as_a_manager(sharded):
+    plain = TournamentManager()
+    for name in NAMES:
+        assert fill(sharded, name) == fill(plain, name)
+    # tournaments are spread over both shards
+    assert {sharded.shard_of(name) for name in NAMES} == {0, 1}
+    assert sorted(sharded.get_tournaments_list()) == NAMES
+    for name in NAMES:
+        t = sharded.get_tournament(name)
+        assert sorted(t.players_dict) == sorted(plain.get_tournament(name).players_dict)
+        stage = plain.get_tournament(name).get_stage('stage')
+        assert sharded.get_standings(name, 'stage').rows() == stage.get_standings().rows()
+        assert sharded.is_admin(name, ADMIN) and not sharded.is_admin(name, 'player 0')
+    # player 1 plays in every tournament
+    assert len(sharded.next_matches('player 1')) == len(plain.next_matches('player 1')) == len(NAMES)
+    assert sharded.metrics()['create_tournament']['calls'] == len(NAMES)
+    assert 'tournapy_operation_calls_total{operation="add_players"}' in sharded.prometheus()
+
+
+def test_snapshot_per_shard(sharded, tmp_path):
+    path = str(tmp_path / 'snapshot')
+    assert sharded.snapshot(path)[0]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['snapshot.0', 'snapshot.1']
+    sharded.delete_tournament(NAMES[0], ADMIN)
+    assert not sharded.exists(NAMES[0])
+    assert sharded.restore(path)[0]
+    assert sharded.exists(NAMES[0])
+
+
+def test_errors_reach_the_caller(sharded):
+    with pytest.raises(KeyError):
+        sharded.df_players('unknown tournament')
+    # the shard keeps serving
+    assert sharded.exists(NAMES[1])
+
+
+def test_operations_are_manager_methods():
+    assert all(callable(operation) or hasattr(TournamentManager, operation) for operation in OPERATIONS)
@@ -0,0 +1,74 @@
+import math
+
+import pytest
+from conftest import build_stage, play
+
+from tournapy import events, persistence, simulation
+
+pytest.importorskip('numpy')
+
+
+def rated_stage(rules_name: str, teams: int, bo: int = 3):
+    stage = build_stage(rules_name, teams, bo)
+    for i, team in enumerate(stage.pool):
+        team.elo = 1000 + 50 * i
+    return stage
+
+
+@pytest.mark.parametrize('p', [0.0, 0.3, 0.5, 0.8, 1.0])
+def test_series_win_probability(p):
+    assert simulation.series_win_probability(p, 1, 1) == pytest.approx(p)
+    assert simulation.series_win_probability(p, 2, 2) == pytest.approx(p * p * (3 - 2 * p))
+    # series score 1-2 in a bo5: blue wins the two last games
+    assert simulation.series_win_probability(p, 2, 1) == pytest.approx(p * p)
+    assert simulation.series_win_probability(p, 0, 3) == 1 and simulation.series_win_probability(p, 3, 0) == 0
+    assert simulation.game_win_probability(1200, 1200) == 0.5
+
+
+def test_two_teams_final():
+    stage = rated_stage('Simple-Elimination', 2)
+    result = simulation.simulate(stage, 200_000, seed=0)
+    p = simulation.game_win_probability(stage.pool[0].elo, stage.pool[1].elo)
+    assert result.win[0] == pytest.approx(simulation.series_win_probability(p, 2, 2), abs=0.01)
+    assert result.win.sum() == pytest.approx(1)
+
+
+@pytest.mark.parametrize('rules_name', ['Simple-Elimination', 'Double-Elimination', 'Round-Robin', 'Swiss-System'])
+def test_probabilities(rules_name, rng):
+    stage = rated_stage(rules_name, 8)
+    before = persistence._dump_stage(stage, {team.name: team for team in stage.pool})
+    received = []
+    with events.subscribe(received.append):
+        result = simulation.simulate(stage, 5000, seed=1)
+    # the stage is left untouched, simulated brackets emit no event
+    assert persistence._dump_stage(stage, {team.name: team for team in stage.pool}) == before
+    assert received == []
+    assert result.win.sum() == pytest.approx(1)
+    assert set(result.as_dict()) == {team.name for team in stage.pool}
+    if rules_name in ('Round-Robin', 'Swiss-System'):  # each rank is given to one team
+        assert result.reach.sum(axis=0) == pytest.approx([1] * len(stage.pool))
+    # the strongest team is the favourite
+    assert max(range(8), key=lambda i: result.win[i]) == 7
+    # same seed, same result, whatever the chunks processes
+    again = simulation.simulate(stage, 5000, seed=1, chunk_size=1000)
+    spread = simulation.simulate(stage, 5000, seed=1, chunk_size=1000, processes=2)
+    assert (again.reach == spread.reach).all() and (again.win == spread.win).all()
+
+
+def test_played_bracket(rng):
+    stage = rated_stage('Simple-Elimination', 8)
+    # first round over: losers cannot win anymore
+    for _ in range(4):
+        match = next(stage.get_match(match_id) for match_id in stage.match_queue
+                     if stage.is_ready(stage.get_match(match_id)))
+        while not match.ended:
+            stage.report_match_result(match, 1, 0)
+    losers = {m.red_team for m in stage.match_history}
+    result = simulation.simulate(stage, 2000, seed=0)
+    for i, team in enumerate(result.teams):
+        assert (result.win[i] == 0) == (team in losers)
+    play(stage, rng)
+    result = simulation.simulate(stage, 100, seed=0)
+    winner = stage.match_history[-1].get_winner()
+    assert result.as_dict()[winner]['win'] == 1
+    assert math.isclose(result.win.sum(), 1)
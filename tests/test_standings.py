@@ -0,0 +1,103 @@
+import random
+
+import pytest
+from conftest import build_stage, play
+
+from tournapy.core.model import Match
+from tournapy.core.standings import compute_standings
+
+POINTS = (3, 1, 0)
+
+
+def random_matches(rng: random.Random, names: list[str], count: int) -> list[Match]:
+    matches = []
+    for k in range(count):
+        blue, red = rng.sample(names + ['forfeit'], 2)
+        match = Match(str(k), 3, blue, red)
+        while not match.ended and match.games_played < match.bo:
+            match.add_game_result(rng.randint(0, 4), rng.randint(0, 4))
+        if rng.random() < 0.1:
+            match.ended = False  # not finished, ignored
+        match.ended = match.ended or (match.games_played == match.bo and rng.random() < 0.5)  # drawn series
+        matches.append(match)
+    return matches
+
+
+def reference(names: list[str], matches: list[Match]) -> dict[str, list[int]]:
+    # name -> [points, goals for, goals against, wins, draws, losses]
+    stats = {name: [0] * 6 for name in names}
+    for m in matches:
+        if not m.ended:
+            continue
+        for team, own, other, for_, against in ((m.blue_team, m.bo_blue_score, m.bo_red_score, m.blue_score,
+                                                 m.red_score),
+                                                (m.red_team, m.bo_red_score, m.bo_blue_score, m.red_score,
+                                                 m.blue_score)):
+            if team not in stats:
+                continue
+            s = stats[team]
+            result = 0 if own > other else 1 if own == other else 2
+            s[0] += POINTS[result]
+            s[1] += sum(for_)
+            s[2] += sum(against)
+            s[3 + result] += 1
+    return stats
+
+
+def test_compute_standings_matches_reference():
+    rng = random.Random(0)
+    for _ in range(50):
+        names = [f'team {i}' for i in range(rng.randint(1, 16))]
+        matches = random_matches(rng, names, rng.randint(0, 60))
+        table = compute_standings(names, matches, *POINTS)
+        expected = reference(names, matches)
+        for i, name in enumerate(names):
+            assert [int(table.points[i]), int(table.goals_for[i]), int(table.goals_against[i]), int(table.wins[i]),
+                    int(table.draws[i]), int(table.losses[i])] == expected[name]
+        # points, goals diff, then seed
+        ranked = sorted(names, key=lambda name: (-expected[name][0], expected[name][2] - expected[name][1],
+                                                 names.index(name)))
+        assert table.ranked_names() == ranked
+        assert [row[0] for row in table.rows()] == ranked
+
+
+def test_compute_standings_without_match():
+    table = compute_standings(['a', 'b'], [], *POINTS)
+    assert table.ranked_names() == ['a', 'b']
+    assert table.rows() == [('a', 0, 0, 0, 0), ('b', 0, 0, 0, 0)]
+
+
+def test_stage_standings(rng):
+    stage = build_stage('Round-Robin', 6, bo=3)
+    play(stage, rng)
+    table = stage.get_standings()
+    expected = reference([team.name for team in stage.pool], stage.match_history)
+    for team in stage.pool:
+        # totals are written back to the pool teams
+        assert [team.points, team.goals_scored, team.goals_taken] == expected[team.name][:3]
+    assert int(table.wins.sum()) == int(table.losses.sum()) == len(stage.match_history)
+
+
+@pytest.mark.parametrize('rules_name', ['Simple-Elimination', 'Double-Elimination', 'Round-Robin', 'Swiss-System'])
+def test_incremental_standings_match_replay(rules_name, rng):
+    stage = build_stage(rules_name, 11, bo=3)
+
+    def check(match):
+        # live standings, updated on each result, equal a replay of the history
+        table = compute_standings([team.name for team in stage.pool], stage.match_history, *POINTS)
+        assert [team.name for team in stage.standings.ranked_teams()] == table.ranked_names()
+        for i, name in enumerate(table.ranked_names()):
+            assert stage.get_rank(name) == i + 1
+        for i, team in enumerate(stage.pool):
+            assert stage.standings.points[i] == team.points == int(table.points[i])
+            assert team.goals_scored == int(table.goals_for[i]) and team.goals_taken == int(table.goals_against[i])
+        return rng.random() < 0.5
+
+    play(stage, rng, check)
+    check(None)
+    opponents = {team.name: [] for team in stage.pool}
+    for m in stage.match_history:
+        for team, opponent in ((m.blue_team, m.red_team), (m.red_team, m.blue_team)):
+            if team in opponents:
+                opponents[team].append(opponent)
+    assert stage.standings.opponents == opponents
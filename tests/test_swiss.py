@@ -0,0 +1,86 @@
+import collections
+import random
+
+import pytest
+from conftest import build_stage, play
+
+from tournapy.core import pairing
+from tournapy.core.pairing import BYE
+
+SWISS_SYSTEM = 'Swiss-System'
+
+
+@pytest.mark.parametrize('teams', [16, 17, 31, 32, 33, 64, 101, 128])
+@pytest.mark.parametrize('seed', range(3))
+def test_no_rematch_one_bye(teams, seed):
+    stage = build_stage(SWISS_SYSTEM, teams, bo=3)
+    play(stage, random.Random(seed))
+    assert stage.round > stage.max_rounds
+    pairs = collections.Counter(frozenset((m.blue_team, m.red_team)) for m in stage.match_history
+                                if BYE not in (m.blue_team, m.red_team))
+    assert max(pairs.values()) == 1
+    byes = collections.Counter(m.blue_team for m in stage.match_history if m.red_team == BYE)
+    assert len(byes) == 0 or max(byes.values()) == 1
+
+
+def test_pairings_without_rematch():
+    rng = random.Random(0)
+    for _ in range(200):
+        teams = [f'team {i}' for i in range(rng.randint(2, 40))]
+        opponents = {team: [] for team in teams}
+        for _ in range(3):  # three earlier rounds
+            pairs, bye = pairing.swiss_pairings(teams, opponents)
+            for blue, red in pairs:
+                opponents[blue].append(red)
+                opponents[red].append(blue)
+            if bye is not None:
+                opponents[bye].append(BYE)
+            rng.shuffle(teams)
+        pairs, bye = pairing.swiss_pairings(teams, opponents)
+        paired = [team for pair in pairs for team in pair] + ([bye] if bye is not None else [])
+        assert sorted(paired) == sorted(teams)
+        if len(teams) >= 8:
+            assert all(red not in opponents[blue] for blue, red in pairs)
+        if bye is not None and len(teams) >= 8:
+            assert BYE not in opponents[bye]
+
+
+def test_bye_goes_to_lowest_ranked_team():
+    teams = ['a', 'b', 'c', 'd', 'e']
+    pairs, bye = pairing.swiss_pairings(teams, {team: [] for team in teams})
+    assert bye == 'e'
+    assert pairs == [('a', 'b'), ('c', 'd')]
+    pairs, bye = pairing.swiss_pairings(teams, {'e': [BYE]})
+    assert bye == 'd'
+
+
+@pytest.mark.parametrize('max_backtracks', [0, 10000])
+def test_long_season_without_rematch(max_backtracks):
+    # 64 teams over 20 rounds: late rounds exhaust the search, the matching fallback still avoids rematches
+    rng = random.Random(0)
+    teams = [f'team {i}' for i in range(64)]
+    points = dict.fromkeys(teams, 0)
+    opponents = {team: [] for team in teams}
+    for _ in range(20):
+        ranked = sorted(teams, key=lambda team: -points[team])
+        pairs, bye = pairing.swiss_pairings(ranked, opponents, max_backtracks)
+        assert bye is None and len(pairs) == 32
+        for blue, red in pairs:
+            assert red not in opponents[blue]
+            opponents[blue].append(red)
+            opponents[red].append(blue)
+            points[blue if rng.random() < 0.5 else red] += 1
+
+
+def test_matching_fallback():
+    teams = [f'team {i}' for i in range(6)]
+    # the closest ranked pairing (0, 1) (2, 3) (4, 5) leaves no way to pair 4 and 5: augmented by the matching
+    opponents = {'team 2': ['team 5'], 'team 3': ['team 4'], 'team 4': ['team 5', 'team 3'],
+                 'team 5': ['team 4', 'team 2']}
+    pairs = pairing._pair_by_matching(teams, opponents)
+    assert sorted(team for pair in pairs for team in pair) == teams
+    assert all(red not in opponents.get(blue, ()) for blue, red in pairs)
+    # team 0 has played everyone
+    opponents = {team: ['team 0'] for team in teams[1:]}
+    opponents['team 0'] = teams[1:]
+    assert pairing._pair_by_matching(teams, opponents) is None
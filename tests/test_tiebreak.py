@@ -0,0 +1,78 @@
+import random
+
+import pytest
+from conftest import build_stage, play
+
+from tournapy.core import tiebreak
+from tournapy.core.pairing import BYE
+
+pytest.importorskip('numpy')
+
+
+def reference(stage) -> dict[str, dict[str, float]]:
+    # team -> key -> value, from the match history
+    points = {team.name: team.points for team in stage.pool}
+    record = {name: [] for name in points}  # (opponent, result) with 1 win, 0.5 draw, 0 loss
+    for m in stage.match_history:
+        winner = m.get_winner()
+        for team, opponent in ((m.blue_team, m.red_team), (m.red_team, m.blue_team)):
+            if team in record:
+                record[team].append((opponent, 1 if winner == team else 0.5 if winner is None else 0))
+    values = {}
+    for team in stage.pool:
+        results = record[team.name]
+        win_rate = {name: max(sum(r for _, r in rs) / max(len(rs), 1), tiebreak.OPPONENT_WIN_FLOOR)
+                    for name, rs in record.items()}
+        faced = [(opponent, r) for opponent, r in results if opponent in points]
+        opponent_points = [points[opponent] for opponent, _ in faced]
+        buchholz = sum(opponent_points)
+        values[team.name] = {
+            'points': team.points, 'goals_diff': team.goals_scored - team.goals_taken,
+            'goals_scored': team.goals_scored, 'wins': sum(r == 1 for _, r in results),
+            'buchholz': buchholz,
+            'median_buchholz': buchholz - max(opponent_points) - min(opponent_points) if len(faced) >= 3 else buchholz,
+            'sonneborn_berger': sum(points[opponent] * r for opponent, r in faced),
+            'opponent_win_pct': sum(win_rate[opponent] for opponent, _ in faced) / max(len(faced), 1)}
+    return values
+
+
+@pytest.mark.parametrize('teams', [5, 8, 13])
+def test_tiebreaks_match_reference(teams):
+    rng = random.Random(teams)
+    stage = build_stage('Swiss-System', teams, bo=3)
+    stage.set_tiebreaks(('points', 'buchholz', 'opponent_win_pct'))
+
+    def check(match):
+        expected = reference(stage)
+        values = tiebreak.compute(stage.standings)
+        for team in stage.pool:
+            seed = stage.standings.seeds[team.name]
+            for key in tiebreak.KEYS:
+                assert values[key][seed] == pytest.approx(expected[team.name][key]), key
+        ranked = sorted(stage.pool, key=lambda t: tuple(-expected[t.name][key] for key in stage.tiebreaks) +
+                        (stage.standings.seeds[t.name],))
+        assert [t.name for t in stage.get_ranking()] == [t.name for t in ranked]
+        assert [stage.get_rank(t.name) for t in ranked] == list(range(1, teams + 1))
+        return rng.random() < 0.5
+
+    play(stage, rng, check)
+    check(None)
+    if teams % 2 == 1:  # byes count in the team record only
+        assert any(BYE in (m.blue_team, m.red_team) for m in stage.match_history)
+    # standings rows follow the ranking
+    assert stage.get_standings().ranked_names() == [t.name for t in stage.get_ranking()]
+
+
+def test_default_ranking_is_incremental(rng):
+    stage = build_stage('Swiss-System', 8)
+    play(stage, rng)
+    assert tiebreak.order(stage.standings, tiebreak.DEFAULT) == [stage.standings.seeds[t.name]
+                                                                 for t in stage.standings.ranked_teams()]
+
+
+def test_validate():
+    assert tiebreak.validate(['wins', 'buchholz']) == ('wins', 'buchholz')
+    with pytest.raises(ValueError):
+        tiebreak.validate(('points', 'coin_flip'))
+    with pytest.raises(ValueError):
+        tiebreak.validate(())
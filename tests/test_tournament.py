@@ -0,0 +1,60 @@
+import random
+
+from tournapy.tournament import Tournament
+
+
+def new_tournament(team_size: int = 3) -> Tournament:
+    t = Tournament()
+    t.setup('admin', 't', team_size)
+    return t
+
+
+def check_indexes(t: Tournament):
+    # indexes match a scan of players_dict
+    for team_name, team in t.teams_dict.items():
+        members = sorted(p.name for p in t.players_dict.values() if p.team == team_name)
+        assert sorted(p.name for p in t.get_team_players(team_name)) == members
+        assert team.size == len(members)
+        elos = [t.players_dict[name].elo for name in members]
+        assert t.get_team_elo(team_name) == (int(sum(elos) / len(elos)) if elos else 0)
+        assert team.elo == t.get_team_elo(team_name)
+
+
+def test_team_indexes_under_random_changes():
+    rng = random.Random(0)
+    t = new_tournament()
+    for _ in range(3000):
+        action = rng.random()
+        player = f'player {rng.randrange(30)}'
+        team = f'team {rng.randrange(8)}'
+        if action < 0.3:
+            t.add_player(player, rng.randint(0, 2000))
+        elif action < 0.6:
+            t.add_to_team(team, player)
+        elif action < 0.7:
+            p = t.players_dict.get(player)
+            if p is not None and p.team is not None:
+                t.remove_from_team(p.team, player)
+        elif action < 0.8:
+            t.remove_player(player)
+        elif action < 0.85:
+            t.remove_team(team)
+        else:
+            t.set_players_elo({player: rng.randint(0, 2000)})
+        check_indexes(t)
+
+
+def test_player_moves_between_teams():
+    t = new_tournament(2)
+    t.add_player('alice', 1000)
+    t.add_player('bob', 2000)
+    t.add_to_team('red', 'alice')
+    t.add_to_team('red', 'bob')
+    assert t.get_team_elo('red') == 1500
+    assert t.add_to_team('blue', 'bob')[0]
+    assert [p.name for p in t.get_team_players('red')] == ['alice']
+    assert t.teams_dict['red'].elo == 1000 and t.teams_dict['blue'].elo == 2000
+    assert t.remove_team('red')[0]
+    assert t.players_dict['alice'].team is None
+    assert t.get_team_elo('red') == 0 and t.get_team_players('red') == []
+    assert not t.remove_team('red')[0]